@@ -0,0 +1,38 @@
+from typing import Optional
+
+
+class ApprovalRules:
+    """
+    Approval rules of a single academic record, without pandas. ApproveSubjectLogic applies the same
+    rules to whole DataFrames at once.
+    """
+    HOMOLOGATED_STATUS = 'HOMOLOGADO'
+    PASS_FAIL_GRADING_MODE = 'APROBADO/REPROBADO'
+    NUMERIC_GRADING_MODE = 'ESTANDAR NUMERICO 1.5-5.0'
+    PASSING_LETTER_GRADE = 'A'
+    MINIMUM_PASSING_GRADE = 3.0
+
+    @staticmethod
+    def is_approved(status: Optional[str], grading_mode: str, final_grade: str) -> bool:
+        """
+        Determines whether one record counts as an approved attempt, following the rules of
+        ApproveSubjectLogic.compute_approved_column.
+
+        :param status: The ESTATUS_CURSO value, or None when the dataset has no such column.
+        :param grading_mode: The DESCRIPCION_MODO_DE_CALIFICACION value.
+        :param final_grade: The CALIFICACION_FINAL value.
+        :return: True if the record is approved, False otherwise.
+        """
+        if status == ApprovalRules.HOMOLOGATED_STATUS:
+            return True
+        if grading_mode == ApprovalRules.PASS_FAIL_GRADING_MODE:
+            return final_grade == ApprovalRules.PASSING_LETTER_GRADE
+        if grading_mode != ApprovalRules.NUMERIC_GRADING_MODE:
+            return True
+        if final_grade == ApprovalRules.PASSING_LETTER_GRADE:
+            return True
+        # Grades that cannot be converted to a number are considered as failed
+        try:
+            return float(final_grade.strip()) >= ApprovalRules.MINIMUM_PASSING_GRADE
+        except ValueError:
+            return False
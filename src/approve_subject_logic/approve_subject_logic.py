@@ -1,46 +1,80 @@
+import numpy as np
 import pandas as pd
+from approve_subject_logic.approval_rules import ApprovalRules
+from utils.profiler import Profiler
 
 
 class ApproveSubjectLogic:
+    # Name of the precomputed column holding the approval result of every record
+    APPROVED_COLUMN = 'APROBADO'
+
+    HOMOLOGATED_STATUS = ApprovalRules.HOMOLOGATED_STATUS
+    PASS_FAIL_GRADING_MODE = ApprovalRules.PASS_FAIL_GRADING_MODE
+    NUMERIC_GRADING_MODE = ApprovalRules.NUMERIC_GRADING_MODE
+    PASSING_LETTER_GRADE = ApprovalRules.PASSING_LETTER_GRADE
+    MINIMUM_PASSING_GRADE = ApprovalRules.MINIMUM_PASSING_GRADE
+
+    @staticmethod
+    def compute_approved_column(records: pd.DataFrame) -> pd.Series:
+        """
+        Determines, in a single vectorized pass, whether each record counts as an approved attempt.
+
+        A record is approved when:
+        - The course was homologated.
+        - The grading mode is neither "APROBADO/REPROBADO" nor "ESTANDAR NUMERICO 1.5-5.0".
+        - The grading mode is "APROBADO/REPROBADO" and the final grade is "A".
+        - The grading mode is "ESTANDAR NUMERICO 1.5-5.0" and the final grade is "A" or a number >= 3.0.
+
+        :param records: DataFrame containing academic records.
+        :return: A boolean Series aligned with the records index.
+        """
+        if records.empty:
+            return pd.Series(False, index=records.index, dtype=bool)
+
+        if 'ESTATUS_CURSO' in records.columns:
+            homologated = records['ESTATUS_CURSO'] == ApproveSubjectLogic.HOMOLOGATED_STATUS
+        else:
+            homologated = pd.Series(False, index=records.index, dtype=bool)
+
+        grading_mode = records['DESCRIPCION_MODO_DE_CALIFICACION']
+        pass_fail = (grading_mode == ApproveSubjectLogic.PASS_FAIL_GRADING_MODE).to_numpy(dtype=bool)
+        numeric = (grading_mode == ApproveSubjectLogic.NUMERIC_GRADING_MODE).to_numpy(dtype=bool)
+        # Records with any other grading mode (including a missing one) are considered as passed
+        ungraded = ~(pass_fail | numeric)
+
+        # Grades repeat a lot, so each distinct grade is parsed only once
+        grade_codes, grade_values = pd.factorize(records['CALIFICACION_FINAL'])
+        grade_values = pd.Series(np.asarray(grade_values, dtype=object))
+        # Grades that cannot be converted to a number are considered as failed
+        numeric_grades = pd.to_numeric(grade_values.astype(str).str.strip(), errors='coerce')
+        unique_letter_passed = (grade_values == ApproveSubjectLogic.PASSING_LETTER_GRADE).to_numpy(dtype=bool)
+        unique_numeric_passed = (numeric_grades >= ApproveSubjectLogic.MINIMUM_PASSING_GRADE).to_numpy(dtype=bool)
+        # Missing grades are factorized as -1, which maps to the trailing False
+        letter_passed = np.append(unique_letter_passed, False)[grade_codes]
+        numeric_passed = np.append(unique_numeric_passed, False)[grade_codes]
+
+        approved = (
+            homologated.to_numpy(dtype=bool) | ungraded
+            | (pass_fail & letter_passed) | (numeric & (letter_passed | numeric_passed))
+        )
+        return pd.Series(approved, index=records.index, dtype=bool)
+
     @staticmethod
     def has_passed_subject(subject_df: pd.DataFrame) -> bool:
         """
         Determines if the student has passed or homologated the subject based on given DataFrame.
-        
+        Retakes are resolved with an "any attempt passed" rule, so the order of the records is irrelevant.
+
         :param subject_df: DataFrame containing records for a specific subject of a student.
         :return: True if the subject was passed or homologated, False otherwise.
         """
+        Profiler.count('approval_checks')
         # If the DataFrame is empty, the student hasn't taken the subject before the specified period
         if subject_df.empty:
             return False
 
-        for _, row in subject_df.iterrows():
-            course_status = row.get('ESTATUS_CURSO', None)
-            grading_mode = row['DESCRIPCION_MODO_DE_CALIFICACION']
-            final_grade = row['CALIFICACION_FINAL']
-            
-            # If the course was homologated, return True
-            if course_status == 'HOMOLOGADO':
-                return True
-
-            # If the grading mode is not relevant, consider it as passed
-            if grading_mode not in ['APROBADO/REPROBADO', 'ESTANDAR NUMERICO 1.5-5.0']:
-                return True
-
-            # If the grading mode is "APROBADO/REPROBADO"
-            if grading_mode == 'APROBADO/REPROBADO':
-                return final_grade == 'A'
-
-            # If the grading mode is "ESTANDAR NUMERICO 1.5-5.0"
-            if grading_mode == 'ESTANDAR NUMERICO 1.5-5.0':
-                if final_grade == 'A':
-                    return True
-                try:
-                    final_grade_float = float(final_grade)
-                    return final_grade_float >= 3.0
-                except ValueError:
-                    # If final grade cannot be converted to float, consider it as failed
-                    return False
-        
-        # If none of the conditions are met, return False
-        return False
+        # Reuse the precomputed column when available instead of evaluating the records again
+        if ApproveSubjectLogic.APPROVED_COLUMN in subject_df.columns:
+            return bool(subject_df[ApproveSubjectLogic.APPROVED_COLUMN].any())
+
+        return bool(ApproveSubjectLogic.compute_approved_column(subject_df).any())
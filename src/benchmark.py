@@ -0,0 +1,106 @@
+import argparse
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+from benchmarks.synthetic_data import SyntheticDataConfig
+from benchmarks.stage_benchmark import StageBenchmark
+from benchmarks.server_benchmark import ServerBenchmark
+from benchmarks.storage_benchmark import StorageBenchmark
+
+def parse_grading_mode_share(value: str) -> Tuple[str, float]:
+    """
+    Parses one grading mode of --grading-mode-mix, given as `MODE=share`.
+
+    :param value: The grading mode and its share, e.g. "APROBADO/REPROBADO=0.15".
+    :return: The grading mode and its share.
+    :raises argparse.ArgumentTypeError: If the value has no mode or its share is not a non-negative number.
+    """
+    mode, _, share = value.rpartition('=')
+    try:
+        weight = float(share)
+    except ValueError:
+        weight = -1.0
+    if not mode or weight < 0:
+        raise argparse.ArgumentTypeError(f"Invalid grading mode share '{value}': the format is MODE=share "
+                                         f"with a non-negative share (e.g., 'APROBADO/REPROBADO=0.15').")
+    return mode, weight
+
+def benchmark(
+    sizes: List[int],
+    output_path: Path,
+    specified_period: str,
+    sample_size: int,
+    lean: bool,
+    config: SyntheticDataConfig,
+    data_dir: Optional[Path] = None,
+    client_counts: Optional[List[int]] = None,
+    requests_per_client: int = 100,
+    storage: bool = False
+) -> None:
+    """
+    Runs the stage benchmark, the report server benchmark when client counts are given, or the storage
+    benchmark on synthetic datasets of several sizes and saves the results as JSON.
+
+    :param sizes: The numbers of students to benchmark.
+    :param output_path: Path to the JSON results file.
+    :param specified_period: The cutoff period used by the per-student stages.
+    :param sample_size: The maximum number of students timed by the per-student stages.
+    :param lean: Whether to load the CSV file with the lean loading mode.
+    :param config: The parameters of the synthetic data.
+    :param data_dir: Optional directory to keep the generated datasets.
+    :param client_counts: Optional numbers of concurrent clients of the report server benchmark.
+    :param requests_per_client: The number of reports requested by each client in each pass.
+    :param storage: Whether to compare the in-memory pandas storage with the SQLite store.
+    """
+    if storage:
+        results = StorageBenchmark(specified_period, sample_size, lean).run(sizes, config, data_dir)
+    elif client_counts:
+        results = ServerBenchmark(client_counts, requests_per_client, specified_period).run(sizes, config, data_dir)
+    else:
+        results = StageBenchmark(specified_period, sample_size, lean).run(sizes, config, data_dir)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open('w', encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f"Benchmark results saved to {output_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000, 100000], help="Numbers of students.")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"), help="Path to the results file.")
+    parser.add_argument("--period", default="202010", help="Cutoff period of the per-student stages.")
+    parser.add_argument("--sample", type=int, default=1000, help="Students timed by the per-student stages.")
+    parser.add_argument("--lean", action="store_true", help="Load the CSV file with the lean loading mode.")
+    parser.add_argument("--data-dir", type=Path, default=None, help="Directory to keep the generated datasets.")
+    parser.add_argument("--semesters", type=int, default=8, help="Maximum semesters per student.")
+    parser.add_argument("--retake-rate", type=float, default=0.1, help="Share of attempts that are repeated.")
+    parser.add_argument("--failure-rate", type=float, default=0.15, help="Share of graded attempts that fail.")
+    parser.add_argument("--homologation-rate", type=float, default=0.02,
+                        help="Share of attempts marked as homologated.")
+    parser.add_argument("--grading-mode-mix", type=parse_grading_mode_share, nargs='+', default=None,
+                        metavar="MODE=SHARE", help="Share of attempts of each grading mode.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data.")
+    parser.add_argument("--server-clients", type=int, nargs='+', default=None,
+                        help="Benchmark the report server with these numbers of concurrent clients.")
+    parser.add_argument("--requests", type=int, default=100, help="Reports requested by each server client per pass.")
+    parser.add_argument("--storage", action="store_true",
+                        help="Compare the in-memory pandas storage with the SQLite store.")
+    args = parser.parse_args()
+    if args.grading_mode_mix is not None and sum(share for _, share in args.grading_mode_mix) <= 0:
+        parser.error("The shares of --grading-mode-mix must add up to more than 0.")
+
+    data_config = SyntheticDataConfig(
+        students=0,
+        semesters=args.semesters,
+        retake_rate=args.retake_rate,
+        failure_rate=args.failure_rate,
+        homologation_rate=args.homologation_rate,
+        seed=args.seed
+    )
+    if args.grading_mode_mix is not None:
+        data_config.grading_mode_mix = dict(args.grading_mode_mix)
+
+    # Run the benchmark
+    benchmark(
+        args.sizes, args.output, args.period, args.sample, args.lean, data_config, args.data_dir,
+        args.server_clients, args.requests, args.storage
+    )
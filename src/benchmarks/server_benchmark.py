@@ -0,0 +1,203 @@
+import contextlib
+import http.client
+import io
+import json
+import multiprocessing
+import platform
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from benchmarks.stage_benchmark import StageBenchmark
+from benchmarks.synthetic_data import SyntheticDataConfig, SyntheticDataGenerator, SyntheticDataset
+from report_server.report_service import ReportService
+from report_server.report_server import ReportServer
+
+
+class ServerBenchmark:
+    """
+    Measures the throughput and latency of the report server with concurrent clients on localhost.
+    The server runs in its own process, so the clients do not compete with it for the GIL.
+
+    For each number of clients, the report cache is emptied and every client requests its own slice
+    of the students twice: the first pass measures reports generated on request, the second pass
+    measures reports answered from the cache.
+    """
+    # Bump when the measurements or the layout of the results change
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        client_counts: List[int],
+        requests_per_client: int = 100,
+        specified_period: str = '202010'
+    ) -> None:
+        """
+        :param client_counts: The numbers of concurrent clients to measure.
+        :param requests_per_client: The number of reports requested by each client in each pass.
+        :param specified_period: The cutoff period of the requested reports.
+        """
+        self.client_counts = client_counts
+        self.requests_per_client = requests_per_client
+        self.specified_period = specified_period
+
+    @staticmethod
+    def _serve(dataset: SyntheticDataset, cutoff: str, cache_size: int, port_queue: Any) -> None:
+        """
+        Loads the dataset and serves it on a free localhost port, which is sent back through the queue.
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            service = ReportService(
+                dataset.data_set_path,
+                {'benchmark': dataset.curriculum_structure_path},
+                cutoff,
+                report_cache_size=cache_size
+            )
+            service.load()
+        with ReportServer(('127.0.0.1', 0), service) as server:
+            port_queue.put(server.server_address[1])
+            server.serve_forever()
+
+    @staticmethod
+    def _request(connection: http.client.HTTPConnection, method: str, path: str) -> Tuple[int, bytes]:
+        connection.request(method, path)
+        response = connection.getresponse()
+        return response.status, response.read()
+
+    def _run_clients(self, port: int, student_slices: List[List[str]]) -> Dict[str, Any]:
+        """
+        Runs one client thread per slice of students and measures every request.
+        """
+        latencies: List[List[float]] = [[] for _ in student_slices]
+        errors = [0] * len(student_slices)
+
+        def run_client(client: int) -> None:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            for student_code in student_slices[client]:
+                start = time.perf_counter()
+                status, _ = ServerBenchmark._request(
+                    connection, 'GET',
+                    f"/report?student_code={student_code}&curriculum=benchmark&cutoff={self.specified_period}"
+                )
+                latencies[client].append(time.perf_counter() - start)
+                if status != 200:
+                    errors[client] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=run_client, args=(client,)) for client in range(len(student_slices))]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - start
+
+        all_latencies = np.array([latency for client in latencies for latency in client], dtype=np.float64)
+        percentiles = np.percentile(all_latencies, [50, 95, 99]) if len(all_latencies) else np.zeros(3)
+        return {
+            'requests': len(all_latencies),
+            'errors': sum(errors),
+            'seconds': seconds,
+            'requests_per_second': len(all_latencies) / seconds if seconds else 0.0,
+            'p50_ms': float(percentiles[0] * 1000),
+            'p95_ms': float(percentiles[1] * 1000),
+            'p99_ms': float(percentiles[2] * 1000),
+            'max_ms': float(all_latencies.max() * 1000) if len(all_latencies) else 0.0,
+        }
+
+    def run_dataset(self, dataset: SyntheticDataset) -> Dict[str, Any]:
+        """
+        Starts a server on the dataset and measures every number of clients.
+
+        :param dataset: The generated dataset.
+        :return: A dictionary with the size of the dataset and the measurements of each number of clients.
+        """
+        with dataset.student_codes_path.open('r', encoding='utf-8') as file:
+            student_codes = [str(code) for code in json.load(file)]
+        # The cache holds every report of a pass, so the second pass is answered entirely from it
+        cache_size = max(self.client_counts) * self.requests_per_client
+
+        port_queue = multiprocessing.Queue()
+        server_process = multiprocessing.Process(
+            target=ServerBenchmark._serve, args=(dataset, self.specified_period, cache_size, port_queue), daemon=True
+        )
+        start = time.perf_counter()
+        server_process.start()
+        try:
+            port = port_queue.get(timeout=600)
+            load_seconds = time.perf_counter() - start
+
+            runs: List[Dict[str, Any]] = []
+            for clients in self.client_counts:
+                student_slices = [
+                    [student_codes[(client * self.requests_per_client + request) % len(student_codes)]
+                     for request in range(self.requests_per_client)]
+                    for client in range(clients)
+                ]
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+                ServerBenchmark._request(connection, 'DELETE', '/cache')
+                cold = self._run_clients(port, student_slices)
+                warm = self._run_clients(port, student_slices)
+                _, stats = ServerBenchmark._request(connection, 'GET', '/stats')
+                connection.close()
+                runs.append({
+                    'clients': clients,
+                    'cold': cold,
+                    'warm': warm,
+                    'report_cache': json.loads(stats)['report_cache'],
+                })
+        finally:
+            server_process.terminate()
+            server_process.join()
+
+        return {
+            'students': dataset.students,
+            'records': dataset.records,
+            'load_seconds': load_seconds,
+            'runs': runs,
+        }
+
+    def run(self, sizes: List[int], config: SyntheticDataConfig, data_dir: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Generates a dataset for each size and measures the server on it.
+
+        :param sizes: The numbers of students to benchmark.
+        :param config: The parameters of the synthetic data; its number of students is replaced by each size.
+        :param data_dir: Optional directory to keep the generated datasets; a temporary directory by default.
+        :return: The benchmark results, ready to be saved as JSON.
+        """
+        results: List[Dict[str, Any]] = []
+        with tempfile.TemporaryDirectory() as scratch:
+            for size in sizes:
+                size_config = SyntheticDataConfig(**{**asdict(config), 'students': size})
+                print(f"Generating {size} students...")
+                dataset = SyntheticDataGenerator(size_config).generate(data_dir or Path(scratch))
+                print(f"Serving {dataset.records} records...")
+                result = self.run_dataset(dataset)
+                for run in result['runs']:
+                    print(f"  {run['clients']} clients: "
+                          f"cold {run['cold']['requests_per_second']:.0f} req/s (p95 {run['cold']['p95_ms']:.1f} ms), "
+                          f"warm {run['warm']['requests_per_second']:.0f} req/s (p95 {run['warm']['p95_ms']:.1f} ms)")
+                results.append(result)
+
+        return {
+            'format_version': ServerBenchmark.FORMAT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'git_commit': StageBenchmark._get_git_commit(),
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+            },
+            'settings': {
+                'specified_period': self.specified_period,
+                'client_counts': self.client_counts,
+                'requests_per_client': self.requests_per_client,
+                'data': {key: value for key, value in asdict(config).items() if key != 'students'},
+            },
+            'results': results,
+        }
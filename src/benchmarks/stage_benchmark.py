@@ -0,0 +1,181 @@
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from csv_reader.csv_reader import CSVReader
+from deserialization.complete_data import CompleteData
+from deserialization.compiled_curriculum import CompiledCurriculum
+from queries.student_queries import StudentQueries
+from queries.period_queries import PeriodQueries
+from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+from student_registry_manager.student_registry_manager import StudentRegistryManager
+from report_logic.complete_report_logic import CompleteReportLogic
+from output_printer.output_printer import save_report
+from benchmarks.synthetic_data import SyntheticDataConfig, SyntheticDataGenerator, SyntheticDataset
+
+
+class StageBenchmark:
+    """
+    Times each stage of the report pipeline separately on synthetic datasets of several sizes.
+    Per-student stages run over a sample of the students, so the largest sizes stay affordable;
+    their results include the time per student.
+    """
+    # Bump when the stages or the layout of the results change
+    FORMAT_VERSION = 1
+
+    def __init__(self, specified_period: str = '202010', sample_size: int = 1000, lean: bool = False) -> None:
+        """
+        :param specified_period: The cutoff period used by the per-student stages.
+        :param sample_size: The maximum number of students timed by the per-student stages.
+        :param lean: Whether to load the CSV file with the lean loading mode.
+        """
+        self.specified_period = specified_period
+        self.sample_size = sample_size
+        self.lean = lean
+
+    @staticmethod
+    def _time_stage(stage: Callable[[], Any]) -> Dict[str, Any]:
+        """
+        Runs a stage with its console output silenced and measures its wall time.
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = stage()
+            seconds = time.perf_counter() - start
+        return {'seconds': seconds, 'result': result}
+
+    @staticmethod
+    def _get_git_commit() -> Optional[str]:
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def run_dataset(self, dataset: SyntheticDataset, output_dir: Path) -> Dict[str, Any]:
+        """
+        Times every stage on one dataset.
+
+        :param dataset: The generated dataset.
+        :param output_dir: A scratch directory for the saved reports.
+        :return: A dictionary with the size of the dataset and the timing of each stage.
+        """
+        CSVReader.reset()
+        stages: Dict[str, Dict[str, Any]] = {}
+
+        timing = StageBenchmark._time_stage(lambda: CSVReader(dataset.data_set_path, lean=self.lean))
+        stages['csv_load'] = {'seconds': timing['seconds']}
+        data = CSVReader.get_data()
+
+        timing = StageBenchmark._time_stage(lambda: ApproveSubjectLogic.compute_approved_column(data))
+        stages['approval_column'] = {'seconds': timing['seconds'], 'records': len(data)}
+
+        with dataset.student_codes_path.open('r', encoding='utf-8') as file:
+            student_codes = [str(code) for code in json.load(file)][:self.sample_size]
+        complete_data = CompleteData.from_json_file(dataset.curriculum_structure_path)
+        compiled = CompiledCurriculum.compile(complete_data)
+
+        timing = StageBenchmark._time_stage(
+            lambda: [StudentQueries.get_student_records(code) for code in student_codes]
+        )
+        stages['student_queries'] = {'seconds': timing['seconds']}
+        student_records: List[pd.DataFrame] = timing['result']
+
+        timing = StageBenchmark._time_stage(
+            lambda: [PeriodQueries.filter_records_before_period(records, self.specified_period)
+                     for records in student_records]
+        )
+        stages['period_queries'] = {'seconds': timing['seconds']}
+
+        # Building a manager runs both queries and the per-subject approval map; every course is then checked
+        def check_approvals() -> List[StudentRegistryManager]:
+            managers = [StudentRegistryManager(code, self.specified_period) for code in student_codes]
+            for manager in managers:
+                for course_code in compiled.course_codes:
+                    manager.approve_subject_until_specified_period(course_code)
+            return managers
+
+        timing = StageBenchmark._time_stage(check_approvals)
+        stages['approval_checks'] = {'seconds': timing['seconds']}
+        managers: List[StudentRegistryManager] = timing['result']
+
+        timing = StageBenchmark._time_stage(
+            lambda: [CompleteReportLogic.get_complete_report(complete_data, manager) for manager in managers]
+        )
+        stages['complete_report'] = {'seconds': timing['seconds']}
+        reports: List[Dict[str, Any]] = timing['result']
+
+        timing = StageBenchmark._time_stage(
+            lambda: [CompleteReportLogic.get_compiled_report(compiled, manager) for manager in managers]
+        )
+        stages['compiled_report'] = {'seconds': timing['seconds']}
+
+        timing = StageBenchmark._time_stage(
+            lambda: [save_report(report, output_dir, 'benchmark', code) for code, report in zip(student_codes, reports)]
+        )
+        stages['save_report'] = {'seconds': timing['seconds']}
+
+        for name in ('student_queries', 'period_queries', 'approval_checks', 'complete_report', 'compiled_report',
+                     'save_report'):
+            stages[name]['per_student_ms'] = stages[name]['seconds'] * 1000 / max(len(student_codes), 1)
+
+        result = {
+            'students': dataset.students,
+            'records': dataset.records,
+            'sampled_students': len(student_codes),
+            'memory_bytes': CSVReader.get_memory_footprint(),
+            'stages': stages,
+        }
+        CSVReader.reset()
+        return result
+
+    def run(self, sizes: List[int], config: SyntheticDataConfig, data_dir: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Generates a dataset for each size and times every stage on it.
+
+        :param sizes: The numbers of students to benchmark.
+        :param config: The parameters of the synthetic data; its number of students is replaced by each size.
+        :param data_dir: Optional directory to keep the generated datasets; a temporary directory by default.
+        :return: The benchmark results, ready to be saved as JSON.
+        """
+        results: List[Dict[str, Any]] = []
+        with tempfile.TemporaryDirectory() as scratch:
+            scratch_dir = Path(scratch)
+            for size in sizes:
+                size_config = SyntheticDataConfig(**{**asdict(config), 'students': size})
+                print(f"Generating {size} students...")
+                dataset = SyntheticDataGenerator(size_config).generate(data_dir or scratch_dir / 'data')
+                print(f"Timing {dataset.records} records...")
+                result = self.run_dataset(dataset, scratch_dir / f"reports-{size}")
+                for name, stage in result['stages'].items():
+                    print(f"  {name}: {stage['seconds']:.3f} s")
+                results.append(result)
+
+        return {
+            'format_version': StageBenchmark.FORMAT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'git_commit': StageBenchmark._get_git_commit(),
+            'environment': {
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+            },
+            'settings': {
+                'specified_period': self.specified_period,
+                'sample_size': self.sample_size,
+                'lean': self.lean,
+                'data': {key: value for key, value in asdict(config).items() if key != 'students'},
+            },
+            'results': results,
+        }
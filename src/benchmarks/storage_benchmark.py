@@ -0,0 +1,209 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import resource
+import sqlite3
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from csv_reader.csv_reader import CSVReader
+from csv_reader.period_store import PeriodStore
+from csv_reader.sqlite_store import SQLiteStore
+from deserialization.complete_data import CompleteData
+from deserialization.compiled_curriculum import CompiledCurriculum
+from queries.student_queries import StudentQueries
+from queries.period_queries import PeriodQueries
+from queries.subject_queries import SubjectQueries
+from student_registry_manager.student_registry_manager import StudentRegistryManager
+from benchmarks.stage_benchmark import StageBenchmark
+from benchmarks.synthetic_data import SyntheticDataConfig, SyntheticDataGenerator, SyntheticDataset
+
+
+class StorageBenchmark:
+    """
+    Compares the in-memory pandas storage with the SQLite store on synthetic datasets of several sizes.
+    Each storage is measured in its own process, so the peak resident memory of a process only counts
+    the storage it measures; the SQLite database is built beforehand in another process.
+
+    Both storages answer the same per-student queries over a sample of the students, through the query
+    functions used by the reports: the records of the student, the records before the cutoff, the
+    records of one curriculum course and the construction of a StudentRegistryManager. The SQLite store
+    reads the records of the student through its index, and the other queries filter them in pandas.
+    """
+    # Bump when the measurements or the layout of the results change
+    FORMAT_VERSION = 2
+    QUERIES = ['student_records', 'records_before_period', 'subject_records', 'registry_manager']
+
+    def __init__(self, specified_period: str = '202010', sample_size: int = 1000, lean: bool = False) -> None:
+        """
+        :param specified_period: The cutoff period of the per-student queries.
+        :param sample_size: The maximum number of students timed by the per-student queries.
+        :param lean: Whether to load the CSV file with the lean loading mode.
+        """
+        self.specified_period = specified_period
+        self.sample_size = sample_size
+        self.lean = lean
+
+    @staticmethod
+    def _get_peak_rss() -> int:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return int(peak if platform.system() == 'Darwin' else peak * 1024)
+
+    @staticmethod
+    def _run_in_process(target: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+        """
+        Runs a measurement in a child process and returns its result.
+        """
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=StorageBenchmark._process_entry, args=(queue, target, args), daemon=True
+        )
+        process.start()
+        result = queue.get()
+        process.join()
+        if 'error' in result:
+            raise RuntimeError(f"Storage benchmark process failed: {result['error']}")
+        return result
+
+    @staticmethod
+    def _process_entry(queue: Any, target: Callable[..., Dict[str, Any]], args: tuple) -> None:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = target(*args)
+            result['peak_rss_bytes'] = StorageBenchmark._get_peak_rss()
+            queue.put(result)
+        except Exception as error:
+            queue.put({'error': repr(error)})
+
+    def _time_queries(self, dataset: SyntheticDataset) -> Dict[str, Any]:
+        """
+        Times the per-student queries on the storage opened by CSVReader.
+        """
+        with dataset.student_codes_path.open('r', encoding='utf-8') as file:
+            student_codes = [str(code) for code in json.load(file)][:self.sample_size]
+        compiled = CompiledCurriculum.compile(CompleteData.from_json_file(dataset.curriculum_structure_path))
+        subject_code = compiled.course_codes[0]
+
+        queries: Dict[str, Callable[[str], Any]] = {
+            'student_records': StudentQueries.get_student_records,
+            'records_before_period': lambda code: PeriodQueries.filter_records_before_period(
+                StudentQueries.get_student_records(code), self.specified_period
+            ),
+            'subject_records': lambda code: SubjectQueries.get_subject(
+                StudentQueries.get_student_records(code), subject_code
+            ),
+            'registry_manager': lambda code: StudentRegistryManager(code, self.specified_period),
+        }
+
+        timings: Dict[str, Dict[str, float]] = {}
+        for name in StorageBenchmark.QUERIES:
+            query = queries[name]
+            latencies = np.zeros(len(student_codes), dtype=np.float64)
+            for position, code in enumerate(student_codes):
+                start = time.perf_counter()
+                query(code)
+                latencies[position] = time.perf_counter() - start
+            percentiles = np.percentile(latencies, [50, 95]) if len(latencies) else np.zeros(2)
+            timings[name] = {
+                'seconds': float(latencies.sum()),
+                'per_student_ms': float(latencies.mean() * 1000) if len(latencies) else 0.0,
+                'p50_ms': float(percentiles[0] * 1000),
+                'p95_ms': float(percentiles[1] * 1000),
+            }
+        return {'sampled_students': len(student_codes), 'queries': timings}
+
+    def _measure_pandas(self, dataset: SyntheticDataset) -> Dict[str, Any]:
+        start = time.perf_counter()
+        CSVReader(dataset.data_set_path, lean=self.lean)
+        load_seconds = time.perf_counter() - start
+        result = {'load_seconds': load_seconds, 'memory_bytes': CSVReader.get_memory_footprint()}
+        result.update(self._time_queries(dataset))
+        return result
+
+    def _build_sqlite(self, dataset: SyntheticDataset, db_path: Path) -> Dict[str, Any]:
+        CSVReader(dataset.data_set_path, lean=self.lean)
+        start = time.perf_counter()
+        SQLiteStore.build(db_path, CSVReader.get_data(), PeriodStore.compute_source_hash(dataset.data_set_path)).close()
+        return {'build_seconds': time.perf_counter() - start}
+
+    def _measure_sqlite(self, dataset: SyntheticDataset, db_path: Path) -> Dict[str, Any]:
+        start = time.perf_counter()
+        CSVReader(db_path)
+        result = {'open_seconds': time.perf_counter() - start, 'database_bytes': db_path.stat().st_size}
+        result.update(self._time_queries(dataset))
+        return result
+
+    def run_dataset(self, dataset: SyntheticDataset, db_path: Path) -> Dict[str, Any]:
+        """
+        Measures both storages on one dataset.
+
+        :param dataset: The generated dataset.
+        :param db_path: A scratch path for the SQLite database.
+        :return: A dictionary with the size of the dataset and the measurements of each storage.
+        """
+        pandas_result = StorageBenchmark._run_in_process(self._measure_pandas, dataset)
+        build_result = StorageBenchmark._run_in_process(self._build_sqlite, dataset, db_path)
+        sqlite_result = StorageBenchmark._run_in_process(self._measure_sqlite, dataset, db_path)
+        sqlite_result['build_seconds'] = build_result['build_seconds']
+        sqlite_result['build_peak_rss_bytes'] = build_result['peak_rss_bytes']
+        db_path.unlink(missing_ok=True)
+        return {
+            'students': dataset.students,
+            'records': dataset.records,
+            'pandas': pandas_result,
+            'sqlite': sqlite_result,
+        }
+
+    def run(self, sizes: List[int], config: SyntheticDataConfig, data_dir: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Generates a dataset for each size and measures both storages on it.
+
+        :param sizes: The numbers of students to benchmark.
+        :param config: The parameters of the synthetic data; its number of students is replaced by each size.
+        :param data_dir: Optional directory to keep the generated datasets; a temporary directory by default.
+        :return: The benchmark results, ready to be saved as JSON.
+        """
+        results: List[Dict[str, Any]] = []
+        with tempfile.TemporaryDirectory() as scratch:
+            scratch_dir = Path(scratch)
+            for size in sizes:
+                size_config = SyntheticDataConfig(**{**asdict(config), 'students': size})
+                print(f"Generating {size} students...")
+                dataset = SyntheticDataGenerator(size_config).generate(data_dir or scratch_dir / 'data')
+                print(f"Measuring {dataset.records} records...")
+                result = self.run_dataset(dataset, scratch_dir / f"records-{size}.db")
+                for storage in ('pandas', 'sqlite'):
+                    measured = result[storage]
+                    queries = ", ".join(
+                        f"{name} {timing['per_student_ms']:.3f} ms" for name, timing in measured['queries'].items()
+                    )
+                    print(f"  {storage}: peak RSS {measured['peak_rss_bytes'] / 2 ** 20:.1f} MiB, {queries}")
+                results.append(result)
+
+        return {
+            'format_version': StorageBenchmark.FORMAT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'git_commit': StageBenchmark._get_git_commit(),
+            'environment': {
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+            },
+            'settings': {
+                'specified_period': self.specified_period,
+                'sample_size': self.sample_size,
+                'lean': self.lean,
+                'data': {key: value for key, value in asdict(config).items() if key != 'students'},
+            },
+            'results': results,
+        }
@@ -0,0 +1,199 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+import numpy as np
+import pandas as pd
+from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+
+
+@dataclass
+class SyntheticDataConfig:
+    """
+    Parameters of a synthetic academic history:
+    - students: Number of students.
+    - semesters: Maximum number of regular semesters per student; each student takes between 1 and this many.
+    - courses_per_semester: Number of courses each student takes per semester.
+    - retake_rate: Share of attempts that are repeated in the following semester.
+    - failure_rate: Share of graded attempts that fail.
+    - homologation_rate: Share of attempts marked as homologated.
+    - grading_mode_mix: Share of attempts of each grading mode; other modes are always approved.
+    - simple_courses / bundles / courses_per_bundle / elective_courses: Size of the curriculum and of the
+      pool of courses outside the curriculum.
+    - start_year: Year of the first semester.
+    - seed: Seed of the random generator, so a configuration always produces the same data.
+    """
+    students: int
+    semesters: int = 8
+    courses_per_semester: int = 5
+    retake_rate: float = 0.1
+    failure_rate: float = 0.15
+    homologation_rate: float = 0.02
+    grading_mode_mix: Dict[str, float] = field(default_factory=lambda: {
+        ApproveSubjectLogic.NUMERIC_GRADING_MODE: 0.8,
+        ApproveSubjectLogic.PASS_FAIL_GRADING_MODE: 0.15,
+        'SIN MODO': 0.05,
+    })
+    simple_courses: int = 40
+    bundles: int = 6
+    courses_per_bundle: int = 15
+    elective_courses: int = 60
+    start_year: int = 2015
+    seed: int = 0
+
+
+@dataclass
+class SyntheticDataset:
+    """
+    Paths of the files of a generated dataset.
+    """
+    data_set_path: Path
+    curriculum_structure_path: Path
+    student_codes_path: Path
+    students: int
+    records: int
+
+
+class SyntheticDataGenerator:
+    # Header of the generated CSV files, a subset of the registrar extracts read by CSVReader
+    COLUMNS = [
+        'CODIGO', 'PERIODO', 'MATERIA', 'DESCRIPCION_NIVEL_MATERIA', 'NUMERO_CREDITOS', 'DESCRIPCION_CAMPUS',
+        'ESTATUS_CURSO', 'DESCRIPCION_MODO_DE_CALIFICACION', 'CALIFICACION_PARCIAL', 'CALIFICACION_FINAL', 'SECCION'
+    ]
+
+    def __init__(self, config: SyntheticDataConfig) -> None:
+        """
+        :param config: The parameters of the dataset.
+        """
+        self.config = config
+        self.random = np.random.default_rng(config.seed)
+
+    def _build_curriculum(self) -> Dict[str, Any]:
+        """
+        Builds a curriculum with simple courses and bundles of optional courses. Consecutive pairs of
+        bundles are related and share a few courses, so the curriculum has groups of related bundles.
+        """
+        config = self.config
+        simple_courses = [
+            {"code": f"SIMP-{1000 + number}", "name": f"Curso Simple {number}"}
+            for number in range(config.simple_courses)
+        ]
+
+        course_bundles: Dict[str, Any] = {}
+        for number in range(config.bundles):
+            courses = {
+                f"BLQ{number}-{2000 + course}": {"type": "OPTIONAL", "name": f"Electiva {number}.{course}"}
+                for course in range(config.courses_per_bundle)
+            }
+            related_bundles: List[str] = []
+            if number % 2 == 1:
+                # Share the first courses of the previous bundle
+                for course in range(min(3, config.courses_per_bundle)):
+                    courses[f"BLQ{number - 1}-{2000 + course}"] = {"type": "OPTIONAL", "name": "Electiva compartida"}
+                related_bundles.append(f"BLOQUE {number - 1}")
+            elif number + 1 < config.bundles:
+                related_bundles.append(f"BLOQUE {number + 1}")
+            course_bundles[f"BLOQUE {number}"] = {
+                "minimum_credits_to_pass": int(self.random.integers(6, 13)),
+                "related_bundles": related_bundles,
+                "courses": courses,
+            }
+        return {"simple_courses": simple_courses, "course_bundles": course_bundles}
+
+    @staticmethod
+    def _get_course_codes(curriculum: Dict[str, Any], elective_courses: int) -> List[str]:
+        course_codes = dict.fromkeys(course["code"] for course in curriculum["simple_courses"])
+        for bundle in curriculum["course_bundles"].values():
+            course_codes.update(dict.fromkeys(bundle["courses"].keys()))
+        course_codes.update(dict.fromkeys(f"EXTR-{3000 + number}" for number in range(elective_courses)))
+        return list(course_codes)
+
+    def _build_records(self, course_codes: List[str]) -> pd.DataFrame:
+        """
+        Builds the academic records of every student in a vectorized way.
+        """
+        config = self.config
+        random = self.random
+
+        # Number of semesters of each student and one row per (student, semester, course slot)
+        student_semesters = random.integers(1, config.semesters + 1, size=config.students)
+        student_rows = np.repeat(np.arange(config.students), student_semesters * config.courses_per_semester)
+        semester_starts = np.repeat(np.cumsum(student_semesters) - student_semesters, student_semesters)
+        semesters = np.repeat(
+            np.arange(int(student_semesters.sum())) - semester_starts, config.courses_per_semester
+        )
+        start_semesters = random.integers(0, 6, size=config.students)
+        semesters = semesters + start_semesters[student_rows]
+        courses = random.integers(0, len(course_codes), size=len(student_rows))
+
+        # Retakes repeat an attempt in the following semester
+        retakes = random.random(len(student_rows)) < config.retake_rate
+        student_rows = np.concatenate([student_rows, student_rows[retakes]])
+        semesters = np.concatenate([semesters, semesters[retakes] + 1])
+        courses = np.concatenate([courses, courses[retakes]])
+        record_count = len(student_rows)
+
+        grading_modes = np.array(list(config.grading_mode_mix.keys()), dtype=object)
+        mode_weights = np.array(list(config.grading_mode_mix.values()), dtype=np.float64)
+        modes = grading_modes[random.choice(len(grading_modes), size=record_count, p=mode_weights / mode_weights.sum())]
+
+        failed = random.random(record_count) < config.failure_rate
+        numeric_grades = np.where(
+            failed, random.uniform(1.5, 2.95, record_count), random.uniform(3.0, 5.0, record_count)
+        )
+        grades = np.char.mod('%.1f', numeric_grades).astype(object)
+        pass_fail = modes == ApproveSubjectLogic.PASS_FAIL_GRADING_MODE
+        grades[pass_fail] = np.where(failed[pass_fail], 'R', ApproveSubjectLogic.PASSING_LETTER_GRADE)
+        ungraded = ~pass_fail & (modes != ApproveSubjectLogic.NUMERIC_GRADING_MODE)
+        grades[ungraded] = ''
+
+        statuses = np.where(
+            random.random(record_count) < config.homologation_rate, ApproveSubjectLogic.HOMOLOGATED_STATUS, ''
+        ).astype(object)
+        course_credits = random.integers(1, 5, size=len(course_codes))
+        periods = np.char.add(
+            (config.start_year + semesters // 2).astype(str), np.where(semesters % 2 == 0, '10', '20')
+        ).astype(object)
+
+        records = pd.DataFrame({
+            'CODIGO': np.char.mod('%09d', 200000000 + student_rows).astype(object),
+            'PERIODO': periods,
+            'MATERIA': np.array(course_codes, dtype=object)[courses],
+            'DESCRIPCION_NIVEL_MATERIA': 'PREGRADO',
+            'NUMERO_CREDITOS': course_credits[courses],
+            'DESCRIPCION_CAMPUS': 'BOGOTA',
+            'ESTATUS_CURSO': statuses,
+            'DESCRIPCION_MODO_DE_CALIFICACION': modes,
+            'CALIFICACION_PARCIAL': '',
+            'CALIFICACION_FINAL': grades,
+            'SECCION': 1,
+        }, columns=SyntheticDataGenerator.COLUMNS)
+        # Registrar extracts list the records of each period together
+        return records.sort_values(['PERIODO', 'CODIGO'], kind='mergesort').reset_index(drop=True)
+
+    def generate(self, output_dir: Path) -> SyntheticDataset:
+        """
+        Generates the academic history CSV file, the curriculum JSON file and the student code list.
+
+        :param output_dir: The directory where the files are written.
+        :return: An instance of SyntheticDataset with the paths of the files.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        curriculum = self._build_curriculum()
+        records = self._build_records(
+            SyntheticDataGenerator._get_course_codes(curriculum, self.config.elective_courses)
+        )
+
+        dataset = SyntheticDataset(
+            data_set_path=output_dir / f"history-{self.config.students}.csv",
+            curriculum_structure_path=output_dir / f"curriculum-{self.config.students}.json",
+            student_codes_path=output_dir / f"student_codes-{self.config.students}.json",
+            students=self.config.students,
+            records=len(records)
+        )
+        records.to_csv(dataset.data_set_path, sep=';', index=False, encoding='utf-8')
+        with dataset.curriculum_structure_path.open('w', encoding='utf-8') as file:
+            json.dump(curriculum, file, ensure_ascii=False, indent=4)
+        with dataset.student_codes_path.open('w', encoding='utf-8') as file:
+            json.dump([int(code) for code in records['CODIGO'].unique()], file)
+        return dataset
@@ -0,0 +1,254 @@
+import json
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import numpy as np
+from utils.period import Period
+
+# pandas is only needed to build the store; lookups read the memory-mapped arrays with numpy
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class ApprovalSnapshotStore:
+    """
+    Persistent snapshots of the approvals of every student at each of its period boundaries.
+    The snapshot of a (student, period key) pair holds the subjects approved by the records of that
+    period or any earlier one, as a bitmap over the subjects of the dataset, and the sum of their credits.
+
+    Every file is a fixed-width .npy array, memory-mapped when the store is opened:
+    - student_codes.npy: The sorted student codes; the position of a code is its student row.
+    - snapshot_indptr.npy / snapshot_keys.npy: CSR arrays with the period key of each snapshot of a student.
+    - approved_bits.npy: Snapshot x word matrix; bit i of the row is subject ID i.
+    - approved_credits.npy: The approved credits of each snapshot.
+    - subject_indptr.npy / subject_ids.npy / subject_credits.npy: CSR arrays with every subject a
+      student took and the credits of its first record, the credits StudentRegistryManager reports.
+    - subjects.npy: The subject code of each subject ID.
+    - manifest.json: The format version, the hash of the data source and the array sizes.
+
+    The approval rules are the ones of StudentRegistryManager; records with an invalid period never
+    approve a subject, but their credits are kept when they are a subject's first record.
+    """
+    # Bump when the layout of the arrays changes
+    FORMAT_VERSION = 1
+    MANIFEST_FILE = 'manifest.json'
+    ARRAYS = [
+        'student_codes', 'snapshot_indptr', 'snapshot_keys', 'approved_bits', 'approved_credits',
+        'subject_indptr', 'subject_ids', 'subject_credits', 'subjects'
+    ]
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Opens a store written by build. The arrays are memory-mapped, so opening costs the same for any size.
+
+        :param directory: The directory of the store.
+        """
+        self.directory = Path(directory)
+        self.manifest = ApprovalSnapshotStore.read_manifest(self.directory)
+        if self.manifest is None:
+            raise ValueError(f"No approval snapshot store found in {self.directory}")
+        arrays = {
+            name: np.load(self.directory / f"{name}.npy", mmap_mode='r', allow_pickle=False)
+            for name in ApprovalSnapshotStore.ARRAYS
+        }
+        self.student_codes: np.ndarray = arrays['student_codes']
+        self.snapshot_indptr: np.ndarray = arrays['snapshot_indptr']
+        self.snapshot_keys: np.ndarray = arrays['snapshot_keys']
+        self.approved_bits: np.ndarray = arrays['approved_bits']
+        self.approved_credits: np.ndarray = arrays['approved_credits']
+        self.subject_indptr: np.ndarray = arrays['subject_indptr']
+        self.subject_ids: np.ndarray = arrays['subject_ids']
+        self.subject_credits: np.ndarray = arrays['subject_credits']
+        self.subjects: List[str] = arrays['subjects'].tolist()
+
+    @staticmethod
+    def read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+        """
+        :return: The manifest of the store in the directory, or None if there is no store of this format.
+        """
+        manifest_path = Path(directory) / ApprovalSnapshotStore.MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        with manifest_path.open('r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get('format_version') != ApprovalSnapshotStore.FORMAT_VERSION:
+            return None
+        return manifest
+
+    @staticmethod
+    def _factorize_sorted(values: 'pd.Series') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: A (ids, uniques) pair where uniques are the sorted distinct values as strings.
+        """
+        import pandas as pd
+        ids, uniques = pd.factorize(values.astype(str), sort=True)
+        return ids.astype(np.int64), np.asarray(uniques, dtype=str)
+
+    @staticmethod
+    def build(directory: Path, data: 'pd.DataFrame', source_hash: str = '') -> 'ApprovalSnapshotStore':
+        """
+        Builds the store in one pass over a dataset normalized by CSVReader and opens it.
+
+        :param directory: The directory of the store; a previous store in it is replaced.
+        :param data: The DataFrame loaded by CSVReader, with the approval and period key columns.
+        :param source_hash: The hash of the data source, used to notice that the store is stale.
+        :return: The opened ApprovalSnapshotStore.
+        """
+        from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+        from queries.period_queries import PeriodQueries
+
+        student_ids, student_codes = ApprovalSnapshotStore._factorize_sorted(data['CODIGO'])
+        subject_ids, subjects = ApprovalSnapshotStore._factorize_sorted(data['MATERIA'])
+        period_keys = data[PeriodQueries.PERIOD_KEY_COLUMN].to_numpy(dtype=np.int64)
+        approved = data[ApproveSubjectLogic.APPROVED_COLUMN].to_numpy(dtype=bool)
+        credits = data['NUMERO_CREDITOS'].to_numpy(dtype=np.float64)
+
+        # A stable sort keeps the file order of the records of the same student and period
+        order = np.lexsort((period_keys, student_ids))
+        student_ids, subject_ids = student_ids[order], subject_ids[order]
+        period_keys, approved, credits = period_keys[order], approved[order], credits[order]
+        student_count, subject_count = len(student_codes), len(subjects)
+
+        # Credits of every (student, subject) pair come from its first record
+        pairs = student_ids * subject_count + subject_ids
+        unique_pairs, first_records = np.unique(pairs, return_index=True)
+        pair_credits = credits[first_records]
+        subject_indptr = np.zeros(student_count + 1, dtype=np.int64)
+        subject_indptr[1:] = np.cumsum(np.bincount(student_ids[first_records], minlength=student_count))
+
+        # One snapshot per distinct (student, valid period key) pair, in period order
+        valid = period_keys != Period.INVALID_KEY
+        valid_rows = np.flatnonzero(valid)
+        valid_students, valid_keys = student_ids[valid_rows], period_keys[valid_rows]
+        starts = np.ones(len(valid_rows), dtype=bool)
+        starts[1:] = (valid_students[1:] != valid_students[:-1]) | (valid_keys[1:] != valid_keys[:-1])
+        snapshot_of_row = np.cumsum(starts) - 1
+        snapshot_students = valid_students[starts]
+        snapshot_keys = valid_keys[starts].astype(np.int32)
+        snapshot_count = len(snapshot_keys)
+        snapshot_indptr = np.zeros(student_count + 1, dtype=np.int64)
+        snapshot_indptr[1:] = np.cumsum(np.bincount(snapshot_students, minlength=student_count))
+
+        # Each subject enters the snapshot of its first approved attempt...
+        words = max(1, -(-subject_count // 64))
+        approved_bits = np.zeros((snapshot_count, words), dtype='<u8')
+        new_credits = np.zeros(snapshot_count, dtype=np.float64)
+        approved_rows = np.flatnonzero(approved[valid_rows])
+        _, first_approvals = np.unique(pairs[valid_rows][approved_rows], return_index=True)
+        approval_rows = approved_rows[first_approvals]
+        approval_snapshots = snapshot_of_row[approval_rows]
+        approval_subjects = subject_ids[valid_rows][approval_rows]
+        np.bitwise_or.at(
+            approved_bits,
+            (approval_snapshots, approval_subjects // 64),
+            np.left_shift(np.uint64(1), (approval_subjects % 64).astype(np.uint64))
+        )
+        approval_credits = pair_credits[np.searchsorted(unique_pairs, pairs[valid_rows][approval_rows])]
+        np.add.at(new_credits, approval_snapshots, np.nan_to_num(approval_credits))
+
+        # ...and stays in every later snapshot of the student
+        positions = np.arange(snapshot_count) - snapshot_indptr[snapshot_students]
+        by_position = np.argsort(positions, kind='stable')
+        position_bounds = np.searchsorted(positions[by_position], np.arange(1, positions.max(initial=0) + 2))
+        for position in range(1, len(position_bounds)):
+            snapshots = by_position[position_bounds[position - 1]:position_bounds[position]]
+            approved_bits[snapshots] |= approved_bits[snapshots - 1]
+        cumulative_credits = np.cumsum(new_credits)
+        first_snapshots = snapshot_indptr[snapshot_students]
+        approved_credits = cumulative_credits - cumulative_credits[first_snapshots] + new_credits[first_snapshots]
+
+        arrays = {
+            'student_codes': student_codes,
+            'snapshot_indptr': snapshot_indptr,
+            'snapshot_keys': snapshot_keys,
+            'approved_bits': approved_bits,
+            'approved_credits': approved_credits,
+            'subject_indptr': subject_indptr,
+            'subject_ids': (unique_pairs % max(subject_count, 1)).astype(np.int32),
+            'subject_credits': pair_credits,
+            'subjects': subjects,
+        }
+
+        # Write the new store next to the old one and swap it in
+        directory = Path(directory)
+        temporary_directory = directory.with_name(directory.name + '.tmp')
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+        temporary_directory.mkdir(parents=True)
+        for name, array in arrays.items():
+            np.save(temporary_directory / f"{name}.npy", array, allow_pickle=False)
+        with (temporary_directory / ApprovalSnapshotStore.MANIFEST_FILE).open('w', encoding='utf-8') as file:
+            json.dump({
+                'format_version': ApprovalSnapshotStore.FORMAT_VERSION,
+                'source_hash': source_hash,
+                'students': student_count,
+                'subjects': subject_count,
+                'snapshots': snapshot_count,
+                'words': words,
+            }, file, indent=4)
+        shutil.rmtree(directory, ignore_errors=True)
+        temporary_directory.rename(directory)
+        print(f"Approval snapshot store written to {directory}: {student_count} students, "
+              f"{snapshot_count} snapshots.")
+        return ApprovalSnapshotStore(directory)
+
+    def get_student_row(self, student_code: str) -> Optional[int]:
+        """
+        :return: The row of a student in the store, or None if the student has no records.
+        """
+        row = int(np.searchsorted(self.student_codes, str(student_code)))
+        if row < len(self.student_codes) and self.student_codes[row] == str(student_code):
+            return row
+        return None
+
+    def get_snapshot(self, student_row: int, specified_period: str) -> Optional[int]:
+        """
+        :param student_row: The row of the student, from get_student_row.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :return: The index of the latest snapshot before the period, or None if the student has no record before it.
+        """
+        start, stop = int(self.snapshot_indptr[student_row]), int(self.snapshot_indptr[student_row + 1])
+        position = start + int(np.searchsorted(self.snapshot_keys[start:stop], Period.to_key(specified_period))) - 1
+        return position if position >= start else None
+
+    def get_subject_map(self, student_row: int, snapshot: Optional[int]) -> Dict[str, Tuple[bool, float]]:
+        """
+        Builds the subject code -> (approved, credits) map of StudentRegistryManager from a snapshot.
+
+        :param student_row: The row of the student, from get_student_row.
+        :param snapshot: The snapshot of the cutoff, from get_snapshot; None when nothing is approved yet.
+        :return: A dictionary keyed by subject code with every subject the student took.
+        """
+        start, stop = int(self.subject_indptr[student_row]), int(self.subject_indptr[student_row + 1])
+        words = self.approved_bits[snapshot].tolist() if snapshot is not None else None
+        subject_map: Dict[str, Tuple[bool, float]] = {}
+        for subject_id, credits in zip(self.subject_ids[start:stop].tolist(), self.subject_credits[start:stop].tolist()):
+            approved = words is not None and bool(words[subject_id >> 6] >> (subject_id & 63) & 1)
+            subject_map[self.subjects[subject_id]] = (approved, credits)
+        return subject_map
+
+    def get_approved_subjects(self, student_code: str, specified_period: str) -> List[str]:
+        """
+        :return: The subjects a student approved before a period, in subject code order.
+        """
+        student_row = self.get_student_row(student_code)
+        if student_row is None:
+            return []
+        snapshot = self.get_snapshot(student_row, specified_period)
+        if snapshot is None:
+            return []
+        bits = np.unpackbits(
+            self.approved_bits[snapshot].view(np.uint8), count=len(self.subjects), bitorder='little'
+        )
+        return [self.subjects[subject_id] for subject_id in np.flatnonzero(bits).tolist()]
+
+    def get_approved_credits(self, student_code: str, specified_period: str) -> float:
+        """
+        :return: The credits of the subjects a student approved before a period; records without credits count as 0.
+        """
+        student_row = self.get_student_row(student_code)
+        snapshot = None if student_row is None else self.get_snapshot(student_row, specified_period)
+        return 0.0 if snapshot is None else float(self.approved_credits[snapshot])
+
+    def __repr__(self) -> str:
+        return (f"ApprovalSnapshotStore(directory={self.directory}, students={self.manifest['students']}, "
+                f"snapshots={self.manifest['snapshots']})")
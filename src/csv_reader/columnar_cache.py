@@ -0,0 +1,208 @@
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# pandas is imported where it is used, so the lite engine can read a cache with NumPy alone
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class ColumnarCache:
+    """
+    On-disk columnar cache of a loaded CSV file, stored as one NumPy .npy file per column.
+
+    Numeric and boolean columns are stored as-is and memory-mapped when loaded. Every other column
+    is stored as categorical integer codes (memory-mapped) plus a small file with its categories.
+    The cache is keyed by the size, modification time and SHA-256 hash of the source file.
+    """
+    # Bump when the layout or the normalization of the cached data changes
+    FORMAT_VERSION = 1
+    MANIFEST_FILE = 'manifest.json'
+
+    def __init__(self, cache_dir: Path, source_path: Path, variant: str = 'default') -> None:
+        """
+        :param cache_dir: Root directory where caches are stored.
+        :param source_path: The CSV file being cached.
+        :param variant: Identifies the loading options, so different options never share a cache.
+        """
+        self.source_path = Path(source_path)
+        self.variant = variant
+        self.directory = Path(cache_dir) / f"{self.source_path.stem}-{variant}"
+
+    @staticmethod
+    def compute_file_hash(file_path: Path) -> str:
+        """
+        Computes the SHA-256 hash of a file, reading it in chunks.
+
+        :param file_path: The file to hash.
+        :return: The hexadecimal digest.
+        """
+        digest = hashlib.sha256()
+        with Path(file_path).open('rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        manifest_path = self.directory / ColumnarCache.MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        with manifest_path.open('r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _write_manifest(self, directory: Path, manifest: Dict[str, Any]) -> None:
+        with (directory / ColumnarCache.MANIFEST_FILE).open('w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=4)
+
+    def is_valid(self) -> bool:
+        """
+        Checks whether the cache matches the current source file. The hash is only computed when the
+        size matches but the modification time changed; an identical hash refreshes the stored time.
+
+        :return: True if the cache can be loaded, False otherwise.
+        """
+        manifest = self._read_manifest()
+        if manifest is None or manifest.get('format_version') != ColumnarCache.FORMAT_VERSION:
+            return False
+
+        source = manifest['source']
+        stat = self.source_path.stat()
+        if source['size'] != stat.st_size:
+            return False
+        if source['mtime_ns'] != stat.st_mtime_ns:
+            if source['sha256'] != ColumnarCache.compute_file_hash(self.source_path):
+                return False
+            source['mtime_ns'] = stat.st_mtime_ns
+            self._write_manifest(self.directory, manifest)
+        return True
+
+    @staticmethod
+    def save_columns(directory: Path, data: 'pd.DataFrame') -> List[Dict[str, Any]]:
+        """
+        Writes every column of a DataFrame to a directory, one .npy file per column.
+
+        :param directory: The destination directory, which must exist.
+        :param data: The DataFrame to write.
+        :return: The description of each column, needed by load_columns.
+        """
+        import pandas as pd
+
+        columns: List[Dict[str, Any]] = []
+        for position, name in enumerate(data.columns):
+            series = data[name]
+            if pd.api.types.is_bool_dtype(series) or (
+                pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype)
+            ):
+                np.save(directory / f"{position}.npy", series.to_numpy())
+                columns.append({'name': name, 'kind': 'numeric', 'dtype': str(series.dtype)})
+            else:
+                categorical = series.astype('category')
+                categories = np.array([str(category) for category in categorical.cat.categories], dtype=str)
+                np.save(directory / f"{position}.codes.npy", categorical.cat.codes.to_numpy())
+                np.save(directory / f"{position}.categories.npy", categories)
+                columns.append({'name': name, 'kind': 'categorical', 'dtype': 'category'})
+        return columns
+
+    @staticmethod
+    def load_arrays(
+        directory: Path,
+        columns: List[Dict[str, Any]],
+        names: Optional[List[str]] = None
+    ) -> Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """
+        Reads the columns written by save_columns as NumPy arrays, memory-mapping the column files.
+
+        :param directory: The directory the columns were written to.
+        :param columns: The column descriptions returned by save_columns.
+        :param names: Optional subset of column names to read; every column is read by default.
+        :return: A (values, None) tuple for each numeric column and a (codes, categories) tuple for each
+                 categorical column, keyed by column name.
+        """
+        loaded: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]] = {}
+        for position, column in enumerate(columns):
+            if names is not None and column['name'] not in names:
+                continue
+            if column['kind'] == 'categorical':
+                loaded[column['name']] = (
+                    np.load(directory / f"{position}.codes.npy", mmap_mode='r'),
+                    np.load(directory / f"{position}.categories.npy")
+                )
+            else:
+                loaded[column['name']] = (np.load(directory / f"{position}.npy", mmap_mode='r'), None)
+        return loaded
+
+    @staticmethod
+    def load_columns(
+        directory: Path,
+        columns: List[Dict[str, Any]],
+        names: Optional[List[str]] = None
+    ) -> 'pd.DataFrame':
+        """
+        Reads the columns written by save_columns, memory-mapping the column files.
+
+        :param directory: The directory the columns were written to.
+        :param columns: The column descriptions returned by save_columns.
+        :param names: Optional subset of column names to read; every column is read by default.
+        :return: The DataFrame.
+        """
+        import pandas as pd
+
+        loaded: Dict[str, Any] = {}
+        for name, (values, categories) in ColumnarCache.load_arrays(directory, columns, names).items():
+            if categories is None:
+                loaded[name] = values
+            else:
+                loaded[name] = pd.Categorical.from_codes(values, categories=categories.tolist(), validate=False)
+        return pd.DataFrame(loaded, copy=False)
+
+    def get_manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        :return: The manifest of the cache, with its column descriptions, or None if the cache is missing or stale.
+        """
+        if not self.is_valid():
+            return None
+        return self._read_manifest()
+
+    def load(self) -> Optional['pd.DataFrame']:
+        """
+        Loads the cached DataFrame, memory-mapping the column files.
+
+        :return: The cached DataFrame, or None if the cache is missing or stale.
+        """
+        manifest = self.get_manifest()
+        if manifest is None:
+            return None
+        return ColumnarCache.load_columns(self.directory, manifest['columns'])
+
+    def save(self, data: 'pd.DataFrame') -> None:
+        """
+        Stores a DataFrame in the cache, replacing any previous version atomically.
+
+        :param data: The normalized DataFrame to cache.
+        """
+        stat = self.source_path.stat()
+        manifest: Dict[str, Any] = {
+            'format_version': ColumnarCache.FORMAT_VERSION,
+            'variant': self.variant,
+            'source': {
+                'path': str(self.source_path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': ColumnarCache.compute_file_hash(self.source_path),
+            },
+            'rows': len(data),
+            'columns': [],
+        }
+
+        temporary_directory = self.directory.with_name(self.directory.name + '.tmp')
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+        temporary_directory.mkdir(parents=True)
+
+        manifest['columns'] = ColumnarCache.save_columns(temporary_directory, data)
+
+        self._write_manifest(temporary_directory, manifest)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        temporary_directory.rename(self.directory)
@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.profiler import Profiler
+
+
+class CourseCatalog:
+    """
+    Canonical credits of every subject of the dataset, built once from all of its records.
+    The canonical value of a subject is the most frequent NUMERO_CREDITOS of its records; ties keep
+    the smallest value. Subjects recorded with several credit values are reported as diagnostics.
+
+    Curriculum files may also give the credits of a course with a `credits` attribute, which takes
+    precedence over the dataset.
+    """
+    def __init__(self, credits: Dict[str, float], conflicts: Optional[Dict[str, List[float]]] = None) -> None:
+        """
+        :param credits: The canonical credits of each subject code.
+        :param conflicts: The distinct credit values of the subjects recorded with more than one.
+        """
+        self.credits = credits
+        self.conflicts = conflicts or {}
+
+    @classmethod
+    def from_records(cls, data: pd.DataFrame) -> 'CourseCatalog':
+        """
+        Builds the catalog from the MATERIA and NUMERO_CREDITOS columns of the dataset.
+        Records without a subject or without credits are ignored.
+
+        :param data: The DataFrame loaded by CSVReader.
+        :return: An instance of CourseCatalog.
+        """
+        records = data[['MATERIA', 'NUMERO_CREDITOS']].dropna()
+        counts = (
+            records.groupby(['MATERIA', 'NUMERO_CREDITOS'], observed=True, sort=False)
+            .size()
+            .reset_index(name='RECORDS')
+        )
+        counts['MATERIA'] = counts['MATERIA'].astype(str)
+        counts['NUMERO_CREDITOS'] = counts['NUMERO_CREDITOS'].astype(np.float64)
+        counts = counts.sort_values(
+            ['MATERIA', 'RECORDS', 'NUMERO_CREDITOS'], ascending=[True, False, True], kind='stable'
+        )
+
+        canonical = counts.drop_duplicates('MATERIA', keep='first')
+        credits = dict(zip(canonical['MATERIA'].tolist(), canonical['NUMERO_CREDITOS'].tolist()))
+
+        conflicts: Dict[str, List[float]] = {}
+        repeated = counts[counts.duplicated('MATERIA', keep=False)]
+        for subject, values in repeated.groupby('MATERIA', sort=True)['NUMERO_CREDITOS']:
+            conflicts[subject] = sorted(values.tolist())
+            Profiler.report_diagnostic(
+                "Subjects recorded with conflicting credits",
+                f"{subject} ({', '.join(f'{value:g}' for value in conflicts[subject])})"
+            )
+        return cls(credits, conflicts)
+
+    @staticmethod
+    def read_curriculum_credits(file_path: Path) -> Dict[str, float]:
+        """
+        Reads the `credits` attribute of the simple courses and bundle courses of a curriculum file.
+
+        :param file_path: The Path to the curriculum JSON file.
+        :return: The credits of each course that declares them.
+        """
+        with file_path.open('r', encoding='utf-8') as file:
+            data = json.load(file)
+
+        curriculum_credits: Dict[str, float] = {}
+        for course in data.get("simple_courses", []):
+            if course.get("credits") is not None:
+                curriculum_credits[course["code"]] = float(course["credits"])
+        for bundle_data in data.get("course_bundles", {}).values():
+            for code, course_data in bundle_data.get("courses", {}).items():
+                if course_data.get("credits") is not None:
+                    curriculum_credits[code] = float(course_data["credits"])
+        return curriculum_credits
+
+    def get_credits(self, subject_code: str) -> Optional[float]:
+        """
+        :return: The canonical credits of a subject, or None if the dataset has no credits for it.
+        """
+        return self.credits.get(str(subject_code))
+
+    def get_course_credits(
+        self,
+        course_codes: List[str],
+        curriculum_credits: Optional[Dict[str, float]] = None
+    ) -> np.ndarray:
+        """
+        Looks up the credits of a list of courses, such as the course IDs of a compiled curriculum.
+        Courses without credits in the curriculum or in the dataset count as 0 credits.
+
+        :param course_codes: The course codes to look up.
+        :param curriculum_credits: Credits declared by the curriculum, which take precedence over the dataset.
+        :return: A float array with the credits of each course.
+        """
+        curriculum_credits = curriculum_credits or {}
+        course_credits = np.zeros(len(course_codes), dtype=np.float64)
+        for position, code in enumerate(course_codes):
+            catalog_credits = self.credits.get(code)
+            if code in curriculum_credits:
+                course_credits[position] = curriculum_credits[code]
+                if catalog_credits is not None and catalog_credits != curriculum_credits[code]:
+                    Profiler.report_diagnostic("Curriculum credits differ from the dataset for subject code", code)
+            elif catalog_credits is not None:
+                course_credits[position] = catalog_credits
+            else:
+                Profiler.report_diagnostic("No catalog credits found for subject code", code)
+        return course_credits
+
+    def __len__(self) -> int:
+        return len(self.credits)
+
+    def __repr__(self) -> str:
+        return f"CourseCatalog(subjects={len(self.credits)}, conflicts={len(self.conflicts)})"
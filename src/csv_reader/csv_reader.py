@@ -1,28 +1,290 @@
 import pandas as pd
 from pathlib import Path
-from typing import Optional
+from typing import AbstractSet, Any, Optional, Tuple
+from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+from csv_reader.student_index import StudentIndex
+from csv_reader.course_catalog import CourseCatalog
+from csv_reader.columnar_cache import ColumnarCache
+from csv_reader.period_store import PeriodStore
+from csv_reader.sqlite_store import SQLiteStore
+from queries.period_queries import PeriodQueries
+from utils.period import Period
+from utils.profiler import Profiler
 
 class CSVReader:
     _instance: Optional['CSVReader'] = None
     _csv_data: Optional[pd.DataFrame] = None
+    _student_index: Optional[StudentIndex] = None
+    _course_catalog: Optional[CourseCatalog] = None
+    _sqlite_store: Optional[SQLiteStore] = None
+    # Resolved path of the loaded data source; later calls with another path do not reload it
+    _file_path: Optional[Path] = None
+    # (data source, period limit) of a load restricted to some students, from which the catalog is built
+    _partial_source: Optional[Tuple[Path, Optional[str]]] = None
 
-    def __new__(cls, file_path: Path) -> 'CSVReader':
+    # Columns read by the pipeline; the lean loading mode skips every other column
+    REQUIRED_COLUMNS = [
+        'CODIGO', 'PERIODO', 'MATERIA', 'ESTATUS_CURSO', 'DESCRIPCION_MODO_DE_CALIFICACION',
+        'CALIFICACION_FINAL', 'NUMERO_CREDITOS'
+    ]
+    # Repeated strings are loaded as categoricals and credits as a compact float
+    LEAN_DTYPES = {
+        'CODIGO': str,
+        'PERIODO': str,
+        'MATERIA': 'category',
+        'ESTATUS_CURSO': 'category',
+        'DESCRIPCION_MODO_DE_CALIFICACION': 'category',
+        'CALIFICACION_FINAL': 'category',
+        'NUMERO_CREDITOS': 'float32',
+    }
+    # Rows parsed at once when a CSV file is filtered by student while it is read
+    CHUNK_ROWS = 200000
+
+    def __new__(
+        cls,
+        file_path: Path,
+        cache_dir: Optional[Path] = None,
+        lean: bool = False,
+        until_period: Optional[str] = None,
+        student_codes: Optional[AbstractSet[str]] = None
+    ) -> 'CSVReader':
         if cls._instance is None:
             cls._instance = super(CSVReader, cls).__new__(cls)
-            cls._instance._load_csv(file_path)
+            cls._instance._load_csv(file_path, cache_dir, lean, until_period, student_codes)
+        elif cls._file_path is not None and Path(file_path).resolve() != cls._file_path:
+            print(f"Ignoring {file_path}: CSVReader already holds {cls._file_path}. "
+                  f"Call CSVReader.reset() before loading another dataset.")
         return cls._instance
 
-    def _load_csv(self, file_path: Path) -> None:
-        if CSVReader._csv_data is None:
+    def _load_csv(
+        self,
+        file_path: Path,
+        cache_dir: Optional[Path] = None,
+        lean: bool = False,
+        until_period: Optional[str] = None,
+        student_codes: Optional[AbstractSet[str]] = None
+    ) -> None:
+        """
+        Loads the dataset, or opens it when it is a SQLite store.
+
+        :param file_path: Path to the CSV file, to the directory of a period store or to a SQLite store.
+        :param cache_dir: Columnar cache directory, if any.
+        :param lean: Whether to load only the required columns with compact dtypes.
+        :param until_period: Optional exclusive upper limit period of the partitions loaded from a period store.
+        :param student_codes: Optional student codes whose records are the only ones kept, such as the
+                              students of a shard; the rows of other students are dropped while reading.
+        """
+        if CSVReader._csv_data is None and CSVReader._sqlite_store is None:
+            if SQLiteStore.is_store(file_path):
+                # The records stay on disk; the queries read them through the indexes of the store
+                CSVReader._sqlite_store = SQLiteStore(file_path)
+                CSVReader._file_path = Path(file_path).resolve()
+                print(f"SQLite store {file_path} opened with {CSVReader._sqlite_store.get_record_count()} records.")
+                return
             try:
-                CSVReader._csv_data = pd.read_csv(file_path, sep=';', encoding='utf-8')
+                if PeriodStore.is_store(file_path):
+                    # A period store is already columnar and only loads the partitions before the cutoff
+                    csv_data = CSVReader._read_store(file_path, lean, until_period, student_codes)
+                else:
+                    csv_data = CSVReader._read_csv_with_cache(file_path, cache_dir, lean, student_codes)
+                if student_codes is not None:
+                    CSVReader._partial_source = (file_path, until_period)
+                CSVReader._report_invalid_periods(csv_data)
+                with Profiler.stage('student_index'):
+                    CSVReader._student_index = StudentIndex(csv_data['CODIGO'])
+                CSVReader._csv_data = csv_data
+                CSVReader._file_path = Path(file_path).resolve()
                 print("CSV file loaded successfully.")
+                print(f"Loaded {len(csv_data)} records using "
+                      f"{CSVReader.get_memory_footprint() / 2**20:.1f} MB of memory.")
             except pd.errors.ParserError as e:
                 print(f"Error loading CSV file: {e}")
                 CSVReader._csv_data = None
+                CSVReader._student_index = None
         else:
             print("CSV file already loaded.")
 
+    @staticmethod
+    def _read_csv_with_cache(
+        file_path: Path,
+        cache_dir: Optional[Path],
+        lean: bool,
+        student_codes: Optional[AbstractSet[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Parses the CSV file, reusing the columnar cache when the file has not changed since it was built.
+        A load restricted to some students never writes the cache, which must hold the whole dataset.
+        """
+        cache_variant = 'lean' if lean else 'default'
+        cache = ColumnarCache(cache_dir, file_path, cache_variant) if cache_dir is not None else None
+        with Profiler.stage('cache_load'):
+            csv_data = cache.load() if cache is not None else None
+        if csv_data is not None:
+            print("CSV data loaded from the columnar cache.")
+            return CSVReader._filter_students(csv_data, student_codes)
+
+        if lean:
+            csv_data = CSVReader._read_csv_lean(file_path, student_codes)
+        else:
+            csv_data = CSVReader._read_csv(file_path, student_codes)
+        if student_codes is not None:
+            if cache is not None:
+                print("The columnar cache is only written by runs that load every student.")
+        elif cache is not None:
+            with Profiler.stage('cache_save'):
+                cache.save(csv_data)
+            print(f"Columnar cache written to {cache.directory}")
+        return csv_data
+
+    @staticmethod
+    def _filter_students(data: pd.DataFrame, student_codes: Optional[AbstractSet[str]]) -> pd.DataFrame:
+        """
+        :return: The rows of the given students, in their original order; every row when student_codes is None.
+        """
+        if student_codes is None:
+            return data
+        Profiler.count('dataframe_filters')
+        return data[data['CODIGO'].isin(student_codes).to_numpy()].reset_index(drop=True)
+
+    @staticmethod
+    def _parse_csv(file_path: Path, student_codes: Optional[AbstractSet[str]], **read_options: Any) -> pd.DataFrame:
+        """
+        Parses the CSV file. When student codes are given, the file is read in chunks and only the rows
+        of those students are kept, so the memory use follows the selected students instead of the file.
+        """
+        if student_codes is None:
+            return pd.read_csv(file_path, sep=';', encoding='utf-8', **read_options)
+        chunks = [
+            CSVReader._filter_students(chunk, student_codes)
+            for chunk in pd.read_csv(file_path, sep=';', encoding='utf-8', chunksize=CSVReader.CHUNK_ROWS, **read_options)
+        ]
+        if not chunks:
+            return pd.read_csv(file_path, sep=';', encoding='utf-8', nrows=0, **read_options)
+        return pd.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def _read_csv(file_path: Path, student_codes: Optional[AbstractSet[str]] = None) -> pd.DataFrame:
+        """
+        Parses the CSV file and normalizes it for the queries.
+
+        :param file_path: Path to the semicolon-separated CSV file.
+        :param student_codes: Optional student codes whose records are the only ones kept.
+        :return: The normalized DataFrame, sorted by student code and period key.
+        """
+        with Profiler.stage('csv_parse'):
+            csv_data = CSVReader._parse_csv(file_path, student_codes, dtype={'CODIGO': str, 'PERIODO': str})
+        # Evaluate the approval rules for every record once, in a single vectorized pass
+        with Profiler.stage('approval_column'):
+            csv_data[ApproveSubjectLogic.APPROVED_COLUMN] = ApproveSubjectLogic.compute_approved_column(csv_data)
+        # Convert the periods once into integer keys
+        with Profiler.stage('period_keys'):
+            csv_data[PeriodQueries.PERIOD_KEY_COLUMN] = PeriodQueries.compute_period_keys(csv_data['PERIODO'])
+        # Group each student's records into a contiguous block sorted by period
+        with Profiler.stage('sort_by_student'):
+            csv_data['CODIGO'] = csv_data['CODIGO'].astype(str)
+            return StudentIndex.sort_by_student(csv_data, PeriodQueries.PERIOD_KEY_COLUMN)
+
+    @staticmethod
+    def _read_csv_lean(file_path: Path, student_codes: Optional[AbstractSet[str]] = None) -> pd.DataFrame:
+        """
+        Parses only the required columns of the CSV file with compact dtypes and normalizes them.
+        Student codes and periods are turned into categoricals once the data is sorted.
+
+        :param file_path: Path to the semicolon-separated CSV file.
+        :param student_codes: Optional student codes whose records are the only ones kept.
+        :return: The normalized DataFrame, sorted by student code and period key.
+        """
+        with Profiler.stage('csv_parse'):
+            csv_data = CSVReader._parse_csv(
+                file_path, student_codes,
+                usecols=lambda column: column in CSVReader.REQUIRED_COLUMNS,
+                dtype=CSVReader.LEAN_DTYPES
+            )
+            if student_codes is not None:
+                # Chunks with different categories are concatenated as plain values
+                for column, dtype in CSVReader.LEAN_DTYPES.items():
+                    if dtype == 'category' and column in csv_data.columns:
+                        csv_data[column] = csv_data[column].astype('category')
+        missing_columns = [
+            column for column in CSVReader.REQUIRED_COLUMNS
+            if column not in csv_data.columns and column != 'ESTATUS_CURSO'
+        ]
+        if missing_columns:
+            raise pd.errors.ParserError(f"Missing required columns: {', '.join(missing_columns)}")
+
+        with Profiler.stage('approval_column'):
+            csv_data[ApproveSubjectLogic.APPROVED_COLUMN] = ApproveSubjectLogic.compute_approved_column(csv_data)
+        with Profiler.stage('period_keys'):
+            csv_data[PeriodQueries.PERIOD_KEY_COLUMN] = PeriodQueries.compute_period_keys(csv_data['PERIODO'])
+        with Profiler.stage('sort_by_student'):
+            csv_data = StudentIndex.sort_by_student(csv_data, PeriodQueries.PERIOD_KEY_COLUMN)
+            csv_data['CODIGO'] = csv_data['CODIGO'].astype('category')
+            csv_data['PERIODO'] = csv_data['PERIODO'].astype('category')
+        return csv_data
+
+    @staticmethod
+    def _read_store(
+        store_path: Path,
+        lean: bool,
+        until_period: Optional[str],
+        student_codes: Optional[AbstractSet[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Loads the records of a period store before the given period.
+
+        :param store_path: Path to the directory of the period store.
+        :param lean: Whether to load only the required columns with compact dtypes.
+        :param until_period: Optional exclusive upper limit period in YYYYXZ format.
+        :param student_codes: Optional student codes whose records are the only ones kept.
+        :return: The normalized DataFrame, sorted by student code and period key.
+        """
+        store = PeriodStore(store_path)
+        with Profiler.stage('store_load'):
+            csv_data = store.load(until_period, CSVReader.REQUIRED_COLUMNS if lean else None, student_codes)
+        if not lean:
+            return csv_data
+        csv_data['NUMERO_CREDITOS'] = csv_data['NUMERO_CREDITOS'].astype(CSVReader.LEAN_DTYPES['NUMERO_CREDITOS'])
+        return csv_data
+
+    @staticmethod
+    def _read_catalog_records(file_path: Path, until_period: Optional[str]) -> pd.DataFrame:
+        """
+        Reads the subject and credit columns of every record of a CSV file or of the partitions of a
+        period store before the given period.
+        """
+        catalog_columns = ['MATERIA', 'NUMERO_CREDITOS']
+        if PeriodStore.is_store(file_path):
+            return PeriodStore(file_path).load(until_period, ['CODIGO'] + catalog_columns)[catalog_columns]
+        return pd.read_csv(
+            file_path, sep=';', encoding='utf-8', usecols=catalog_columns, dtype={'MATERIA': 'category'}
+        )
+
+    @staticmethod
+    def _report_invalid_periods(csv_data: pd.DataFrame) -> None:
+        invalid_periods = PeriodQueries.get_invalid_periods(
+            csv_data['PERIODO'], csv_data[PeriodQueries.PERIOD_KEY_COLUMN]
+        )
+        if invalid_periods:
+            invalid_count = int((csv_data[PeriodQueries.PERIOD_KEY_COLUMN] == Period.INVALID_KEY).sum())
+            examples = ", ".join(repr(period) for period in invalid_periods[:5])
+            print(f"Found {invalid_count} records with invalid PERIODO values ({examples}); "
+                  f"they are excluded from every period cutoff.")
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Releases the loaded data, so the next CSVReader call loads a dataset again.
+        """
+        CSVReader._instance = None
+        CSVReader._csv_data = None
+        CSVReader._student_index = None
+        CSVReader._course_catalog = None
+        CSVReader._partial_source = None
+        CSVReader._file_path = None
+        if CSVReader._sqlite_store is not None:
+            CSVReader._sqlite_store.close()
+        CSVReader._sqlite_store = None
+
     @staticmethod
     def get_data() -> Optional[pd.DataFrame]:
         if CSVReader._csv_data is not None:
@@ -30,3 +292,51 @@ class CSVReader:
         else:
             print("No CSV file loaded.")
             return None
+
+    @staticmethod
+    def get_student_index() -> Optional[StudentIndex]:
+        if CSVReader._student_index is not None:
+            return CSVReader._student_index
+        else:
+            print("No student index built.")
+            return None
+
+    @staticmethod
+    def get_sqlite_store() -> Optional[SQLiteStore]:
+        """
+        :return: The SQLite store the records are read from, or None when they are loaded in memory.
+        """
+        return CSVReader._sqlite_store
+
+    @staticmethod
+    def get_course_catalog() -> Optional[CourseCatalog]:
+        """
+        Returns the course catalog of the loaded dataset, building it on first use. When only some
+        students were loaded, the catalog is built from the subject and credit columns of every record
+        of the data source, so it does not depend on the students that were selected.
+
+        :return: An instance of CourseCatalog, or None if no data is loaded.
+        """
+        if CSVReader._csv_data is None:
+            print("No CSV file loaded.")
+            return None
+        if CSVReader._course_catalog is None:
+            with Profiler.stage('course_catalog'):
+                if CSVReader._partial_source is not None:
+                    catalog_records = CSVReader._read_catalog_records(*CSVReader._partial_source)
+                else:
+                    catalog_records = CSVReader._csv_data
+                CSVReader._course_catalog = CourseCatalog.from_records(catalog_records)
+            print(f"Course catalog built with {len(CSVReader._course_catalog)} subjects.")
+        return CSVReader._course_catalog
+
+    @staticmethod
+    def get_memory_footprint() -> int:
+        """
+        Returns the memory used by the loaded data, including the contents of string columns.
+
+        :return: The memory footprint in bytes, or 0 if no data is loaded.
+        """
+        if CSVReader._csv_data is None:
+            return 0
+        return int(CSVReader._csv_data.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,308 @@
+import json
+import shutil
+from pathlib import Path
+from typing import AbstractSet, Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+from csv_reader.columnar_cache import ColumnarCache
+from queries.period_queries import PeriodQueries
+from utils.period import Period
+
+
+class PeriodStore:
+    """
+    Persistent, append-only dataset partitioned by period. Each partition holds the normalized records
+    of one PERIODO value, sorted by student code and stored in the ColumnarCache column layout.
+
+    The store directory contains:
+    - manifest.json: The schema, the period index (one entry per partition) and the ingested files.
+    - students.json: The student index, mapping each student code to the periods holding its records.
+    - partitions/<PERIODO>/: The columns of each partition.
+    """
+    # Bump when the layout or the normalization of the stored data changes
+    FORMAT_VERSION = 1
+    MANIFEST_FILE = 'manifest.json'
+    STUDENT_INDEX_FILE = 'students.json'
+    PARTITIONS_DIRECTORY = 'partitions'
+
+    # Columns that must be present in every extract; ESTATUS_CURSO is optional, as in CSVReader
+    REQUIRED_COLUMNS = ['CODIGO', 'PERIODO', 'MATERIA', 'DESCRIPCION_MODO_DE_CALIFICACION', 'CALIFICACION_FINAL',
+                        'NUMERO_CREDITOS']
+    # Text columns are always read as strings, even when an extract only holds numeric-looking values
+    TEXT_COLUMNS = ['CODIGO', 'PERIODO', 'MATERIA', 'ESTATUS_CURSO', 'DESCRIPCION_MODO_DE_CALIFICACION',
+                    'CALIFICACION_FINAL']
+    # Columns computed at ingestion time, never read from the extracts
+    DERIVED_COLUMNS = [ApproveSubjectLogic.APPROVED_COLUMN, PeriodQueries.PERIOD_KEY_COLUMN]
+
+    def __init__(self, store_dir: Path) -> None:
+        """
+        :param store_dir: The directory of the store. It is created by the first ingestion.
+        """
+        self.directory = Path(store_dir)
+
+    @staticmethod
+    def is_store(path: Path) -> bool:
+        """
+        :return: True if the path is the directory of a period store.
+        """
+        return (Path(path) / PeriodStore.MANIFEST_FILE).exists()
+
+    @staticmethod
+    def compute_source_hash(data_set_path: Path) -> str:
+        """
+        Hashes a data source, so stores derived from it can notice that it changed. A period store is
+        rewritten through its manifest, so the manifest identifies its content.
+
+        :param data_set_path: Path to a CSV file or to the directory of a period store.
+        :return: The SHA-256 hash of the CSV file or of the manifest of the period store.
+        """
+        if PeriodStore.is_store(data_set_path):
+            data_set_path = Path(data_set_path) / PeriodStore.MANIFEST_FILE
+        return ColumnarCache.compute_file_hash(data_set_path)
+
+    @staticmethod
+    def _write_json(file_path: Path, content: Any) -> None:
+        temporary_path = file_path.with_name(file_path.name + '.tmp')
+        with temporary_path.open('w', encoding='utf-8') as file:
+            json.dump(content, file, ensure_ascii=False, indent=4)
+        temporary_path.replace(file_path)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        if not PeriodStore.is_store(self.directory):
+            return {'format_version': PeriodStore.FORMAT_VERSION, 'schema': None, 'partitions': {}, 'ingested': []}
+        with (self.directory / PeriodStore.MANIFEST_FILE).open('r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get('format_version') != PeriodStore.FORMAT_VERSION:
+            raise ValueError(f"Unsupported period store format in {self.directory}")
+        return manifest
+
+    def _read_student_index(self) -> Dict[str, List[str]]:
+        student_index_path = self.directory / PeriodStore.STUDENT_INDEX_FILE
+        if not student_index_path.exists():
+            return {}
+        with student_index_path.open('r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _get_partition_directory(self, period: str) -> Path:
+        return self.directory / PeriodStore.PARTITIONS_DIRECTORY / period
+
+    def get_periods(self, until_period: Optional[str] = None) -> List[str]:
+        """
+        Lists the stored periods in chronological order.
+
+        :param until_period: Optional exclusive upper limit period in YYYYXZ format.
+        :return: The PERIODO values of the partitions before until_period.
+        """
+        partitions = self._read_manifest()['partitions']
+        limit_key = Period.to_key(until_period) if until_period is not None else None
+        return [
+            period for period in sorted(partitions, key=lambda period: (partitions[period]['key'], period))
+            if limit_key is None or partitions[period]['key'] < limit_key
+        ]
+
+    def get_student_periods(self, student_code: str) -> List[str]:
+        """
+        :return: The periods holding records of a student, in chronological order.
+        """
+        return self._read_student_index().get(student_code, [])
+
+    @staticmethod
+    def _read_extract(csv_path: Path, schema: Optional[Dict[str, str]]) -> pd.DataFrame:
+        """
+        Reads a CSV extract and validates it against the schema of the store.
+        Columns stored as categoricals are read as strings, so their values are never reinterpreted.
+        """
+        string_columns = {name: str for name in PeriodStore.TEXT_COLUMNS}
+        if schema is not None:
+            string_columns.update({name: str for name, kind in schema.items() if kind == 'categorical'})
+        extract = pd.read_csv(csv_path, sep=';', encoding='utf-8', dtype=string_columns)
+
+        missing_columns = [column for column in PeriodStore.REQUIRED_COLUMNS if column not in extract.columns]
+        if missing_columns:
+            raise ValueError(f"{csv_path} is missing required columns: {', '.join(missing_columns)}")
+        if not pd.api.types.is_numeric_dtype(extract['NUMERO_CREDITOS']):
+            raise ValueError(f"{csv_path} has non-numeric NUMERO_CREDITOS values")
+        if schema is not None:
+            if set(extract.columns) != set(schema):
+                raise ValueError(
+                    f"{csv_path} does not match the store schema: expected columns {', '.join(schema)}, "
+                    f"found {', '.join(extract.columns)}"
+                )
+            mismatched_columns = [
+                name for name, kind in schema.items()
+                if kind == 'numeric' and extract[name].notna().any()
+                and not pd.api.types.is_numeric_dtype(extract[name])
+            ]
+            if mismatched_columns:
+                raise ValueError(f"{csv_path} has non-numeric values in columns: {', '.join(mismatched_columns)}")
+            # Keep the column order of the store
+            extract = extract[list(schema)]
+        return extract
+
+    @staticmethod
+    def _decategorize(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts categorical columns back to plain object columns, so partitions can be merged with new extracts.
+        """
+        return pd.DataFrame({
+            name: (np.asarray(data[name], dtype=object) if isinstance(data[name].dtype, pd.CategoricalDtype)
+                   else np.asarray(data[name]))
+            for name in data.columns
+        })
+
+    def ingest(self, csv_path: Path) -> Dict[str, int]:
+        """
+        Appends a CSV extract to the store. Rows are split by period; the partitions of the periods in the
+        extract are merged with the new rows that are not stored yet and rewritten, and every other partition is left
+        untouched. The period index and the student index are updated with the touched partitions only.
+
+        :param csv_path: Path to the semicolon-separated CSV extract.
+        :return: A dictionary with the number of rows read, added, duplicated and discarded for an invalid period.
+        """
+        csv_path = Path(csv_path)
+        manifest = self._read_manifest()
+        file_hash = ColumnarCache.compute_file_hash(csv_path)
+        if any(entry['sha256'] == file_hash for entry in manifest['ingested']):
+            print(f"{csv_path} was already ingested; skipping it.")
+            return {'rows': 0, 'added': 0, 'duplicates': 0, 'invalid': 0}
+
+        extract = PeriodStore._read_extract(csv_path, manifest['schema'])
+        source_columns = list(extract.columns)
+        extract[PeriodQueries.PERIOD_KEY_COLUMN] = PeriodQueries.compute_period_keys(extract['PERIODO'])
+
+        # Records without a valid period are excluded from every cutoff, so they are not stored
+        invalid = extract[PeriodQueries.PERIOD_KEY_COLUMN] == Period.INVALID_KEY
+        if invalid.any():
+            examples = ", ".join(repr(period) for period in extract.loc[invalid, 'PERIODO'].unique()[:5])
+            print(f"Discarding {int(invalid.sum())} records with invalid PERIODO values ({examples}).")
+            extract = extract[~invalid]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        student_index = self._read_student_index()
+        stats = {'rows': len(extract) + int(invalid.sum()), 'added': 0, 'duplicates': 0, 'invalid': int(invalid.sum())}
+
+        for period, new_rows in extract.groupby('PERIODO', sort=False):
+            period = str(period)
+            partition = manifest['partitions'].get(period)
+            new_rows = new_rows[source_columns]
+            if partition is not None:
+                stored_rows = ColumnarCache.load_columns(
+                    self._get_partition_directory(period), partition['columns'], source_columns
+                )
+                rows = pd.concat([PeriodStore._decategorize(stored_rows), new_rows], ignore_index=True)
+                previous_rows = partition['rows']
+            else:
+                rows = new_rows.reset_index(drop=True)
+                previous_rows = 0
+
+            # Overlapping extracts repeat stored rows, which are dropped from the new rows. Identical rows
+            # within one extract are kept, as CSVReader keeps them.
+            if previous_rows:
+                row_ids = rows.groupby(list(rows.columns), dropna=False, sort=False).ngroup().to_numpy()
+                repeated = np.isin(row_ids[previous_rows:], row_ids[:previous_rows])
+                rows = rows[np.concatenate([np.ones(previous_rows, dtype=bool), ~repeated])].reset_index(drop=True)
+                stats['duplicates'] += int(repeated.sum())
+            stats['added'] += len(rows) - previous_rows
+            if len(rows) == previous_rows:
+                continue
+
+            rows[ApproveSubjectLogic.APPROVED_COLUMN] = ApproveSubjectLogic.compute_approved_column(rows)
+            rows[PeriodQueries.PERIOD_KEY_COLUMN] = PeriodQueries.compute_period_keys(rows['PERIODO'])
+            rows['CODIGO'] = rows['CODIGO'].astype(str)
+            rows = rows.sort_values('CODIGO', kind='mergesort').reset_index(drop=True)
+
+            # Write the partition next to the old one and swap it in
+            partition_directory = self._get_partition_directory(period)
+            temporary_directory = partition_directory.with_name(partition_directory.name + '.tmp')
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+            temporary_directory.mkdir(parents=True)
+            columns = ColumnarCache.save_columns(temporary_directory, rows)
+            shutil.rmtree(partition_directory, ignore_errors=True)
+            temporary_directory.rename(partition_directory)
+
+            manifest['partitions'][period] = {
+                'key': Period.to_key(period),
+                'rows': len(rows),
+                'columns': columns,
+            }
+            for student_code in rows['CODIGO'].unique().tolist():
+                student_periods = student_index.setdefault(student_code, [])
+                if period not in student_periods:
+                    student_periods.append(period)
+                    student_periods.sort(key=lambda student_period: (Period.to_key(student_period), student_period))
+
+        if manifest['schema'] is None:
+            manifest['schema'] = {
+                name: 'numeric' if pd.api.types.is_numeric_dtype(extract[name]) else 'categorical'
+                for name in source_columns
+            }
+        manifest['ingested'].append({'path': str(csv_path), 'sha256': file_hash, 'rows': stats['rows']})
+
+        # The manifest is written last, so an interrupted ingestion never references missing partitions
+        PeriodStore._write_json(self.directory / PeriodStore.STUDENT_INDEX_FILE, student_index)
+        PeriodStore._write_json(self.directory / PeriodStore.MANIFEST_FILE, manifest)
+        return stats
+
+    def load(
+        self,
+        until_period: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        student_codes: Optional[AbstractSet[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Loads the partitions before a cutoff, so the load time depends on the periods the cutoff needs
+        instead of the whole history. Partitions are concatenated in period order and stably sorted by
+        student code, which yields the (CODIGO, CLAVE_PERIODO) order of CSVReader.
+
+        :param until_period: Optional exclusive upper limit period in YYYYXZ format; every partition by default.
+        :param columns: Optional subset of columns to load; the derived columns are always loaded.
+        :param student_codes: Optional student codes whose records are the only ones kept; the student index
+                              skips the partitions without records of these students, and every other
+                              partition is filtered as it is loaded.
+        :return: The normalized DataFrame, sorted by student code and period key.
+        """
+        manifest = self._read_manifest()
+        names = None if columns is None else [
+            name for name in manifest['schema'] if name in columns
+        ] + PeriodStore.DERIVED_COLUMNS
+
+        periods = self.get_periods(until_period)
+        if student_codes is not None:
+            student_index = self._read_student_index()
+            student_periods = {
+                period for student_code in student_codes for period in student_index.get(str(student_code), [])
+            }
+            periods = [period for period in periods if period in student_periods]
+
+        partitions = []
+        for period in periods:
+            partition = ColumnarCache.load_columns(
+                self._get_partition_directory(period), manifest['partitions'][period]['columns'], names
+            )
+            if student_codes is not None:
+                partition = partition[partition['CODIGO'].isin(student_codes).to_numpy()]
+            partitions.append(partition)
+        print(f"Loading {len(partitions)} of {len(manifest['partitions'])} periods from the period store.")
+        if not partitions:
+            empty_columns = names if names is not None else list(manifest['schema'] or []) + PeriodStore.DERIVED_COLUMNS
+            return pd.DataFrame({name: pd.Series(dtype=object) for name in empty_columns})
+
+        data: Dict[str, Any] = {}
+        for name in partitions[0].columns:
+            parts = [partition[name] for partition in partitions]
+            if isinstance(parts[0].dtype, pd.CategoricalDtype):
+                # A column without values in a partition has untyped empty categories, which cannot be merged
+                parts = [
+                    part if len(part.cat.categories) else part.cat.set_categories(part.cat.categories.astype(str))
+                    for part in parts
+                ]
+                data[name] = union_categoricals(parts, sort_categories=True)
+            else:
+                data[name] = np.concatenate([part.to_numpy() for part in parts])
+        data_frame = pd.DataFrame(data, copy=False)
+
+        # Partitions are already in period order, so a stable sort by student code is enough
+        order = np.argsort(data_frame['CODIGO'].cat.codes.to_numpy(), kind='stable')
+        return data_frame.take(order).reset_index(drop=True)
@@ -0,0 +1,183 @@
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class SQLiteStore:
+    """
+    Normalized academic records kept in a local SQLite database instead of memory. Queries only read
+    the rows they need through the index, so the memory use does not grow with the dataset, and any
+    number of processes can read the same file at once.
+
+    The records table holds the required columns, the approval and period key columns computed by
+    CSVReader, and POSICION, the row position in the (CODIGO, CLAVE_PERIODO) order of CSVReader,
+    which is the rowid of the table. The (CODIGO, CLAVE_PERIODO) index returns the records of a student
+    already in period order.
+    """
+    # Bump when the table layout changes
+    FORMAT_VERSION = 1
+    HEADER = b'SQLite format 3\x00'
+    TABLE = 'records'
+    # (column, SQLite type) of the records table, after the POSICION rowid
+    COLUMNS: List[Tuple[str, str]] = [
+        ('CODIGO', 'TEXT'),
+        ('PERIODO', 'TEXT'),
+        ('MATERIA', 'TEXT'),
+        ('ESTATUS_CURSO', 'TEXT'),
+        ('DESCRIPCION_MODO_DE_CALIFICACION', 'TEXT'),
+        ('CALIFICACION_FINAL', 'TEXT'),
+        ('NUMERO_CREDITOS', 'REAL'),
+        ('APROBADO', 'INTEGER'),
+        ('CLAVE_PERIODO', 'INTEGER'),
+    ]
+    INSERT_BATCH = 50000
+
+    def __init__(self, db_path: Path) -> None:
+        """
+        Opens a database written by build in read-only mode.
+
+        :param db_path: Path to the SQLite file.
+        """
+        self.db_path = Path(db_path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        metadata = dict(self._get_connection().execute("SELECT key, value FROM metadata").fetchall())
+        if metadata.get('format_version') != str(SQLiteStore.FORMAT_VERSION):
+            raise ValueError(f"Unsupported SQLite store format in {self.db_path}")
+        self.source_hash = metadata.get('source_hash', '')
+        self._column_names = ", ".join(name for name, _ in SQLiteStore.COLUMNS)
+
+    @staticmethod
+    def is_store(path: Path) -> bool:
+        """
+        :return: True if the path is a SQLite database file.
+        """
+        path = Path(path)
+        if not path.is_file():
+            return False
+        with path.open('rb') as file:
+            return file.read(len(SQLiteStore.HEADER)) == SQLiteStore.HEADER
+
+    @staticmethod
+    def read_source_hash(db_path: Path) -> Optional[str]:
+        """
+        :return: The hash of the data source the store was built from, or None if there is no usable store.
+        """
+        if not SQLiteStore.is_store(db_path):
+            return None
+        try:
+            store = SQLiteStore(db_path)
+        except (sqlite3.Error, ValueError):
+            return None
+        source_hash = store.source_hash
+        store.close()
+        return source_hash
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # A connection cannot be shared with forked processes, so each process opens its own
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def close(self) -> None:
+        """
+        Closes the connection of the current process.
+        """
+        if self._connection is not None and self._connection_pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    @staticmethod
+    def _to_rows(data: pd.DataFrame, start: int, stop: int) -> List[Tuple[Any, ...]]:
+        """
+        Converts a slice of the dataset into insertable rows; missing values become NULL.
+        """
+        columns: List[List[Any]] = [list(range(start, stop))]
+        for name, sql_type in SQLiteStore.COLUMNS:
+            if name not in data.columns:
+                columns.append([None] * (stop - start))
+                continue
+            values = data[name].iloc[start:stop]
+            if sql_type == 'TEXT':
+                columns.append([None if pd.isna(value) else str(value) for value in values.tolist()])
+            elif sql_type == 'REAL':
+                columns.append([None if np.isnan(value) else value for value in values.to_numpy(dtype=np.float64).tolist()])
+            else:
+                columns.append(values.to_numpy(dtype=np.int64).tolist())
+        return list(zip(*columns))
+
+    @staticmethod
+    def build(db_path: Path, data: pd.DataFrame, source_hash: str = '') -> 'SQLiteStore':
+        """
+        Writes a dataset normalized by CSVReader into a new database and opens it.
+
+        :param db_path: Path to the SQLite file; a previous database at that path is replaced.
+        :param data: The DataFrame loaded by CSVReader, with the approval and period key columns.
+        :param source_hash: The hash of the data source, used to notice that the store is stale.
+        :return: The opened SQLiteStore.
+        """
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = db_path.with_name(db_path.name + '.tmp')
+        temporary_path.unlink(missing_ok=True)
+
+        connection = sqlite3.connect(temporary_path)
+        try:
+            # The file is only swapped in once complete, so the build does not need a journal
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            column_definitions = ", ".join(f"{name} {sql_type}" for name, sql_type in SQLiteStore.COLUMNS)
+            connection.execute(f"CREATE TABLE {SQLiteStore.TABLE} (POSICION INTEGER PRIMARY KEY, {column_definitions})")
+            placeholders = ", ".join("?" * (len(SQLiteStore.COLUMNS) + 1))
+            for start in range(0, len(data), SQLiteStore.INSERT_BATCH):
+                stop = min(start + SQLiteStore.INSERT_BATCH, len(data))
+                connection.executemany(
+                    f"INSERT INTO {SQLiteStore.TABLE} VALUES ({placeholders})", SQLiteStore._to_rows(data, start, stop)
+                )
+            connection.execute(f"CREATE INDEX idx_student_period ON {SQLiteStore.TABLE} (CODIGO, CLAVE_PERIODO)")
+            connection.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+            connection.executemany("INSERT INTO metadata VALUES (?, ?)", [
+                ('format_version', str(SQLiteStore.FORMAT_VERSION)),
+                ('source_hash', source_hash),
+                ('records', str(len(data))),
+            ])
+            connection.commit()
+            connection.execute("ANALYZE")
+        finally:
+            connection.close()
+        temporary_path.replace(db_path)
+        print(f"SQLite store written to {db_path} with {len(data)} records.")
+        return SQLiteStore(db_path)
+
+    def _query(self, where: str, parameters: Tuple[Any, ...]) -> pd.DataFrame:
+        """
+        Runs an indexed query on the records table and returns the rows in the order of CSVReader.
+        """
+        rows = self._get_connection().execute(
+            f"SELECT {self._column_names} FROM {SQLiteStore.TABLE} WHERE {where} ORDER BY CLAVE_PERIODO, POSICION",
+            parameters
+        ).fetchall()
+        records = pd.DataFrame.from_records(rows, columns=[name for name, _ in SQLiteStore.COLUMNS])
+        records['NUMERO_CREDITOS'] = records['NUMERO_CREDITOS'].astype(np.float64)
+        records['APROBADO'] = records['APROBADO'].astype(bool)
+        records['CLAVE_PERIODO'] = records['CLAVE_PERIODO'].astype(np.int32)
+        return records
+
+    def get_student_records(self, student_code: str) -> pd.DataFrame:
+        """
+        :return: The records of a student sorted by period key, through the (CODIGO, CLAVE_PERIODO) index.
+        """
+        return self._query("CODIGO = ?", (str(student_code),))
+
+    def get_record_count(self) -> int:
+        """
+        :return: The number of stored records.
+        """
+        return int(self._get_connection().execute(f"SELECT COUNT(*) FROM {SQLiteStore.TABLE}").fetchone()[0])
+
+    def __repr__(self) -> str:
+        return f"SQLiteStore(db_path={self.db_path})"
@@ -0,0 +1,70 @@
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class StudentIndex:
+    """
+    Maps each student code to the contiguous block of rows holding its records
+    in a dataset sorted by the 'CODIGO' column.
+    """
+    offsets: Dict[str, Tuple[int, int]]
+
+    def __init__(self, sorted_codes: pd.Series) -> None:
+        """
+        Builds the row-offset table from the student codes of a dataset already sorted by code.
+
+        :param sorted_codes: The 'CODIGO' column, as strings, of a dataset sorted by code.
+        """
+        self.offsets = {}
+        if len(sorted_codes) == 0:
+            return
+
+        # Categorical codes are compared through their integer codes, without materializing strings
+        if isinstance(sorted_codes.dtype, pd.CategoricalDtype):
+            codes = sorted_codes.cat.codes.to_numpy()
+            categories = sorted_codes.cat.categories
+        else:
+            codes = sorted_codes.to_numpy()
+            categories = None
+
+        # Every position where the code changes starts a new block of rows
+        starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+        stops = np.append(starts[1:], len(codes))
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            if categories is None:
+                self.offsets[str(codes[start])] = (start, stop)
+            elif codes[start] >= 0:
+                # Records without a student code (code -1) cannot be looked up
+                self.offsets[str(categories[codes[start]])] = (start, stop)
+
+    @staticmethod
+    def sort_by_student(data: pd.DataFrame, period_key_column: Optional[str] = None) -> pd.DataFrame:
+        """
+        Sorts the dataset by student code and, optionally, by period key within each student.
+        The sort is stable, so records of the same student and period keep their original order.
+
+        :param data: The DataFrame to sort. Its 'CODIGO' column must already be a string column.
+        :param period_key_column: Optional integer period key column used as secondary sort key.
+        :return: A new DataFrame sorted by 'CODIGO' with a fresh RangeIndex.
+        """
+        sort_columns = ['CODIGO'] if period_key_column is None else ['CODIGO', period_key_column]
+        return data.sort_values(sort_columns, kind='mergesort').reset_index(drop=True)
+
+    def get_bounds(self, student_code: str) -> Optional[Tuple[int, int]]:
+        """
+        Returns the [start, stop) row positions of a student's records.
+
+        :param student_code: The student code to look up.
+        :return: A (start, stop) tuple, or None if the student has no records.
+        """
+        return self.offsets.get(student_code)
+
+    def __contains__(self, student_code: str) -> bool:
+        return student_code in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __repr__(self) -> str:
+        return f"StudentIndex(students={len(self.offsets)})"
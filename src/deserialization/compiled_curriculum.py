@@ -0,0 +1,228 @@
+import hashlib
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type, Union
+import numpy as np
+
+from deserialization.complete_data import CompleteData
+from deserialization.group_of_related_course_bundles import GroupOfRelatedCourseBundles
+
+
+@dataclass
+class CompiledCurriculum:
+    """
+    Compiled form of a curriculum where courses, bundles and groups are interned as integer IDs:
+    - course_codes: Course code of each course ID (simple courses first, then bundle courses).
+    - simple_course_ids: Course IDs of the simple courses, in curriculum order.
+    - bundle_names / bundle_minimum_credits: Name and minimum credits to pass of each bundle ID.
+    - bundle_course_indptr / bundle_course_ids: CSR arrays with the course IDs of each bundle.
+    - group_names: Name of each group of related bundles.
+    - group_bundle_indptr / group_bundle_ids: CSR arrays with the bundle IDs of each group.
+    - course_bundle_indptr / course_bundle_ids: CSR reverse index with the bundle IDs of each course.
+    - source_hash: SHA-256 hash of the curriculum JSON file.
+    """
+    course_codes: List[str]
+    simple_course_ids: np.ndarray
+    bundle_names: List[str]
+    bundle_minimum_credits: np.ndarray
+    bundle_course_indptr: np.ndarray
+    bundle_course_ids: np.ndarray
+    group_names: List[str]
+    group_bundle_indptr: np.ndarray
+    group_bundle_ids: np.ndarray
+    course_bundle_indptr: np.ndarray
+    course_bundle_ids: np.ndarray
+    source_hash: str
+    course_ids: Dict[str, int] = field(init=False, repr=False)
+    group_course_ids: List[List[int]] = field(init=False, repr=False)
+    cache_token: str = field(init=False, repr=False)
+
+    # Bump when the compiled layout changes, so stale caches are ignored
+    FORMAT_VERSION = 1
+
+    def __post_init__(self) -> None:
+        self.course_ids = {code: course_id for course_id, code in enumerate(self.course_codes)}
+        # Distinct course IDs of each group, in curriculum order
+        self.group_course_ids = [
+            list(dict.fromkeys(
+                course_id
+                for bundle_id in self.get_group_bundle_ids(group_id).tolist()
+                for course_id in self.get_bundle_course_ids(bundle_id).tolist()
+            ))
+            for group_id in range(len(self.group_names))
+        ]
+        # Identifies the curriculum in shared caches; curricula compiled without a file get a unique token
+        self.cache_token = self.source_hash or uuid.uuid4().hex
+
+    @staticmethod
+    def _to_csr(rows: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(row) for row in rows])
+        indices = np.array([value for row in rows for value in row], dtype=np.int32)
+        return indptr, indices
+
+    @classmethod
+    def compile(cls: Type['CompiledCurriculum'], complete_data: CompleteData, source_hash: str = '') -> 'CompiledCurriculum':
+        """
+        Compiles a CompleteData instance.
+
+        :param complete_data: The curriculum to compile.
+        :param source_hash: The hash of the JSON file the curriculum was read from.
+        :return: An instance of CompiledCurriculum.
+        """
+        unique_course_codes = dict.fromkeys(complete_data.simple_courses)
+        for bundle in complete_data.course_bundles.values():
+            unique_course_codes.update(dict.fromkeys(bundle.courses.keys()))
+        course_codes = list(unique_course_codes)
+        course_ids = {code: course_id for course_id, code in enumerate(course_codes)}
+
+        bundle_names = list(complete_data.course_bundles.keys())
+        bundle_ids = {name: bundle_id for bundle_id, name in enumerate(bundle_names)}
+        bundle_courses = [
+            [course_ids[code] for code in complete_data.course_bundles[name].courses.keys()] for name in bundle_names
+        ]
+
+        course_bundles: List[List[int]] = [[] for _ in course_codes]
+        for bundle_id, course_id_list in enumerate(bundle_courses):
+            for course_id in course_id_list:
+                course_bundles[course_id].append(bundle_id)
+
+        groups = GroupOfRelatedCourseBundles.find_related_groups(complete_data.course_bundles)
+        group_bundles = [[bundle_ids[name] for name in related_names] for related_names in groups.values()]
+
+        bundle_course_indptr, bundle_course_ids = cls._to_csr(bundle_courses)
+        group_bundle_indptr, group_bundle_ids = cls._to_csr(group_bundles)
+        course_bundle_indptr, course_bundle_ids = cls._to_csr(course_bundles)
+
+        return cls(
+            course_codes=course_codes,
+            simple_course_ids=np.array([course_ids[code] for code in complete_data.simple_courses], dtype=np.int32),
+            bundle_names=bundle_names,
+            bundle_minimum_credits=np.array(
+                [complete_data.course_bundles[name].minimum_credits_to_pass for name in bundle_names], dtype=np.float64
+            ),
+            bundle_course_indptr=bundle_course_indptr,
+            bundle_course_ids=bundle_course_ids,
+            group_names=list(groups.keys()),
+            group_bundle_indptr=group_bundle_indptr,
+            group_bundle_ids=group_bundle_ids,
+            course_bundle_indptr=course_bundle_indptr,
+            course_bundle_ids=course_bundle_ids,
+            source_hash=source_hash
+        )
+
+    @classmethod
+    def from_json_file(
+        cls: Type['CompiledCurriculum'],
+        file_path: Path,
+        cache_dir: Optional[Path] = None
+    ) -> 'CompiledCurriculum':
+        """
+        Compiles a curriculum JSON file, reusing the on-disk compiled form when the file has not changed.
+
+        :param file_path: The Path to the curriculum JSON file.
+        :param cache_dir: Optional directory of compiled curricula, keyed by the hash of the JSON file.
+        :return: An instance of CompiledCurriculum.
+        """
+        source_hash = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = Path(cache_dir) / f"{file_path.stem}-{source_hash[:16]}-v{cls.FORMAT_VERSION}.npz"
+            if cache_path.exists():
+                return cls.load(cache_path)
+
+        compiled = cls.compile(CompleteData.from_json_file(file_path), source_hash)
+        if cache_path is not None:
+            compiled.save(cache_path)
+        return compiled
+
+    def save(self, file_path: Path) -> None:
+        """
+        Saves the compiled curriculum to a .npz file.
+
+        :param file_path: The destination file.
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = file_path.with_name(file_path.name + '.tmp')
+        with temporary_path.open('wb') as file:
+            np.savez(
+                file,
+                course_codes=np.array(self.course_codes, dtype=str),
+                simple_course_ids=self.simple_course_ids,
+                bundle_names=np.array(self.bundle_names, dtype=str),
+                bundle_minimum_credits=self.bundle_minimum_credits,
+                bundle_course_indptr=self.bundle_course_indptr,
+                bundle_course_ids=self.bundle_course_ids,
+                group_names=np.array(self.group_names, dtype=str),
+                group_bundle_indptr=self.group_bundle_indptr,
+                group_bundle_ids=self.group_bundle_ids,
+                course_bundle_indptr=self.course_bundle_indptr,
+                course_bundle_ids=self.course_bundle_ids,
+                source_hash=np.array(self.source_hash)
+            )
+        temporary_path.replace(file_path)
+
+    @classmethod
+    def load(cls: Type['CompiledCurriculum'], file_path: Path) -> 'CompiledCurriculum':
+        """
+        Loads a compiled curriculum saved with save.
+
+        :param file_path: The .npz file to load.
+        :return: An instance of CompiledCurriculum.
+        """
+        with np.load(file_path, allow_pickle=False) as arrays:
+            return cls(
+                course_codes=arrays['course_codes'].tolist(),
+                simple_course_ids=arrays['simple_course_ids'],
+                bundle_names=arrays['bundle_names'].tolist(),
+                bundle_minimum_credits=arrays['bundle_minimum_credits'],
+                bundle_course_indptr=arrays['bundle_course_indptr'],
+                bundle_course_ids=arrays['bundle_course_ids'],
+                group_names=arrays['group_names'].tolist(),
+                group_bundle_indptr=arrays['group_bundle_indptr'],
+                group_bundle_ids=arrays['group_bundle_ids'],
+                course_bundle_indptr=arrays['course_bundle_indptr'],
+                course_bundle_ids=arrays['course_bundle_ids'],
+                source_hash=str(arrays['source_hash'])
+            )
+
+    def get_bundle_minimum_credits(self, bundle_id: int) -> Union[int, float]:
+        """
+        :return: The minimum credits to pass of a bundle, as an int when the value is integral.
+        """
+        minimum_credits = float(self.bundle_minimum_credits[bundle_id])
+        return int(minimum_credits) if minimum_credits.is_integer() else minimum_credits
+
+    def get_bundle_course_ids(self, bundle_id: int) -> np.ndarray:
+        """
+        :return: The course IDs of a bundle, in curriculum order.
+        """
+        return self.bundle_course_ids[self.bundle_course_indptr[bundle_id]:self.bundle_course_indptr[bundle_id + 1]]
+
+    def get_group_bundle_ids(self, group_id: int) -> np.ndarray:
+        """
+        :return: The bundle IDs of a group of related bundles, in curriculum order.
+        """
+        return self.group_bundle_ids[self.group_bundle_indptr[group_id]:self.group_bundle_indptr[group_id + 1]]
+
+    def get_course_bundle_ids(self, course_id: int) -> np.ndarray:
+        """
+        :return: The IDs of the bundles that contain a course.
+        """
+        return self.course_bundle_ids[self.course_bundle_indptr[course_id]:self.course_bundle_indptr[course_id + 1]]
+
+    def get_bundle_incidence(self) -> np.ndarray:
+        """
+        :return: A float course x bundle matrix, 1.0 where the course belongs to the bundle.
+        """
+        incidence = np.zeros((len(self.course_codes), len(self.bundle_names)), dtype=np.float64)
+        bundle_of_entry = np.repeat(np.arange(len(self.bundle_names)), np.diff(self.bundle_course_indptr))
+        incidence[self.bundle_course_ids, bundle_of_entry] = 1.0
+        return incidence
+
+    def __str__(self) -> str:
+        return (
+            f"CompiledCurriculum: {len(self.course_codes)} courses, {len(self.simple_course_ids)} simple courses, "
+            f"{len(self.bundle_names)} bundles, {len(self.group_names)} groups"
+        )
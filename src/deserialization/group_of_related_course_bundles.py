@@ -1,6 +1,7 @@
-from typing import Dict, Set
+from typing import Dict, List
 from deserialization.course_bundle import CourseBundle
 from deserialization.related_course_bundles import RelatedCourseBundles
+from utils.union_find import UnionFind
 
 class GroupOfRelatedCourseBundles:
     groups: Dict[str, RelatedCourseBundles]
@@ -17,35 +18,37 @@ class GroupOfRelatedCourseBundles:
     def _create_groups(self, course_bundles: Dict[str, CourseBundle]) -> None:
         """
         Creates groups of related CourseBundle instances and stores them in the `groups` attribute.
+        Groups are the connected components of the related_bundles relation, found with an iterative
+        union-find. Groups and the bundles inside each group follow the order of course_bundles.
 
         :param course_bundles: A dictionary of CourseBundle instances.
         """
-        visited: Set[str] = set()
+        for group_name, related_names in GroupOfRelatedCourseBundles.find_related_groups(course_bundles).items():
+            self.groups[group_name] = RelatedCourseBundles(group_name, course_bundles, related_names)
 
-        def explore_group(bundle_name: str, related_names: Set[str]) -> None:
-            """
-            Recursively collects related bundles for the current group.
+    @staticmethod
+    def find_related_groups(course_bundles: Dict[str, CourseBundle]) -> Dict[str, List[str]]:
+        """
+        Finds the groups of mutually related bundles.
 
-            :param bundle_name: The name of the bundle to add to the current group.
-            :param related_names: A set that accumulates all mutually related bundle names.
-            """
-            if bundle_name in visited:
-                return
-            visited.add(bundle_name)
-            related_names.add(bundle_name)
-            
+        :param course_bundles: A dictionary of CourseBundle instances.
+        :return: A dictionary mapping each group name (the sorted bundle names joined with "/")
+                 to the names of its bundles, in course_bundles order.
+        """
+        bundle_names = list(course_bundles.keys())
+        bundle_positions = {name: position for position, name in enumerate(bundle_names)}
+        union_find = UnionFind(len(bundle_names))
+        for position, bundle_name in enumerate(bundle_names):
             for related_name in course_bundles[bundle_name].related_bundles:
-                if related_name in course_bundles:
-                    explore_group(related_name, related_names)
+                if related_name in bundle_positions:
+                    union_find.union(position, bundle_positions[related_name])
+
+        members: Dict[int, List[str]] = {}
+        for position, bundle_name in enumerate(bundle_names):
+            members.setdefault(union_find.find(position), []).append(bundle_name)
 
-        for bundle_name in course_bundles:
-            if bundle_name not in visited:
-                related_names = set()
-                explore_group(bundle_name, related_names)
-                if related_names:
-                    # Create a concatenated name by joining all related names with "/"
-                    concatenated_name = "/".join(sorted(related_names))
-                    self.groups[concatenated_name] = RelatedCourseBundles(concatenated_name, course_bundles, related_names)
+        # Create a concatenated name by joining all related names with "/"
+        return {"/".join(sorted(related_names)): related_names for related_names in members.values()}
 
     def get_groups(self) -> Dict[str, RelatedCourseBundles]:
         """
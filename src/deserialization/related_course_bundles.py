@@ -1,4 +1,4 @@
-from typing import Dict, Set
+from typing import Dict, Iterable, Set
 from deserialization.course_bundle import CourseBundle
 
 class RelatedCourseBundles:
@@ -6,13 +6,13 @@ class RelatedCourseBundles:
     related_bundles: Dict[str, CourseBundle]
     common_courses: Set[str]
 
-    def __init__(self, group_name: str, course_bundles: Dict[str, CourseBundle], related_names: Set[str]):
+    def __init__(self, group_name: str, course_bundles: Dict[str, CourseBundle], related_names: Iterable[str]):
         """
         Initializes a RelatedCourseBundles instance for a single group of related CourseBundle instances.
 
         :param group_name: The concatenated name of all related course bundles for this group.
         :param course_bundles: All CourseBundle instances in CompleteData.
-        :param related_names: A set of course bundle names that are mutually related to the group_name.
+        :param related_names: The course bundle names that are mutually related to the group_name, in report order.
         """
         self.group_name = group_name
         self.related_bundles = {name: course_bundles[name] for name in related_names if name in course_bundles}
@@ -0,0 +1,27 @@
+import argparse
+from pathlib import Path
+from typing import List
+from csv_reader.period_store import PeriodStore
+
+def ingest(store_path: Path, csv_paths: List[Path]) -> None:
+    """
+    Appends CSV extracts to a period-partitioned store, creating the store if it does not exist.
+
+    :param store_path: Path to the directory of the period store.
+    :param csv_paths: Paths to the semicolon-separated CSV extracts, ingested in order.
+    """
+    store = PeriodStore(store_path)
+    for csv_path in csv_paths:
+        stats = store.ingest(csv_path)
+        print(f"Ingested {csv_path}: {stats['rows']} rows read, {stats['added']} added, "
+              f"{stats['duplicates']} duplicates, {stats['invalid']} with an invalid period.")
+    print(f"The store holds {len(store.get_periods())} periods.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append academic history extracts to a period store.")
+    parser.add_argument("--store", type=Path, required=True, help="Path to the period store directory.")
+    parser.add_argument("csv_paths", type=Path, nargs='+', help="CSV extracts to ingest.")
+    args = parser.parse_args()
+
+    # Run the ingestion
+    ingest(args.store, args.csv_paths)
@@ -0,0 +1,202 @@
+import csv
+from operator import attrgetter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+from approve_subject_logic.approval_rules import ApprovalRules
+from csv_reader.columnar_cache import ColumnarCache
+from utils.period import Period
+
+
+class LiteRecord:
+    """
+    One academic record, reduced to the fields read by the reports.
+    """
+    __slots__ = ('period_key', 'subject', 'credits', 'approved')
+
+    def __init__(self, period_key: int, subject: str, credits: float, approved: bool) -> None:
+        self.period_key = period_key
+        self.subject = subject
+        self.credits = credits
+        self.approved = approved
+
+    def __repr__(self) -> str:
+        return (f"LiteRecord(period_key={self.period_key}, subject={self.subject}, "
+                f"credits={self.credits}, approved={self.approved})")
+
+
+class LiteDataset:
+    """
+    Pandas-free counterpart of CSVReader for interactive and scripted lookups. The records are read
+    with the csv module, or from the columnar cache written by CSVReader when it is valid, and kept as
+    LiteRecord lists per student, sorted by period key like the DataFrame of CSVReader.
+
+    Only the records of the requested students are kept, so a one-off report never materializes the
+    rest of the dataset.
+    """
+    _records: Optional[Dict[str, List[LiteRecord]]] = None
+
+    # Derived columns stored by CSVReader in the columnar cache
+    # (ApproveSubjectLogic.APPROVED_COLUMN and PeriodQueries.PERIOD_KEY_COLUMN)
+    APPROVED_COLUMN = 'APROBADO'
+    PERIOD_KEY_COLUMN = 'CLAVE_PERIODO'
+    CACHE_COLUMNS = ['CODIGO', 'MATERIA', 'NUMERO_CREDITOS', APPROVED_COLUMN, PERIOD_KEY_COLUMN]
+
+    @staticmethod
+    def load(
+        file_path: Path,
+        cache_dir: Optional[Path] = None,
+        lean: bool = False,
+        student_codes: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Loads the records of the given students, replacing any previously loaded records.
+
+        :param file_path: Path to the semicolon-separated CSV file.
+        :param cache_dir: Columnar cache directory used by CSVReader, if any. The cache is only read.
+        :param lean: Whether CSVReader uses the lean loading mode, which selects the cache variant.
+        :param student_codes: The students to load; every student by default.
+        """
+        wanted = None if student_codes is None else {str(code) for code in student_codes}
+        manifest = None
+        if cache_dir is not None:
+            cache = ColumnarCache(cache_dir, file_path, 'lean' if lean else 'default')
+            manifest = cache.get_manifest()
+
+        if manifest is not None:
+            records = LiteDataset._read_cache(cache.directory, manifest, wanted)
+            print("Records loaded from the columnar cache.")
+        else:
+            records = LiteDataset._read_csv(file_path, wanted)
+            print("CSV file loaded successfully.")
+        LiteDataset._records = records
+        print(f"Loaded {LiteDataset.get_record_count()} records of {len(records)} students.")
+
+    @staticmethod
+    def _to_float(value: str) -> float:
+        # Empty and non-numeric credits are missing values, as when pandas parses the column
+        try:
+            return float(value)
+        except ValueError:
+            return float('nan')
+
+    @staticmethod
+    def _read_csv(file_path: Path, wanted: Optional[Set[str]]) -> Dict[str, List[LiteRecord]]:
+        """
+        Reads the CSV file row by row, evaluating the approval rules and the period key of each record.
+        """
+        records: Dict[str, List[LiteRecord]] = {}
+        period_keys: Dict[str, int] = {}
+        with Path(file_path).open('r', encoding='utf-8-sig', newline='') as file:
+            reader = csv.reader(file, delimiter=';')
+            header = next(reader, [])
+            positions = {name: position for position, name in enumerate(header)}
+            missing_columns = [
+                column for column in ('CODIGO', 'PERIODO', 'MATERIA', 'DESCRIPCION_MODO_DE_CALIFICACION',
+                                      'CALIFICACION_FINAL', 'NUMERO_CREDITOS')
+                if column not in positions
+            ]
+            if missing_columns:
+                raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+            code_position = positions['CODIGO']
+            period_position = positions['PERIODO']
+            subject_position = positions['MATERIA']
+            status_position = positions.get('ESTATUS_CURSO')
+            mode_position = positions['DESCRIPCION_MODO_DE_CALIFICACION']
+            grade_position = positions['CALIFICACION_FINAL']
+            credits_position = positions['NUMERO_CREDITOS']
+
+            for row in reader:
+                if len(row) < len(header):
+                    # Missing trailing fields are empty values
+                    row.extend([''] * (len(header) - len(row)))
+                student_code = row[code_position]
+                if wanted is not None and student_code not in wanted:
+                    continue
+
+                period = row[period_position]
+                period_key = period_keys.get(period)
+                if period_key is None:
+                    try:
+                        period_key = Period.to_key(period)
+                    except ValueError:
+                        period_key = Period.INVALID_KEY
+                    period_keys[period] = period_key
+
+                approved = ApprovalRules.is_approved(
+                    row[status_position] if status_position is not None else None,
+                    row[mode_position],
+                    row[grade_position]
+                )
+                records.setdefault(student_code, []).append(LiteRecord(
+                    period_key, row[subject_position], LiteDataset._to_float(row[credits_position]), approved
+                ))
+
+        # A stable sort keeps the file order of the records of the same period
+        for student_records in records.values():
+            student_records.sort(key=attrgetter('period_key'))
+        return records
+
+    @staticmethod
+    def _read_cache(
+        directory: Path,
+        manifest: Dict[str, object],
+        wanted: Optional[Set[str]]
+    ) -> Dict[str, List[LiteRecord]]:
+        """
+        Reads the records from the columnar cache, already normalized and sorted by CSVReader.
+        """
+        arrays = ColumnarCache.load_arrays(directory, manifest['columns'], LiteDataset.CACHE_COLUMNS)
+        student_ids, student_categories = arrays['CODIGO']
+        student_codes = student_categories.tolist()
+        if wanted is None:
+            rows = np.arange(len(student_ids))
+        else:
+            student_positions = {code: position for position, code in enumerate(student_codes)}
+            wanted_ids = [student_positions[code] for code in wanted if code in student_positions]
+            rows = np.flatnonzero(np.isin(student_ids, wanted_ids))
+
+        subject_ids, subjects = arrays['MATERIA']
+        # Records without a subject have the code -1, which maps to the trailing 'nan' of CSVReader
+        subject_names = subjects.tolist() + ['nan']
+        records: Dict[str, List[LiteRecord]] = {}
+        for student_id, subject_id, credits, approved, period_key in zip(
+            student_ids[rows].tolist(),
+            subject_ids[rows].tolist(),
+            arrays['NUMERO_CREDITOS'][0][rows].tolist(),
+            arrays[LiteDataset.APPROVED_COLUMN][0][rows].tolist(),
+            arrays[LiteDataset.PERIOD_KEY_COLUMN][0][rows].tolist()
+        ):
+            if student_id < 0:
+                continue
+            records.setdefault(student_codes[student_id], []).append(
+                LiteRecord(period_key, subject_names[subject_id], credits, approved)
+            )
+        return records
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Releases the loaded records.
+        """
+        LiteDataset._records = None
+
+    @staticmethod
+    def get_student_records(student_code: str) -> List[LiteRecord]:
+        """
+        :return: The records of a student sorted by period key, or an empty list if the student has none.
+        """
+        if LiteDataset._records is None:
+            print("No records loaded.")
+            return []
+        return LiteDataset._records.get(str(student_code), [])
+
+    @staticmethod
+    def get_record_count() -> int:
+        """
+        :return: The number of loaded records.
+        """
+        if LiteDataset._records is None:
+            return 0
+        return sum(len(student_records) for student_records in LiteDataset._records.values())
@@ -0,0 +1,82 @@
+from typing import Dict, List, Tuple
+from lite_engine.lite_dataset import LiteDataset, LiteRecord
+from utils.period import Period
+from utils.profiler import Profiler
+
+
+class LiteStudentRegistryManager:
+    """
+    Pandas-free StudentRegistryManager over the records loaded by LiteDataset. It exposes the same
+    interface and builds the same subject map, so the report logic produces identical reports.
+    """
+    def __init__(self, student_code: str, specified_period: str) -> None:
+        """
+        Initializes the registry manager with the records of a student and the records before a specified period.
+
+        :param student_code: The student code to retrieve records.
+        :param specified_period: The period up to which to filter records.
+        """
+        self.student_code: str = student_code
+        self.specified_period: str = specified_period
+
+        self.full_student_records: List[LiteRecord] = LiteDataset.get_student_records(student_code)
+        if not self.full_student_records:
+            Profiler.report_diagnostic("No records found for student code", student_code)
+
+        # Records are sorted by period key, so a single comparison per record keeps the ones before the cutoff
+        limit_key = Period.to_key(specified_period)
+        self.student_records_until_specified_period: List[LiteRecord] = [
+            record for record in self.full_student_records if record.period_key < limit_key
+        ]
+        if not self.student_records_until_specified_period:
+            Profiler.report_diagnostic(f"No records found before period {specified_period}",
+                                       student_code if self.full_student_records else None)
+
+        self.subject_map: Dict[str, Tuple[bool, float]] = self._build_subject_map()
+
+    def _build_subject_map(self) -> Dict[str, Tuple[bool, float]]:
+        """
+        Builds the subject code -> (approved, credits) map of the student, with the rules of
+        StudentRegistryManager: a subject is approved if any attempt before the specified period was
+        approved, and its credits come from its first record.
+
+        :return: A dictionary keyed by subject code.
+        """
+        subject_map: Dict[str, Tuple[bool, float]] = {}
+        for record in self.full_student_records:
+            if record.subject not in subject_map:
+                subject_map[record.subject] = (False, float(record.credits))
+        for record in self.student_records_until_specified_period:
+            if record.approved:
+                subject_map[record.subject] = (True, subject_map[record.subject][1])
+        return subject_map
+
+    def approve_subject_until_specified_period(self, subject_code: str) -> bool:
+        """
+        Checks if the student has passed or homologated a specific subject before the specified period.
+
+        :param subject_code: The subject code to check for approval.
+        :return: True if the student has passed or homologated the subject before the specified period, False otherwise.
+        """
+        Profiler.count('approval_checks')
+        approved, _ = self.subject_map.get(str(subject_code), (False, 0.0))
+        return approved
+
+    def get_subject_credits(self, subject_code: str) -> float:
+        """
+        Retrieves the number of credits for a specific subject for this student.
+
+        :param subject_code: The code of the subject to retrieve credits for.
+        :return: The number of credits for the specified subject as a float. Returns 0.0 if not found.
+        """
+        subject_entry = self.subject_map.get(str(subject_code))
+        if subject_entry is None:
+            Profiler.report_diagnostic("No credit information found for subject code", subject_code)
+            return 0.0
+        return subject_entry[1]
+
+    def __repr__(self) -> str:
+        return (f"LiteStudentRegistryManager(student_code={self.student_code}, "
+                f"specified_period={self.specified_period}, "
+                f"full_student_records={len(self.full_student_records)} records, "
+                f"student_records_until_specified_period={len(self.student_records_until_specified_period)} records)")
@@ -1,48 +1,174 @@
+import argparse
 import yaml
-import json
 from pathlib import Path
-from csv_reader.csv_reader import CSVReader
-from student_registry_manager.student_registry_manager import StudentRegistryManager
-from deserialization.complete_data import CompleteData
-from report_logic.complete_report_logic import CompleteReportLogic
-from output_printer.output_printer import save_report
+from typing import List, Optional
+from report_runner.job_runner import JobRunner, ReportJob
+from report_logic.related_course_bundles_logic import RelatedCourseBundlesLogic
+from utils.period import Period
+from utils.profiler import Profiler
+from utils.shard import Shard
 
-def main(config_path: Path) -> None:
+def validate_single_student_engine(data_engine: str, csv_path: Path, jobs: List[ReportJob], workers: int) -> None:
+    """
+    Checks that every job can run on the lite, snapshot or sqlite engine, which only build complete reports
+    one student at a time.
+
+    :param data_engine: The name of the engine, `lite`, `snapshot` or `sqlite`.
+    :raises ValueError: If the data source or a job option needs the pandas engine.
+    """
+    if data_engine == 'lite' and csv_path.is_dir():
+        raise ValueError("The lite engine reads CSV files; period stores need the pandas engine.")
+    # Several processes can read the same SQLite store
+    if workers > 1 and data_engine != 'sqlite':
+        raise ValueError(f"The {data_engine} engine runs in a single process; "
+                         f"remove --workers or use the pandas engine.")
+    for job in jobs:
+        # Remaining credits need the course catalog, which is built from the whole dataset
+        if (job.report_type != 'complete' or job.report_engine != 'student' or job.incremental
+                or job.remaining_credits):
+            raise ValueError(f"Job '{job.report_name}' needs the pandas engine: the {data_engine} engine "
+                             f"only builds complete reports with the student engine, without incremental runs "
+                             f"or remaining credits.")
+
+def parse_shard(value: str) -> Shard:
+    """
+    Parses the --shard option, reporting an invalid value as a command line error.
+    """
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def main(
+    config_path: Path,
+    workers: int = 1,
+    profile_dir: Optional[Path] = None,
+    shard: Optional[Shard] = None
+) -> None:
     """
     Main function to generate and save the complete report for each student in the list.
-    
+    When the configuration has a `jobs` list, every job runs against the same loaded dataset.
+
     :param config_path: Path to the YAML configuration file.
+    :param workers: Number of worker processes used to generate the reports.
+    :param profile_dir: Optional directory where the profile of the run is saved.
+    :param shard: The shard to run, if the students are split across several runs.
     """
+    if profile_dir is not None:
+        Profiler.enable()
+
     # Load configuration from YAML file
-    with config_path.open('r', encoding='utf-8') as file:
+    with Profiler.stage('load_config'), config_path.open('r', encoding='utf-8') as file:
         config = yaml.safe_load(file)
-    
+
     csv_path = Path(config['data_set_path'])
-    specified_period = config['report_until_date']
-    json_path = Path(config['curriculum_structure_path'])
-    output_dir = Path(config['output_path'])
-    student_codes_path = Path(config['student_codes'])
-    report_name = config['report_name']
-    
-    # Load CSV data into a singleton CSVReader
-    CSVReader(csv_path)
-    
-    # Load CompleteData from the JSON file
-    complete_data = CompleteData.from_json_file(json_path)
-    
-    # Load student codes from the JSON file
-    with student_codes_path.open('r', encoding='utf-8') as file:
-        student_codes = json.load(file)
-    
-    # Generate and save a report for each student
-    for student_code in student_codes:
-        student_registry_manager = StudentRegistryManager(str(student_code), specified_period)
-        complete_report = CompleteReportLogic.get_complete_report(complete_data, student_registry_manager)
-        save_report(complete_report, output_dir, report_name, str(student_code))
+    cache_dir = Path(config['data_cache_path']) if config.get('data_cache_path') else None
+    lean_loading = config.get('data_loading_mode', 'full') == 'lean'
+    curriculum_cache_dir = Path(config['curriculum_cache_path']) if config.get('curriculum_cache_path') else None
+    if 'group_summary_cache_size' in config:
+        RelatedCourseBundlesLogic.set_summary_cache_size(config['group_summary_cache_size'])
+
+    # Without a jobs list, the top-level keys describe a single job
+    job_configs = config.get('jobs') or [{}]
+    jobs = [ReportJob.from_config(job_config, config) for job_config in job_configs]
+
+    # Validate the cutoff periods before loading any data
+    for job in jobs:
+        Period.to_key(job.report_until_date)
+
+    data_engine = config.get('data_engine', 'pandas')
+    if data_engine in ('lite', 'snapshot', 'sqlite'):
+        validate_single_student_engine(data_engine, csv_path, jobs, workers)
+
+    if data_engine == 'snapshot':
+        if not config.get('approval_snapshot_path'):
+            raise ValueError("The snapshot engine needs an approval_snapshot_path.")
+        from csv_reader.approval_snapshot_store import ApprovalSnapshotStore
+        from csv_reader.period_store import PeriodStore
+        from student_registry_manager.snapshot_registry_manager import SnapshotStudentRegistryManager
+
+        snapshot_dir = Path(config['approval_snapshot_path'])
+        with Profiler.stage('csv_load'):
+            source_hash = PeriodStore.compute_source_hash(csv_path)
+            manifest = ApprovalSnapshotStore.read_manifest(snapshot_dir)
+            if manifest is not None and manifest['source_hash'] == source_hash:
+                store = ApprovalSnapshotStore(snapshot_dir)
+                print(f"Approval snapshots loaded from {snapshot_dir}.")
+            else:
+                # The store is built from the whole dataset once, then the DataFrame is released
+                from csv_reader.csv_reader import CSVReader
+                CSVReader(csv_path, cache_dir, lean_loading)
+                with Profiler.stage('snapshot_build'):
+                    store = ApprovalSnapshotStore.build(snapshot_dir, CSVReader.get_data(), source_hash)
+                CSVReader.reset()
+        SnapshotStudentRegistryManager.store = store
+        runner = JobRunner(
+            csv_path, cache_dir, lean_loading, workers, curriculum_cache_dir, SnapshotStudentRegistryManager, shard
+        )
+    elif data_engine == 'sqlite':
+        if not config.get('sqlite_path'):
+            raise ValueError("The sqlite engine needs a sqlite_path.")
+        from csv_reader.csv_reader import CSVReader
+        from csv_reader.period_store import PeriodStore
+        from csv_reader.sqlite_store import SQLiteStore
+
+        sqlite_path = Path(config['sqlite_path'])
+        with Profiler.stage('csv_load'):
+            source_hash = PeriodStore.compute_source_hash(csv_path)
+            if SQLiteStore.read_source_hash(sqlite_path) != source_hash:
+                # The database is written from the whole dataset once, then the DataFrame is released
+                CSVReader(csv_path, cache_dir, lean_loading)
+                with Profiler.stage('sqlite_build'):
+                    SQLiteStore.build(sqlite_path, CSVReader.get_data(), source_hash).close()
+                CSVReader.reset()
+            CSVReader(sqlite_path)
+        # Worker processes open the database instead of the CSV file
+        runner = JobRunner(sqlite_path, None, False, workers, curriculum_cache_dir, shard=shard, source_path=csv_path)
+    elif data_engine == 'lite':
+        # Imported here so neither engine pays for the imports of the other
+        from lite_engine.lite_dataset import LiteDataset
+        from lite_engine.lite_registry_manager import LiteStudentRegistryManager
+
+        runner = JobRunner(
+            csv_path, cache_dir, lean_loading, workers, curriculum_cache_dir, LiteStudentRegistryManager, shard
+        )
+        # Only the records of the students of the jobs (and of the shard) are kept
+        with Profiler.stage('csv_load'):
+            LiteDataset.load(csv_path, cache_dir, lean_loading, runner.get_student_codes(jobs))
+    else:
+        from csv_reader.csv_reader import CSVReader
+
+        runner = JobRunner(csv_path, cache_dir, lean_loading, workers, curriculum_cache_dir, shard=shard)
+        # Load CSV data into a singleton CSVReader, through the columnar cache when configured.
+        # A period store only needs the periods before the latest cutoff, and a shard only its students.
+        latest_period = max((job.report_until_date for job in jobs), key=Period.to_key)
+        shard_student_codes = set(runner.get_student_codes(jobs)) if shard is not None else None
+        with Profiler.stage('csv_load'):
+            CSVReader(csv_path, cache_dir, lean_loading, latest_period, shard_student_codes)
+
+    # Run every job against the loaded dataset
+    with Profiler.stage('run_jobs'):
+        runner.run(jobs)
+
+    hits = Profiler.counters.get('group_summary_hits', 0)
+    misses = Profiler.counters.get('group_summary_misses', 0)
+    if hits + misses:
+        print(f"Group summary cache: {hits} hits, {misses} misses ({hits / (hits + misses):.0%} reused).")
+
+    # Missing credits and records are reported once per message instead of once per subject
+    Profiler.print_diagnostics()
+    if profile_dir is not None:
+        Profiler.save(profile_dir)
 
 if __name__ == "__main__":
-    # Define the path to the configuration file
-    config_path = Path("src/config.yml")
+    parser = argparse.ArgumentParser(description="Generate academic progress reports.")
+    parser.add_argument("--config", type=Path, default=Path("src/config.yml"), help="Path to the configuration file.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--profile", type=Path, nargs='?', const=Path("profile"), default=None,
+                        help="Save a profile of the run to this directory (default: profile).")
+    parser.add_argument("--shard", type=parse_shard, default=None,
+                        help="Only process the students of shard i of N, given as i/N with 0 <= i < N.")
+    args = parser.parse_args()
 
     # Run the main function
-    main(config_path)
\ No newline at end of file
+    main(args.config, args.workers, args.profile, args.shard)
@@ -0,0 +1,35 @@
+import argparse
+import yaml
+from pathlib import Path
+from report_runner.job_runner import JobRunner, ReportJob
+from report_runner.shard_merger import ShardMerger
+
+def merge_shards(config_path: Path, shards: int) -> None:
+    """
+    Merges the output of every job of a sharded run, once every shard has completed it.
+
+    :param config_path: Path to the YAML configuration file the shards ran with.
+    :param shards: The number of shards of the run.
+    """
+    with config_path.open('r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+
+    curriculum_cache_dir = Path(config['curriculum_cache_path']) if config.get('curriculum_cache_path') else None
+    job_configs = config.get('jobs') or [{}]
+    jobs = [ReportJob.from_config(job_config, config) for job_config in job_configs]
+
+    # The runner only reads the curricula and student lists; no dataset is loaded
+    runner = JobRunner(Path(config['data_set_path']), curriculum_cache_dir=curriculum_cache_dir)
+    merger = ShardMerger(runner, shards)
+    for job in jobs:
+        print(f"Merging job '{job.report_name}' from {shards} shards")
+        merger.merge(job)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the output of the shards of a sharded run.")
+    parser.add_argument("--config", type=Path, default=Path("src/config.yml"), help="Path to the configuration file.")
+    parser.add_argument("--shards", type=int, required=True, help="Number of shards of the run.")
+    args = parser.parse_args()
+
+    # Run the merge
+    merge_shards(args.config, args.shards)
@@ -1,6 +1,17 @@
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, IO, Optional, Union
+from utils.shard import Shard
+
+
+class SetEncoder(json.JSONEncoder):
+    """
+    JSON encoder that writes sets as lists while encoding, without copying the report tree.
+    """
+    def default(self, o: Any) -> Any:
+        if isinstance(o, (set, frozenset)):
+            return list(o)
+        return super().default(o)
 
 def convert_sets_to_lists(data: Any) -> Any:
     """
@@ -18,7 +29,19 @@ def convert_sets_to_lists(data: Any) -> Any:
     else:
         return data
 
-def save_report(report: Dict[str, Any], output_dir: Path, file_name: str, student_code: str) -> None:
+def get_report_path(output_dir: Path, file_name: str, student_code: str) -> Path:
+    """
+    :return: The path of the JSON report file of a student.
+    """
+    return output_dir / f"{file_name}-{student_code}.json"
+
+def save_report(
+    report: Dict[str, Any],
+    output_dir: Path,
+    file_name: str,
+    student_code: str,
+    compact: bool = False
+) -> None:
     """
     Saves the report to a JSON file in the specified output directory.
     
@@ -26,10 +49,116 @@ def save_report(report: Dict[str, Any], output_dir: Path, file_name: str, studen
     :param output_dir: The directory where the report file will be saved.
     :param file_name: The base name of the report file.
     :param student_code: The student code to include in the report file name.
+    :param compact: Whether to write the report without indentation and whitespace.
     """
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_file = output_dir / f"{file_name}-{student_code}.json"
-    report = convert_sets_to_lists(report)
+    output_file = get_report_path(output_dir, file_name, student_code)
     with output_file.open('w', encoding='utf-8') as file:
-        json.dump(report, file, ensure_ascii=False, indent=4)
-    print(f"Report saved to {output_file}")
\ No newline at end of file
+        if compact:
+            json.dump(report, file, ensure_ascii=False, separators=(',', ':'), cls=SetEncoder)
+        else:
+            json.dump(report, file, ensure_ascii=False, indent=4, cls=SetEncoder)
+    print(f"Report saved to {output_file}")
+
+
+class JSONReportWriter:
+    """
+    Writes one JSON file per student, following the `{file_name}-{student_code}.json` layout.
+    """
+    def __init__(self, output_dir: Path, file_name: str, compact: bool = False) -> None:
+        self.output_dir = output_dir
+        self.file_name = file_name
+        self.compact = compact
+
+    def write(self, student_code: str, report: Dict[str, Any]) -> None:
+        save_report(report, self.output_dir, self.file_name, student_code, self.compact)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'JSONReportWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class NDJSONReportWriter:
+    """
+    Streams every report into newline-delimited JSON files, one `{"student_code", "report"}` object per line.
+    With several shards, each student is assigned to a shard by a stable hash of its code.
+    """
+    def __init__(self, output_dir: Path, file_name: str, shards: int = 1, compact: bool = True) -> None:
+        """
+        :param output_dir: The directory where the NDJSON files will be saved.
+        :param file_name: The base name of the NDJSON files.
+        :param shards: The number of files the reports are spread across.
+        :param compact: Whether to encode without whitespace after separators.
+        """
+        self.shards = max(1, shards)
+        separators = (',', ':') if compact else (', ', ': ')
+        self.encoder = SetEncoder(ensure_ascii=False, separators=separators)
+        self.report_counts = [0] * self.shards
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_files = NDJSONReportWriter.get_output_files(output_dir, file_name, self.shards)
+        # Every file is truncated up front, so a file that receives no report in this run does not keep
+        # the reports of a previous run
+        self.files: List[Optional[IO[str]]] = [
+            output_file.open('w', encoding='utf-8') for output_file in self.output_files
+        ]
+
+    @staticmethod
+    def get_output_files(output_dir: Path, file_name: str, shards: int = 1) -> List[Path]:
+        """
+        :return: The path of each NDJSON file.
+        """
+        if shards <= 1:
+            return [output_dir / f"{file_name}.ndjson"]
+        return [output_dir / f"{file_name}-{shard:03d}-of-{shards:03d}.ndjson" for shard in range(shards)]
+
+    def write(self, student_code: str, report: Dict[str, Any]) -> None:
+        line = self.encoder.encode({"student_code": student_code, "report": report})
+        shard = Shard.get_shard_index(student_code, self.shards)
+        self.files[shard].write(line + "\n")
+        self.report_counts[shard] += 1
+
+    def close(self) -> None:
+        for shard, file in enumerate(self.files):
+            if file is not None:
+                file.close()
+                self.files[shard] = None
+        written_files = ", ".join(
+            f"{output_file} ({count})" for output_file, count in zip(self.output_files, self.report_counts)
+        )
+        print(f"{sum(self.report_counts)} reports saved to {written_files}")
+
+    def __enter__(self) -> 'NDJSONReportWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def create_report_writer(
+    output_format: str,
+    output_dir: Path,
+    file_name: str,
+    shards: int = 1,
+    compact: bool = False
+) -> Union[JSONReportWriter, NDJSONReportWriter]:
+    """
+    Creates the report writer for the configured output format.
+
+    :param output_format: Either "json" (one file per student) or "ndjson" (consolidated files).
+    :param output_dir: The directory where the reports will be saved.
+    :param file_name: The base name of the report files.
+    :param shards: The number of NDJSON files the reports are spread across.
+    :param compact: Whether to encode the reports without whitespace.
+    :return: A JSONReportWriter or NDJSONReportWriter instance.
+    """
+    if output_format == 'ndjson':
+        return NDJSONReportWriter(output_dir, file_name, shards, compact)
+    if output_format == 'json':
+        return JSONReportWriter(output_dir, file_name, compact)
+    raise ValueError(f"Unknown output format '{output_format}': expected 'json' or 'ndjson'.")
@@ -1,21 +1,72 @@
+from typing import List
+import numpy as np
 import pandas as pd
 from utils.period import Period
+from utils.profiler import Profiler
 
 class PeriodQueries:
-    
+    # Name of the integer period key column computed once at load time
+    PERIOD_KEY_COLUMN = 'CLAVE_PERIODO'
+
+    @staticmethod
+    def compute_period_keys(periods: pd.Series) -> pd.Series:
+        """
+        Converts a column of period strings into integer period keys (year * 10 + semester).
+        Each distinct period is parsed only once; invalid periods get Period.INVALID_KEY.
+
+        :param periods: A Series of periods in YYYYXZ format.
+        :return: An int32 Series of period keys aligned with the given periods.
+        """
+        codes, uniques = pd.factorize(periods)
+        unique_keys = []
+        for period in uniques:
+            try:
+                unique_keys.append(Period.to_key(period))
+            except ValueError:
+                unique_keys.append(Period.INVALID_KEY)
+
+        # Missing periods are factorized as -1, which maps to the trailing invalid key
+        lookup = np.array(unique_keys + [Period.INVALID_KEY], dtype=np.int32)
+        return pd.Series(lookup[codes], index=periods.index, dtype='int32')
+
+    @staticmethod
+    def get_invalid_periods(periods: pd.Series, period_keys: pd.Series) -> List[str]:
+        """
+        Collects the distinct period values that could not be converted into a period key.
+
+        :param periods: A Series of periods in YYYYXZ format.
+        :param period_keys: The period keys computed for those periods.
+        :return: A list with the distinct invalid period values.
+        """
+        invalid_periods = periods[period_keys == Period.INVALID_KEY]
+        return [str(period) for period in pd.unique(invalid_periods)]
+
     @staticmethod
     def filter_records_before_period(records: pd.DataFrame, period: str) -> pd.DataFrame:
         """
         Filters records to include only those before a specified period.
-        
+        Records sorted by period key are cut with a binary search; otherwise a single vectorized
+        comparison is used.
+
         :param records: The DataFrame containing the records to filter.
         :param period: A string in YYYYXZ format (e.g., "202120") as the exclusive upper limit.
         :return: A DataFrame with records before the specified period.
         """
-        # Apply the filtering function using Period's is_before_period
-        filtered_records = records[records['PERIODO'].apply(lambda p: Period.is_before_period(p, period))]
-        
+        limit_key = Period.to_key(period)
+
+        if PeriodQueries.PERIOD_KEY_COLUMN in records.columns:
+            period_keys = records[PeriodQueries.PERIOD_KEY_COLUMN]
+        else:
+            period_keys = PeriodQueries.compute_period_keys(records['PERIODO'])
+
+        Profiler.count('dataframe_filters')
+        if period_keys.is_monotonic_increasing:
+            filtered_records = records.iloc[:int(period_keys.searchsorted(limit_key, side='left'))]
+        else:
+            filtered_records = records[period_keys < limit_key]
+
         if filtered_records.empty:
-            print(f"No records found before period: {period}")
-        
+            student_code = records['CODIGO'].iloc[0] if not records.empty and 'CODIGO' in records.columns else None
+            Profiler.report_diagnostic(f"No records found before period {period}", student_code)
+
         return filtered_records.reset_index(drop=True)
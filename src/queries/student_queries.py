@@ -1,33 +1,48 @@
 import pandas as pd
-from csv_reader.csv_reader import CSVReader  
-from utils.period import Period  
+from csv_reader.csv_reader import CSVReader
+from utils.profiler import Profiler
 
 class StudentQueries:
-    
+
     @staticmethod
     def get_student_records(student_code: str) -> pd.DataFrame:
         """
         Retrieves records for a specific student by their student code.
-        
+        The lookup uses the student index built at load time, so it only touches the student's own rows.
+
         :param student_code: The student code to filter records.
         :return: A DataFrame containing the student's records, or logs if not found.
         """
-        # Fetch the main data using CSVReader
+        # Ensure student_code is a string for correct comparison
+        student_code = str(student_code)
+
+        # A SQLite store answers with an indexed query instead of slicing the in-memory dataset
+        sqlite_store = CSVReader.get_sqlite_store()
+        if sqlite_store is not None:
+            Profiler.count('sql_queries')
+            student_records = sqlite_store.get_student_records(student_code)
+            if student_records.empty:
+                Profiler.report_diagnostic("No records found for student code", student_code)
+            return student_records
+
+        # Fetch the main data and the student index using CSVReader
         df = CSVReader.get_data()
-        if df is None:
+        student_index = CSVReader.get_student_index()
+        if df is None or student_index is None:
             print("No data found in CSV.")
             return pd.DataFrame()  # Return an empty DataFrame if no data
 
-        # Ensure student_code is a string for correct comparison
-        student_code = str(student_code)
-        
-        # Filter records for the specified student
-        student_records = df[df['CODIGO'].astype(str) == student_code].copy()
-        
-        if student_records.empty:
-            print(f"No records found for student code: {student_code}")
-            return pd.DataFrame()  # Return empty DataFrame if no records are found
-        
-        # Ensure 'PERIODO' is treated as a string
-        student_records['PERIODO'] = student_records['PERIODO'].astype(str)
+        # Slice the contiguous block of rows for the specified student
+        bounds = student_index.get_bounds(student_code)
+
+        if bounds is None:
+            Profiler.report_diagnostic("No records found for student code", student_code)
+            return df.iloc[0:0].copy()  # Return an empty DataFrame that keeps the dataset columns
+
+        start, stop = bounds
+        Profiler.count('dataframe_filters')
+        Profiler.count('dataframe_copies')
+        student_records = df.iloc[start:stop].copy()
+
+        # 'PERIODO' is already loaded as a string and sorted by its period key within the student
         return student_records.reset_index(drop=True)
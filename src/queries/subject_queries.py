@@ -1,4 +1,5 @@
 import pandas as pd
+from utils.profiler import Profiler
 
 class SubjectQueries:
     @staticmethod
@@ -14,6 +15,8 @@ class SubjectQueries:
         subject_code = str(subject_code)
         
         # Filter records for the specified subject
+        Profiler.count('dataframe_filters')
+        Profiler.count('dataframe_copies')
         subject_records = df[df['MATERIA'] == subject_code].copy()
         
         return subject_records.reset_index(drop=True)
@@ -34,5 +37,5 @@ class SubjectQueries:
         if not subject_records.empty and "NUMERO_CREDITOS" in subject_records.columns:
             return subject_records["NUMERO_CREDITOS"].iloc[0]  # Retrieve the first credit value found
         else:
-            print(f"No credit information found for subject code: {subject_code}")
+            Profiler.report_diagnostic("No credit information found for subject code", subject_code)
             return 0.0
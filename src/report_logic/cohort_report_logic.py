@@ -0,0 +1,251 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from csv_reader.csv_reader import CSVReader
+from deserialization.compiled_curriculum import CompiledCurriculum
+from queries.period_queries import PeriodQueries
+from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+from utils.period import Period
+from utils.profiler import Profiler
+
+
+@dataclass
+class CohortMatrices:
+    """
+    Dense matrices describing a whole cohort against a curriculum:
+    - student_codes: Row labels, one per distinct student.
+    - course_codes: Column labels, every course of the curriculum.
+    - approved: Boolean student x course matrix, True if the course was approved before the cutoff.
+    - credits: Float student x course matrix with the credits of each course taken by the student.
+    - taken: Boolean student x course matrix, True if the student has any record of the course.
+    - bundle_names: Names of the course bundles, in curriculum order.
+    - bundle_incidence: Float course x bundle matrix, 1.0 if the course belongs to the bundle.
+    - bundle_total_credits: Minimum credits to pass of each bundle.
+    """
+    student_codes: List[str]
+    course_codes: List[str]
+    approved: np.ndarray
+    credits: np.ndarray
+    taken: np.ndarray
+    bundle_names: List[str]
+    bundle_incidence: np.ndarray
+    bundle_total_credits: np.ndarray
+
+    def get_approved_credits(self) -> np.ndarray:
+        """
+        :return: A student x bundle matrix with the approved credits of each bundle.
+        """
+        return np.where(self.approved, self.credits, 0.0) @ self.bundle_incidence
+
+    def get_approved_counts(self) -> np.ndarray:
+        """
+        :return: A student x bundle matrix with the number of approved courses of each bundle.
+        """
+        return self.approved.astype(np.float64) @ self.bundle_incidence
+
+    def get_completion_percentages(self, approved_credits: np.ndarray) -> np.ndarray:
+        """
+        Computes the completion percentage of each bundle, capped at 100 and 0 for bundles without credits.
+
+        :param approved_credits: A student x bundle matrix with the approved credits of each bundle.
+        :return: A student x bundle matrix with the completion percentages.
+        """
+        total_credits = self.bundle_total_credits.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            completion = np.minimum(approved_credits / total_credits * 100, 100.0)
+        return np.where(total_credits == 0, 0.0, completion)
+
+
+class CohortReportLogic:
+    @staticmethod
+    def _get_student_positions(student_codes: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Collects the dataset row positions of every student using the student index.
+
+        :return: A tuple (positions, student_rows) with the dataset positions and the matrix row of each one.
+        """
+        student_index = CSVReader.get_student_index()
+        ranges: List[np.ndarray] = []
+        rows: List[np.ndarray] = []
+        if student_index is not None:
+            for row, student_code in enumerate(student_codes):
+                bounds = student_index.get_bounds(student_code)
+                if bounds is None:
+                    Profiler.report_diagnostic("No records found for student code", student_code)
+                    continue
+                start, stop = bounds
+                ranges.append(np.arange(start, stop))
+                rows.append(np.full(stop - start, row))
+
+        if not ranges:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(ranges), np.concatenate(rows)
+
+    @staticmethod
+    def build_cohort_matrices(
+        compiled: CompiledCurriculum,
+        student_codes: List[str],
+        specified_period: str
+    ) -> CohortMatrices:
+        """
+        Builds the approval and credits matrices of a cohort in one pass over its records.
+        Approvals follow the same rules as StudentRegistryManager: a course is approved if any of its
+        attempts before the specified period was approved, and its credits come from the first record
+        of the course in the student's full records.
+
+        :param compiled: An instance of CompiledCurriculum.
+        :param student_codes: The distinct student codes of the cohort.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :return: An instance of CohortMatrices.
+        """
+        limit_key = Period.to_key(specified_period)
+        course_codes = compiled.course_codes
+
+        approved = np.zeros((len(student_codes), len(course_codes)), dtype=bool)
+        credits = np.zeros((len(student_codes), len(course_codes)), dtype=np.float64)
+        taken = np.zeros((len(student_codes), len(course_codes)), dtype=bool)
+
+        data = CSVReader.get_data()
+        positions, student_rows = CohortReportLogic._get_student_positions(student_codes)
+        if data is not None and len(positions):
+            records = data.iloc[positions]
+            course_columns = pd.Categorical(records['MATERIA'], categories=course_codes).codes.astype(np.int64)
+            in_curriculum = course_columns >= 0
+            student_rows = student_rows[in_curriculum]
+            course_columns = course_columns[in_curriculum]
+            record_credits = records['NUMERO_CREDITOS'].to_numpy(dtype=np.float64)[in_curriculum]
+            record_approved = (
+                records[ApproveSubjectLogic.APPROVED_COLUMN].to_numpy(dtype=bool)
+                & (records[PeriodQueries.PERIOD_KEY_COLUMN].to_numpy() < limit_key)
+            )[in_curriculum]
+
+            # Credits come from the first record of each (student, course) pair
+            cells = student_rows * len(course_codes) + course_columns
+            _, first_records = np.unique(cells, return_index=True)
+            credits[student_rows[first_records], course_columns[first_records]] = record_credits[first_records]
+            taken[student_rows[first_records], course_columns[first_records]] = True
+
+            # Any approved attempt before the cutoff approves the course
+            approved[student_rows[record_approved], course_columns[record_approved]] = True
+
+        return CohortMatrices(
+            student_codes=student_codes,
+            course_codes=course_codes,
+            approved=approved,
+            credits=credits,
+            taken=taken,
+            bundle_names=compiled.bundle_names,
+            bundle_incidence=compiled.get_bundle_incidence(),
+            bundle_total_credits=compiled.bundle_minimum_credits
+        )
+
+    @staticmethod
+    def get_complete_reports(
+        compiled: CompiledCurriculum,
+        student_codes: List[str],
+        specified_period: str,
+        course_credits: Optional[np.ndarray] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generates the complete report of every student of a cohort from the cohort matrices.
+        Each report matches the one produced by CompleteReportLogic.get_complete_report.
+
+        :param compiled: An instance of CompiledCurriculum.
+        :param student_codes: The student codes of the cohort.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :param course_credits: Optional catalog credits of each course ID; when given, the bundles also
+                               report their remaining and available credits.
+        :return: A dictionary mapping each student code to its complete report.
+        """
+        unique_student_codes = list(dict.fromkeys(str(code) for code in student_codes))
+        with Profiler.stage('cohort_matrices'):
+            matrices = CohortReportLogic.build_cohort_matrices(compiled, unique_student_codes, specified_period)
+
+        # Simple courses keep the order (and repetitions) of the curriculum list
+        simple_course_codes = [compiled.course_codes[course_id] for course_id in compiled.simple_course_ids]
+        simple_approved = matrices.approved[:, compiled.simple_course_ids]
+        total_courses = len(simple_course_codes)
+        total_approved_courses = simple_approved.sum(axis=1)
+
+        approved_credits = matrices.get_approved_credits()
+        approved_counts = matrices.get_approved_counts()
+        completion_percentages = matrices.get_completion_percentages(approved_credits)
+
+        # Bundle with the highest completion percentage of each group; ties keep the first bundle
+        group_columns = {
+            group_name: compiled.get_group_bundle_ids(group_id) for group_id, group_name in enumerate(compiled.group_names)
+        }
+        highest_columns = {
+            group_name: columns[np.argmax(completion_percentages[:, columns], axis=1)]
+            for group_name, columns in group_columns.items() if len(columns)
+        }
+
+        bundle_course_columns = [
+            [(compiled.course_codes[course_id], course_id) for course_id in compiled.get_bundle_course_ids(bundle_id)]
+            for bundle_id in range(len(compiled.bundle_names))
+        ]
+        bundle_total_credits = [
+            compiled.get_bundle_minimum_credits(bundle_id) for bundle_id in range(len(compiled.bundle_names))
+        ]
+
+        available_credits = None
+        if course_credits is not None:
+            # Catalog credits of the courses of each bundle that are not approved yet
+            available_credits = np.where(matrices.approved, 0.0, course_credits) @ matrices.bundle_incidence
+
+        reports: Dict[str, Dict[str, Any]] = {}
+        for row, student_code in enumerate(matrices.student_codes):
+            approved_row = matrices.approved[row]
+
+            bundles_info: Dict[str, Dict[str, Any]] = {}
+            for column, bundle_name in enumerate(matrices.bundle_names):
+                # Credits of bundles without approved courses are reported as an integer 0
+                has_approved = approved_counts[row, column] > 0
+                bundles_info[bundle_name] = {
+                    "total_credits": bundle_total_credits[column],
+                    "approved_credits": float(approved_credits[row, column]) if has_approved else 0,
+                    "approved_subject_codes": {
+                        code for code, position in bundle_course_columns[column] if approved_row[position]
+                    },
+                    "completion_percentage": float(completion_percentages[row, column]),
+                }
+                if available_credits is not None:
+                    bundle_info = bundles_info[bundle_name]
+                    bundle_info["remaining_credits"] = max(bundle_info["total_credits"] - bundle_info["approved_credits"], 0)
+                    bundle_info["available_credits"] = float(available_credits[row, column])
+
+            group_report: Dict[str, Any] = {}
+            for group_name, columns in group_columns.items():
+                group_bundles_info = {
+                    matrices.bundle_names[column]: bundles_info[matrices.bundle_names[column]] for column in columns
+                }
+                highest: Dict[str, Any] = {}
+                if group_name in highest_columns:
+                    highest_name = matrices.bundle_names[highest_columns[group_name][row]]
+                    highest_info = bundles_info[highest_name]
+                    highest = {
+                        "bundle_name": highest_name,
+                        "approved_percentage": highest_info["completion_percentage"],
+                        "total_credits": highest_info["total_credits"],
+                        "approved_credits": highest_info["approved_credits"],
+                        "approved_subject_codes": highest_info["approved_subject_codes"],
+                    }
+                group_report[group_name] = {
+                    "course_bundles": group_bundles_info,
+                    "highest_approved_percentage": highest
+                }
+
+            approved_courses = [code for code, approved in zip(simple_course_codes, simple_approved[row]) if approved]
+            approved_count = int(total_approved_courses[row])
+            reports[student_code] = {
+                "simple_courses": {
+                    "approved_courses": approved_courses,
+                    "total_approved_courses": approved_count,
+                    "total_courses": total_courses,
+                    "approval_percentage": (approved_count / total_courses * 100) if total_courses > 0 else 0
+                },
+                "group_of_related_course_bundles": group_report
+            }
+
+        return reports
@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from deserialization.compiled_curriculum import CompiledCurriculum
+from report_logic.cohort_report_logic import CohortMatrices, CohortReportLogic
+from utils.profiler import Profiler
+
+
+class CohortStatisticsLogic:
+    """
+    Program-level statistics of a cohort, computed from the cohort matrices without building the
+    report of each student. The completion percentages follow the same rules as the complete reports.
+    """
+    # Width of the completion histogram bins, in percentage points; 100% falls in the last bin
+    HISTOGRAM_BIN_WIDTH = 10
+    QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+    @staticmethod
+    def _get_histograms(completion_percentages: np.ndarray) -> np.ndarray:
+        """
+        Counts the students of each completion bin for every bundle in a single bincount.
+
+        :param completion_percentages: A student x bundle matrix with the completion percentages.
+        :return: A bundle x bin matrix with the number of students of each bin.
+        """
+        bins = 100 // CohortStatisticsLogic.HISTOGRAM_BIN_WIDTH
+        student_bins = np.minimum(completion_percentages // CohortStatisticsLogic.HISTOGRAM_BIN_WIDTH, bins - 1)
+        bundle_count = completion_percentages.shape[1]
+        cells = student_bins.astype(np.int64) + bins * np.arange(bundle_count)
+        return np.bincount(cells.ravel(), minlength=bundle_count * bins).reshape(bundle_count, bins)
+
+    @staticmethod
+    def _get_simple_course_statistics(
+        compiled: CompiledCurriculum,
+        approved_students: Dict[str, int],
+        student_count: int
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        :param approved_students: The number of students that approved each simple course.
+        :return: The share of the cohort that approved each simple course; repeated courses are listed once.
+        """
+        simple_course_codes = [
+            compiled.course_codes[course_id] for course_id in dict.fromkeys(compiled.simple_course_ids.tolist())
+        ]
+        return {
+            code: {
+                "approved_students": approved_students[code],
+                "approval_percentage": float(approved_students[code] / student_count * 100) if student_count else 0.0,
+            }
+            for code in simple_course_codes
+        }
+
+    @staticmethod
+    def _get_bundle_statistics(compiled: CompiledCurriculum, completion_percentages: np.ndarray) -> Dict[str, Any]:
+        """
+        Summarizes the completion percentages of the cohort for every bundle and group.
+
+        :param completion_percentages: A student x bundle matrix with the completion percentages.
+        :return: A dictionary with the statistics of the bundles and the groups.
+        """
+        student_count = completion_percentages.shape[0]
+        completed = completion_percentages >= 100.0
+        bin_edges = list(range(0, 101, CohortStatisticsLogic.HISTOGRAM_BIN_WIDTH))
+        histograms = CohortStatisticsLogic._get_histograms(completion_percentages)
+        completed_students = completed.sum(axis=0)
+        if student_count:
+            quantiles = np.quantile(completion_percentages, CohortStatisticsLogic.QUANTILES, axis=0)
+            means = completion_percentages.mean(axis=0)
+        else:
+            quantiles = np.zeros((len(CohortStatisticsLogic.QUANTILES), len(compiled.bundle_names)))
+            means = np.zeros(len(compiled.bundle_names))
+
+        course_bundles: Dict[str, Dict[str, Any]] = {}
+        for bundle_id, bundle_name in enumerate(compiled.bundle_names):
+            course_bundles[bundle_name] = {
+                "total_credits": compiled.get_bundle_minimum_credits(bundle_id),
+                "mean_completion_percentage": float(means[bundle_id]),
+                "completion_quantiles": {
+                    f"p{round(quantile * 100)}": float(quantiles[position, bundle_id])
+                    for position, quantile in enumerate(CohortStatisticsLogic.QUANTILES)
+                },
+                "completion_histogram": {
+                    "bin_edges": bin_edges,
+                    "students": histograms[bundle_id].tolist(),
+                },
+                "completed_students": int(completed_students[bundle_id]),
+            }
+
+        groups: Dict[str, Dict[str, Any]] = {}
+        for group_id, group_name in enumerate(compiled.group_names):
+            bundle_ids: List[int] = compiled.get_group_bundle_ids(group_id).tolist()
+            group_completed = completed[:, bundle_ids]
+            groups[group_name] = {
+                "bundles": [compiled.bundle_names[bundle_id] for bundle_id in bundle_ids],
+                # The highest bundle of the group reaches 100%
+                "students_completing_any_bundle": int(group_completed.any(axis=1).sum()) if bundle_ids else 0,
+                "students_completing_all_bundles": int(group_completed.all(axis=1).sum()) if bundle_ids else 0,
+            }
+
+        return {"course_bundles": course_bundles, "group_of_related_course_bundles": groups}
+
+    @staticmethod
+    def get_statistics_from_matrices(compiled: CompiledCurriculum, matrices: CohortMatrices) -> Dict[str, Any]:
+        """
+        Computes the cohort statistics from already built cohort matrices.
+
+        :param compiled: The compiled curriculum the matrices were built with.
+        :param matrices: The cohort matrices.
+        :return: A dictionary with the statistics of the simple courses, the bundles and the groups.
+        """
+        student_count = len(matrices.student_codes)
+        simple_course_ids = list(dict.fromkeys(compiled.simple_course_ids.tolist()))
+        approved_students = matrices.approved[:, simple_course_ids].sum(axis=0)
+        simple_courses = CohortStatisticsLogic._get_simple_course_statistics(
+            compiled,
+            {compiled.course_codes[course_id]: int(count) for course_id, count in zip(simple_course_ids, approved_students.tolist())},
+            student_count
+        )
+        completion_percentages = matrices.get_completion_percentages(matrices.get_approved_credits())
+        return {
+            "students": student_count,
+            "simple_courses": simple_courses,
+            **CohortStatisticsLogic._get_bundle_statistics(compiled, completion_percentages),
+        }
+
+    @staticmethod
+    def _build_statistics(
+        compiled: CompiledCurriculum,
+        student_codes: List[str],
+        specified_period: str
+    ) -> Tuple[Dict[str, Any], CohortMatrices]:
+        unique_student_codes = list(dict.fromkeys(str(code) for code in student_codes))
+        with Profiler.stage('cohort_matrices'):
+            matrices = CohortReportLogic.build_cohort_matrices(compiled, unique_student_codes, specified_period)
+        with Profiler.stage('cohort_statistics'):
+            statistics = CohortStatisticsLogic.get_statistics_from_matrices(compiled, matrices)
+        return {"report_until_date": specified_period, **statistics}, matrices
+
+    @staticmethod
+    def get_statistics(
+        compiled: CompiledCurriculum,
+        student_codes: List[str],
+        specified_period: str
+    ) -> Dict[str, Any]:
+        """
+        Computes the statistics of a cohort at a cutoff period. Every distinct student of the list is
+        counted, including students without records, as in the complete reports of the cohort.
+
+        :param compiled: An instance of CompiledCurriculum.
+        :param student_codes: The student codes of the cohort.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :return: A dictionary with the cutoff and the statistics of the cohort.
+        """
+        return CohortStatisticsLogic._build_statistics(compiled, student_codes, specified_period)[0]
+
+    @staticmethod
+    def get_shard_statistics(
+        compiled: CompiledCurriculum,
+        student_codes: List[str],
+        specified_period: str
+    ) -> Tuple[Dict[str, Any], np.ndarray]:
+        """
+        Computes the statistics of the students of a shard, together with what merge_statistics needs
+        to combine the shards: quantiles cannot be combined from the statistics of each shard.
+
+        :param compiled: An instance of CompiledCurriculum.
+        :param student_codes: The student codes of the shard.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :return: The statistics of the shard and its student x bundle matrix of completion percentages,
+                 with a row per distinct student in the order of student_codes.
+        """
+        statistics, matrices = CohortStatisticsLogic._build_statistics(compiled, student_codes, specified_period)
+        return statistics, matrices.get_completion_percentages(matrices.get_approved_credits())
+
+    @staticmethod
+    def merge_statistics(
+        compiled: CompiledCurriculum,
+        shard_statistics: List[Dict[str, Any]],
+        completion_percentages: np.ndarray
+    ) -> Dict[str, Any]:
+        """
+        Combines the statistics of the shards of a cohort into the statistics of the whole cohort.
+
+        :param compiled: An instance of CompiledCurriculum.
+        :param shard_statistics: The statistics of each shard, as returned by get_shard_statistics.
+        :param completion_percentages: The completion percentages of every shard, with the rows in the
+                                       order of the whole student list, so the result matches an unsharded run.
+        :return: A dictionary with the cutoff and the statistics of the cohort.
+        """
+        student_count = completion_percentages.shape[0]
+        approved_students: Dict[str, int] = {}
+        for statistics in shard_statistics:
+            for code, course in statistics["simple_courses"].items():
+                approved_students[code] = approved_students.get(code, 0) + course["approved_students"]
+        return {
+            "report_until_date": shard_statistics[0]["report_until_date"],
+            "students": student_count,
+            "simple_courses": CohortStatisticsLogic._get_simple_course_statistics(
+                compiled, approved_students, student_count
+            ),
+            **CohortStatisticsLogic._get_bundle_statistics(compiled, completion_percentages),
+        }
@@ -1,14 +1,20 @@
-from typing import Dict, Any
-from student_registry_manager.student_registry_manager import StudentRegistryManager
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+import numpy as np
 from deserialization.complete_data import CompleteData
+from deserialization.compiled_curriculum import CompiledCurriculum
+from report_logic.related_course_bundles_logic import RelatedCourseBundlesLogic
 from report_logic.group_of_related_course_bundles_logic import GroupOfRelatedCourseBundlesLogic
 from report_logic.simple_courses_logic import SimpleCoursesLogic
 
+# Annotation only: the report logic also accepts the pandas-free LiteStudentRegistryManager
+if TYPE_CHECKING:
+    from student_registry_manager.student_registry_manager import StudentRegistryManager
+
 class CompleteReportLogic:
     @staticmethod
     def _generate_simple_courses_report(
         complete_data: CompleteData, 
-        student_registry_manager: StudentRegistryManager
+        student_registry_manager: 'StudentRegistryManager'
     ) -> Dict[str, Any]:
         """
         Generates a report for simple courses using SimpleCoursesLogic.
@@ -25,7 +31,7 @@ class CompleteReportLogic:
     @staticmethod
     def _generate_group_of_related_bundles_report(
         complete_data: CompleteData, 
-        student_registry_manager: StudentRegistryManager
+        student_registry_manager: 'StudentRegistryManager'
     ) -> Dict[str, Any]:
         """
         Generates a report for the group of related course bundles using GroupOfRelatedCourseBundlesLogic.
@@ -42,7 +48,7 @@ class CompleteReportLogic:
     @staticmethod
     def get_complete_report(
         complete_data: CompleteData, 
-        student_registry_manager: StudentRegistryManager
+        student_registry_manager: 'StudentRegistryManager'
     ) -> Dict[str, Any]:
         """
         Generates the complete report for both simple courses and related course bundles.
@@ -64,3 +70,106 @@ class CompleteReportLogic:
             "simple_courses": simple_courses_report,
             "group_of_related_course_bundles": group_of_related_bundles_report
         }
+
+    @staticmethod
+    def _get_compiled_group_summary(
+        compiled: CompiledCurriculum,
+        group_id: int,
+        approved: List[bool],
+        credits: List[float],
+        course_credits: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Computes the summary of one group of related bundles from the approval and credits of each course ID.
+        With catalog credits, each bundle also reports its remaining credits and the catalog credits of
+        its courses that are not approved yet.
+        """
+        bundles_info: Dict[str, Dict[str, Any]] = {}
+        for bundle_id in compiled.get_group_bundle_ids(group_id).tolist():
+            approved_ids = [
+                course_id for course_id in compiled.get_bundle_course_ids(bundle_id).tolist() if approved[course_id]
+            ]
+            total_credits = compiled.get_bundle_minimum_credits(bundle_id)
+            # Summed in curriculum order, so bundles without approved courses report an integer 0
+            approved_credits = sum(credits[course_id] for course_id in approved_ids)
+            bundles_info[compiled.bundle_names[bundle_id]] = {
+                "total_credits": total_credits,
+                "approved_credits": approved_credits,
+                "approved_subject_codes": {compiled.course_codes[course_id] for course_id in approved_ids},
+                "completion_percentage": RelatedCourseBundlesLogic._calculate_completion_percentage(
+                    total_credits, approved_credits
+                ),
+            }
+            if course_credits is not None:
+                bundle_info = bundles_info[compiled.bundle_names[bundle_id]]
+                bundle_info["remaining_credits"] = max(total_credits - approved_credits, 0)
+                bundle_info["available_credits"] = sum(
+                    float(course_credits[course_id])
+                    for course_id in compiled.get_bundle_course_ids(bundle_id).tolist() if not approved[course_id]
+                )
+
+        return {
+            "course_bundles": bundles_info,
+            "highest_approved_percentage": RelatedCourseBundlesLogic._get_bundle_with_highest_approved_percentage(
+                bundles_info
+            )
+        }
+
+    @staticmethod
+    def get_compiled_report(
+        compiled: CompiledCurriculum,
+        student_registry_manager: 'StudentRegistryManager',
+        course_credits: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Generates the complete report from a compiled curriculum. Each course is checked only once,
+        even when it belongs to several bundles, and the report matches the one of get_complete_report.
+
+        :param compiled: An instance of CompiledCurriculum.
+        :param student_registry_manager: An instance of StudentRegistryManager.
+        :param course_credits: Optional catalog credits of each course ID; when given, the bundles also
+                               report their remaining and available credits.
+        :return: A dictionary containing the complete report for both simple courses and related course bundles.
+        """
+        approved = [
+            student_registry_manager.approve_subject_until_specified_period(course_code)
+            for course_code in compiled.course_codes
+        ]
+        # Credits are only needed for the approved courses
+        credits = [
+            float(student_registry_manager.get_subject_credits(course_code)) if is_approved else 0.0
+            for course_code, is_approved in zip(compiled.course_codes, approved)
+        ]
+
+        # Students with the same approved courses and credits in a group share the group summary
+        group_report: Dict[str, Any] = {}
+        for group_id, group_name in enumerate(compiled.group_names):
+            approved_ids = [course_id for course_id in compiled.group_course_ids[group_id] if approved[course_id]]
+            key = (
+                compiled.cache_token,
+                group_id,
+                frozenset(approved_ids),
+                tuple(credits[course_id] for course_id in approved_ids),
+                None if course_credits is None else course_credits[compiled.group_course_ids[group_id]].tobytes()
+            )
+            group_report[group_name] = RelatedCourseBundlesLogic.get_cached_summary(
+                key, lambda: CompleteReportLogic._get_compiled_group_summary(
+                    compiled, group_id, approved, credits, course_credits
+                )
+            )
+
+        approved_courses = [
+            compiled.course_codes[course_id] for course_id in compiled.simple_course_ids.tolist() if approved[course_id]
+        ]
+        total_courses = len(compiled.simple_course_ids)
+        simple_courses_report = {
+            "approved_courses": approved_courses,
+            "total_approved_courses": len(approved_courses),
+            "total_courses": total_courses,
+            "approval_percentage": (len(approved_courses) / total_courses * 100) if total_courses > 0 else 0
+        }
+
+        return {
+            "simple_courses": simple_courses_report,
+            "group_of_related_course_bundles": group_report
+        }
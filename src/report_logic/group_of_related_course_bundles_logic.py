@@ -1,15 +1,17 @@
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any
 from deserialization.group_of_related_course_bundles import GroupOfRelatedCourseBundles
-from student_registry_manager.student_registry_manager import StudentRegistryManager
 from report_logic.related_course_bundles_logic import RelatedCourseBundlesLogic
 from deserialization.related_course_bundles import RelatedCourseBundles
 
+if TYPE_CHECKING:
+    from student_registry_manager.student_registry_manager import StudentRegistryManager
+
 class GroupOfRelatedCourseBundlesLogic:
     @staticmethod
     def _get_related_bundle_summary(
         related_bundle_name: str, 
         related_course_bundle: 'RelatedCourseBundles',  # Use RelatedCourseBundles directly
-        student_registry_manager: StudentRegistryManager
+        student_registry_manager: 'StudentRegistryManager'
     ) -> Dict[str, Any]:
         """
         Generates a summary for a single related course bundle using RelatedCourseBundlesLogic.
@@ -28,7 +30,7 @@ class GroupOfRelatedCourseBundlesLogic:
     @staticmethod
     def _aggregate_summaries(
         group_of_related_bundles: GroupOfRelatedCourseBundles, 
-        student_registry_manager: StudentRegistryManager
+        student_registry_manager: 'StudentRegistryManager'
     ) -> Dict[str, Dict[str, Any]]:
         """
         Iterates over each related course bundle group and aggregates summaries for each group.
@@ -50,7 +52,7 @@ class GroupOfRelatedCourseBundlesLogic:
     @staticmethod
     def get_full_report(
         group_of_related_bundles: GroupOfRelatedCourseBundles, 
-        student_registry_manager: StudentRegistryManager
+        student_registry_manager: 'StudentRegistryManager'
     ) -> Dict[str, Any]:
         """
         Generates a complete report for all related course bundles.
@@ -1,8 +1,44 @@
-from typing import Dict, Set, Any
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Set, Any
 from deserialization.related_course_bundles import RelatedCourseBundles
-from student_registry_manager.student_registry_manager import StudentRegistryManager
+from utils.lru_cache import LRUCache
+from utils.profiler import Profiler
+
+if TYPE_CHECKING:
+    from student_registry_manager.student_registry_manager import StudentRegistryManager
 
 class RelatedCourseBundlesLogic:
+    # Default number of group summaries kept by the summary cache
+    SUMMARY_CACHE_SIZE = 65536
+    # Group summaries keyed by (group, approved courses of the group, credits of those courses). Most
+    # students of a program share the same approved courses within a group, so their summaries are reused.
+    # The cached summaries are shared by several reports and must not be modified.
+    summary_cache: LRUCache[Dict[str, Any]] = LRUCache(SUMMARY_CACHE_SIZE)
+
+    @staticmethod
+    def set_summary_cache_size(max_size: int) -> None:
+        """
+        Replaces the summary cache with an empty one of the given size; 0 disables it.
+        """
+        RelatedCourseBundlesLogic.summary_cache = LRUCache(max_size)
+
+    @staticmethod
+    def get_cached_summary(key: Hashable, compute_summary: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the cached group summary of the key, computing and caching it on a miss.
+
+        :param key: The (group, frozenset of approved courses, credits signature) key of the summary.
+        :param compute_summary: Computes the summary when it is not cached.
+        :return: The group summary.
+        """
+        summary = RelatedCourseBundlesLogic.summary_cache.get(key)
+        if summary is not None:
+            Profiler.count('group_summary_hits')
+            return summary
+        Profiler.count('group_summary_misses')
+        summary = compute_summary()
+        RelatedCourseBundlesLogic.summary_cache.put(key, summary)
+        return summary
+
     @staticmethod
     def _get_total_credits(related_course_bundles: RelatedCourseBundles, course_bundle_name: str) -> int:
         """
@@ -14,35 +50,30 @@ class RelatedCourseBundlesLogic:
     @staticmethod
     def _calculate_approved_credits(
         related_course_bundles: RelatedCourseBundles, 
-        student_registry_manager: StudentRegistryManager, 
+        approved_credits: Dict[str, float], 
         course_bundle_name: str
     ) -> float:
         """
         Calculates the total approved credits for a given course bundle.
-        Ensures all credit values are numeric to avoid type errors.
         """
         bundle = related_course_bundles[course_bundle_name]
         return sum(
-            float(student_registry_manager.get_subject_credits(subject))
+            approved_credits[subject]
             for subject in bundle.courses.keys()
-            if student_registry_manager.approve_subject_until_specified_period(subject)
+            if subject in approved_credits
         )
 
     @staticmethod
     def _get_approved_subject_codes(
         related_course_bundles: RelatedCourseBundles, 
-        student_registry_manager: StudentRegistryManager, 
+        approved_credits: Dict[str, float], 
         course_bundle_name: str
     ) -> Set[str]:
         """
         Gets the set of approved subject codes for a given course bundle.
         """
         bundle = related_course_bundles[course_bundle_name]
-        return {
-            subject
-            for subject in bundle.courses.keys()
-            if student_registry_manager.approve_subject_until_specified_period(subject)
-        }
+        return {subject for subject in bundle.courses.keys() if subject in approved_credits}
 
     @staticmethod
     def _calculate_completion_percentage(total_credits: int, approved_credits: float) -> float:
@@ -80,32 +111,62 @@ class RelatedCourseBundlesLogic:
     @staticmethod
     def get_course_bundles_summary(
         related_course_bundles: RelatedCourseBundles, 
-        student_registry_manager: StudentRegistryManager
+        student_registry_manager: 'StudentRegistryManager'
     ) -> Dict[str, Any]:
         """
         Generates a summary dictionary of all course bundles with their total and approved credits and completion percentage.
+        The summary is reused for every student with the same approved courses and credits in the group.
         
         :param related_course_bundles: An instance of RelatedCourseBundles.
         :param student_registry_manager: An instance of StudentRegistryManager.
         :return: A dictionary summarizing each course bundle and the bundle with the highest approved percentage.
         """
+        group_courses = dict.fromkeys(
+            subject for bundle in related_course_bundles.related_bundles.values() for subject in bundle.courses.keys()
+        )
+        # Each course of the group is checked once; the summary is computed from these credits on a miss
+        approved_credits = {
+            subject: float(student_registry_manager.get_subject_credits(subject))
+            for subject in group_courses
+            if student_registry_manager.approve_subject_until_specified_period(subject)
+        }
+        key = (related_course_bundles, frozenset(approved_credits), tuple(approved_credits.values()))
+        return RelatedCourseBundlesLogic.get_cached_summary(
+            key,
+            lambda: RelatedCourseBundlesLogic._compute_course_bundles_summary(related_course_bundles, approved_credits)
+        )
+
+    @staticmethod
+    def _compute_course_bundles_summary(
+        related_course_bundles: RelatedCourseBundles,
+        approved_credits: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """
+        Computes the summary of a group from the credits of its approved courses.
+
+        :param related_course_bundles: An instance of RelatedCourseBundles.
+        :param approved_credits: The credits of each approved course of the group.
+        :return: A dictionary summarizing each course bundle and the bundle with the highest approved percentage.
+        """
         bundles_info: Dict[str, Dict[str, Any]] = {}
         
         for bundle_name in related_course_bundles.related_bundles.keys():
             try:
                 # Use minimum_credits_to_pass directly for total credits
                 total_credits = RelatedCourseBundlesLogic._get_total_credits(related_course_bundles, bundle_name)
-                approved_credits = RelatedCourseBundlesLogic._calculate_approved_credits(
-                    related_course_bundles, student_registry_manager, bundle_name
+                bundle_approved_credits = RelatedCourseBundlesLogic._calculate_approved_credits(
+                    related_course_bundles, approved_credits, bundle_name
                 )
                 approved_subject_codes = RelatedCourseBundlesLogic._get_approved_subject_codes(
-                    related_course_bundles, student_registry_manager, bundle_name
+                    related_course_bundles, approved_credits, bundle_name
+                )
+                completion_percentage = RelatedCourseBundlesLogic._calculate_completion_percentage(
+                    total_credits, bundle_approved_credits
                 )
-                completion_percentage = RelatedCourseBundlesLogic._calculate_completion_percentage(total_credits, approved_credits)
                 
                 bundles_info[bundle_name] = {
                     "total_credits": total_credits,
-                    "approved_credits": approved_credits,
+                    "approved_credits": bundle_approved_credits,
                     "approved_subject_codes": approved_subject_codes,
                     "completion_percentage": completion_percentage,
                 }
@@ -1,10 +1,12 @@
-from typing import List, Dict
-from student_registry_manager.student_registry_manager import StudentRegistryManager  # Import your StudentRegistryManager
+from typing import TYPE_CHECKING, List, Dict
+
+if TYPE_CHECKING:
+    from student_registry_manager.student_registry_manager import StudentRegistryManager
 
 class SimpleCoursesLogic:
     
     @staticmethod
-    def get_approved_courses_summary(student_manager: StudentRegistryManager, course_codes: List[str]) -> Dict[str, any]:
+    def get_approved_courses_summary(student_manager: 'StudentRegistryManager', course_codes: List[str]) -> Dict[str, any]:
         """
         Returns a summary of approved courses for a student based on provided course codes.
         
@@ -0,0 +1,169 @@
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from csv_reader.csv_reader import CSVReader
+from deserialization.complete_data import CompleteData
+from queries.period_queries import PeriodQueries
+from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+from report_logic.related_course_bundles_logic import RelatedCourseBundlesLogic
+from utils.period import Period
+
+
+class TimelineReportLogic:
+    @staticmethod
+    def _get_course_bundles_index(complete_data: CompleteData) -> Dict[str, List[str]]:
+        """
+        Builds the reverse index course code -> names of the bundles that contain the course.
+        """
+        course_bundles_index: Dict[str, List[str]] = {}
+        for bundle_name, bundle in complete_data.course_bundles.items():
+            for course_code in bundle.courses.keys():
+                course_bundles_index.setdefault(course_code, []).append(bundle_name)
+        return course_bundles_index
+
+    @staticmethod
+    def _build_report(
+        complete_data: CompleteData,
+        approved_courses: Set[str],
+        bundle_credits: Dict[str, float],
+        bundle_counts: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """
+        Builds a complete report, in the format of CompleteReportLogic, from the incremental state.
+        """
+        simple_course_codes = complete_data.simple_courses
+        approved_simple_courses = [code for code in simple_course_codes if code in approved_courses]
+        total_courses = len(simple_course_codes)
+
+        group_report: Dict[str, Any] = {}
+        for group_name, related_bundle in complete_data.group_of_related_course_bundles.get_groups().items():
+            bundles_info: Dict[str, Dict[str, Any]] = {}
+            for bundle_name, bundle in related_bundle.related_bundles.items():
+                total_credits = bundle.minimum_credits_to_pass
+                # Credits of bundles without approved courses are reported as an integer 0
+                approved_credits = bundle_credits[bundle_name] if bundle_counts[bundle_name] else 0
+                bundles_info[bundle_name] = {
+                    "total_credits": total_credits,
+                    "approved_credits": approved_credits,
+                    "approved_subject_codes": {code for code in bundle.courses.keys() if code in approved_courses},
+                    "completion_percentage": RelatedCourseBundlesLogic._calculate_completion_percentage(
+                        total_credits, approved_credits
+                    ),
+                }
+            group_report[group_name] = {
+                "course_bundles": bundles_info,
+                "highest_approved_percentage": RelatedCourseBundlesLogic._get_bundle_with_highest_approved_percentage(
+                    bundles_info
+                )
+            }
+
+        return {
+            "simple_courses": {
+                "approved_courses": approved_simple_courses,
+                "total_approved_courses": len(approved_simple_courses),
+                "total_courses": total_courses,
+                "approval_percentage": (len(approved_simple_courses) / total_courses * 100) if total_courses > 0 else 0
+            },
+            "group_of_related_course_bundles": group_report
+        }
+
+    @staticmethod
+    def _build_delta(
+        complete_data: CompleteData,
+        newly_approved_courses: List[str],
+        changed_bundles: Set[str],
+        bundle_credits: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """
+        Builds the changes of one period: the newly approved courses and the new state of the bundles they touched.
+        """
+        course_bundles: Dict[str, Dict[str, Any]] = {}
+        for bundle_name in complete_data.course_bundles.keys():
+            if bundle_name not in changed_bundles:
+                continue
+            total_credits = complete_data.course_bundles[bundle_name].minimum_credits_to_pass
+            course_bundles[bundle_name] = {
+                "approved_credits": bundle_credits[bundle_name],
+                "completion_percentage": RelatedCourseBundlesLogic._calculate_completion_percentage(
+                    total_credits, bundle_credits[bundle_name]
+                ),
+            }
+        return {
+            "newly_approved_courses": newly_approved_courses,
+            "course_bundles": course_bundles
+        }
+
+    @staticmethod
+    def get_timelines(
+        complete_data: CompleteData,
+        student_codes: List[str],
+        specified_period: str,
+        deltas: bool = False
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generates the progress timeline of each student: one entry per period before the specified period.
+        The entry of a period includes every record of that period, so it matches the complete report whose
+        cutoff is the next period. Each student's records are walked once in period order, updating the
+        approved courses and the bundle credits incrementally at every period boundary.
+
+        :param complete_data: An instance of CompleteData.
+        :param student_codes: The student codes to report.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :param deltas: If True, each entry only holds the changes of the period instead of a complete report.
+        :return: An iterator of (student_code, timeline) tuples.
+        """
+        limit_key = Period.to_key(specified_period)
+        course_bundles_index = TimelineReportLogic._get_course_bundles_index(complete_data)
+
+        data = CSVReader.get_data()
+        student_index = CSVReader.get_student_index()
+        if data is None or student_index is None:
+            return
+
+        # Read the columns once; each student is a contiguous block already sorted by period key
+        subjects = data['MATERIA'].to_numpy()
+        periods = data['PERIODO'].to_numpy()
+        period_keys = data[PeriodQueries.PERIOD_KEY_COLUMN].to_numpy()
+        approved_records = data[ApproveSubjectLogic.APPROVED_COLUMN].to_numpy()
+        credits = data['NUMERO_CREDITOS'].to_numpy()
+
+        for student_code in student_codes:
+            student_code = str(student_code)
+            bounds = student_index.get_bounds(student_code)
+            start, stop = bounds if bounds is not None else (0, 0)
+
+            approved_courses: Set[str] = set()
+            first_credits: Dict[str, float] = {}
+            bundle_credits = {bundle_name: 0.0 for bundle_name in complete_data.course_bundles.keys()}
+            bundle_counts = {bundle_name: 0 for bundle_name in complete_data.course_bundles.keys()}
+            timeline: Dict[str, Any] = {}
+
+            position = start
+            while position < stop and period_keys[position] < limit_key:
+                period_key = period_keys[position]
+                period_label = str(periods[position])
+                newly_approved_courses: List[str] = []
+                changed_bundles: Set[str] = set()
+
+                # Apply every record of the period
+                while position < stop and period_keys[position] == period_key:
+                    subject = str(subjects[position])
+                    # Credits come from the first record of the subject, as in StudentRegistryManager
+                    first_credits.setdefault(subject, float(credits[position]))
+                    if approved_records[position] and subject not in approved_courses:
+                        approved_courses.add(subject)
+                        newly_approved_courses.append(subject)
+                        for bundle_name in course_bundles_index.get(subject, []):
+                            bundle_credits[bundle_name] += first_credits[subject]
+                            bundle_counts[bundle_name] += 1
+                            changed_bundles.add(bundle_name)
+                    position += 1
+
+                if deltas:
+                    timeline[period_label] = TimelineReportLogic._build_delta(
+                        complete_data, newly_approved_courses, changed_bundles, bundle_credits
+                    )
+                else:
+                    timeline[period_label] = TimelineReportLogic._build_report(
+                        complete_data, approved_courses, bundle_credits, bundle_counts
+                    )
+
+            yield student_code, {"report_until_date": specified_period, "periods": timeline}
@@ -0,0 +1,167 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from deserialization.compiled_curriculum import CompiledCurriculum
+from report_logic.cohort_report_logic import CohortMatrices, CohortReportLogic
+from utils.profiler import Profiler
+
+
+class WhatIfSimulator:
+    """
+    Evaluates hypothetical plans ("the student also passes these courses") for a whole cohort.
+    The approvals of each student are stored as a packed bitset over the course IDs of a compiled
+    curriculum, and a plan is a bitset of the same layout: the approvals of a scenario are the OR
+    of both, and the completion of each bundle is the sum of the credits under that mask.
+
+    Bundles follow the rules of RelatedCourseBundlesLogic: the completion percentage is capped at
+    100 and bundles without minimum credits report 0. Courses approved by a plan count with the
+    credits of the student's first record of the course or, for courses the student never took,
+    with the given course credits (the course catalog).
+    """
+    # Upper bound of the student x plan x course cells expanded at once
+    CHUNK_CELLS = 1 << 22
+
+    def __init__(
+        self,
+        compiled: CompiledCurriculum,
+        matrices: CohortMatrices,
+        course_credits: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        :param compiled: The compiled curriculum the matrices were built with.
+        :param matrices: The cohort matrices of the students to simulate.
+        :param course_credits: Credits of each course ID for the courses a student never took; 0 when omitted.
+        """
+        self.compiled = compiled
+        self.matrices = matrices
+        self.student_rows: Dict[str, int] = {code: row for row, code in enumerate(matrices.student_codes)}
+        self.approved_bits = WhatIfSimulator._pack(matrices.approved)
+        if course_credits is None:
+            course_credits = np.zeros(len(compiled.course_codes), dtype=np.float64)
+        self.credits = np.where(matrices.taken, matrices.credits, course_credits)
+
+    @classmethod
+    def from_cohort(
+        cls,
+        compiled: CompiledCurriculum,
+        student_codes: List[str],
+        specified_period: str,
+        course_credits: Optional[np.ndarray] = None
+    ) -> 'WhatIfSimulator':
+        """
+        Builds the simulator of a student list at a cutoff period from the dataset loaded by CSVReader.
+
+        :param compiled: An instance of CompiledCurriculum.
+        :param student_codes: The student codes of the cohort.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :param course_credits: Credits of each course ID for the courses a student never took.
+        :return: An instance of WhatIfSimulator.
+        """
+        unique_student_codes = list(dict.fromkeys(str(code) for code in student_codes))
+        with Profiler.stage('cohort_matrices'):
+            matrices = CohortReportLogic.build_cohort_matrices(compiled, unique_student_codes, specified_period)
+        return cls(compiled, matrices, course_credits)
+
+    @staticmethod
+    def _pack(approved: np.ndarray) -> np.ndarray:
+        """
+        Packs the last axis of a boolean array into little-endian 64-bit words; bit i of the row is course ID i.
+        """
+        words = -(-approved.shape[-1] // 64)
+        padded = np.zeros(approved.shape[:-1] + (words * 64,), dtype=bool)
+        padded[..., :approved.shape[-1]] = approved
+        return np.packbits(padded, axis=-1, bitorder='little').view('<u8')
+
+    def _unpack(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(
+            bits.view(np.uint8), axis=-1, count=len(self.compiled.course_codes), bitorder='little'
+        ).view(bool)
+
+    def compile_plans(self, plans: List[Iterable[str]]) -> np.ndarray:
+        """
+        Converts plans given as course codes into bitsets. Courses that are not part of the curriculum
+        cannot complete any bundle; they are ignored and reported as a diagnostic.
+
+        :param plans: The course codes of each plan.
+        :return: A plan x word array with the bitset of each plan.
+        """
+        planned = np.zeros((len(plans), len(self.compiled.course_codes)), dtype=bool)
+        for position, plan in enumerate(plans):
+            for code in plan:
+                course_id = self.compiled.course_ids.get(str(code))
+                if course_id is None:
+                    Profiler.report_diagnostic("Planned course not found in the curriculum", code)
+                    continue
+                planned[position, course_id] = True
+        return WhatIfSimulator._pack(planned)
+
+    def iterate_completion_percentages(self, plan_bits: np.ndarray) -> Iterable[Tuple[slice, np.ndarray]]:
+        """
+        Evaluates every (student, plan) scenario in chunks of students.
+
+        :param plan_bits: The plan bitsets returned by compile_plans.
+        :return: An iterator of (student_rows, percentages) pairs, where percentages is a
+                 student x plan x bundle array with the completion percentage of each scenario.
+        """
+        student_count = len(self.matrices.student_codes)
+        cells_per_student = max(1, len(plan_bits) * len(self.compiled.course_codes))
+        chunk = max(1, WhatIfSimulator.CHUNK_CELLS // cells_per_student)
+        for start in range(0, student_count, chunk):
+            rows = slice(start, min(start + chunk, student_count))
+            scenario_bits = self.approved_bits[rows, None, :] | plan_bits[None, :, :]
+            scenario_credits = np.where(self._unpack(scenario_bits), self.credits[rows, None, :], 0.0)
+            approved_credits = scenario_credits @ self.matrices.bundle_incidence
+            Profiler.count('what_if_scenarios', scenario_bits.shape[0] * scenario_bits.shape[1])
+            yield rows, self.matrices.get_completion_percentages(approved_credits)
+
+    def get_completion_percentages(self, plan_bits: np.ndarray) -> np.ndarray:
+        """
+        :param plan_bits: The plan bitsets returned by compile_plans.
+        :return: A student x plan x bundle array with the completion percentage of each scenario.
+        """
+        percentages = np.zeros(
+            (len(self.matrices.student_codes), len(plan_bits), len(self.compiled.bundle_names)), dtype=np.float64
+        )
+        for rows, chunk_percentages in self.iterate_completion_percentages(plan_bits):
+            percentages[rows] = chunk_percentages
+        return percentages
+
+    def get_current_completed(self) -> np.ndarray:
+        """
+        :return: A boolean student x bundle matrix, True for the bundles each student already completed.
+        """
+        approved_credits = np.where(self.matrices.approved, self.credits, 0.0) @ self.matrices.bundle_incidence
+        return self.matrices.get_completion_percentages(approved_credits) >= 100.0
+
+    def count_completions(self, plan_bits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Counts, for each plan and bundle, the students that would complete the bundle, without keeping
+        the percentages of every scenario in memory.
+
+        :param plan_bits: The plan bitsets returned by compile_plans.
+        :return: A (completed, newly_completed) pair of plan x bundle arrays with the number of students
+                 that complete each bundle with the plan, and the number for whom the plan completes it.
+        """
+        current = self.get_current_completed()
+        completed = np.zeros((len(plan_bits), len(self.compiled.bundle_names)), dtype=np.int64)
+        newly_completed = np.zeros_like(completed)
+        for rows, percentages in self.iterate_completion_percentages(plan_bits):
+            scenario_completed = percentages >= 100.0
+            completed += scenario_completed.sum(axis=0)
+            newly_completed += (scenario_completed & ~current[rows, None, :]).sum(axis=0)
+        return completed, newly_completed
+
+    def get_completed_bundles(self, student_code: str, plan: Iterable[str]) -> List[str]:
+        """
+        Answers a single question: which bundles would the student have completed after passing the plan.
+
+        :param student_code: The student code; it must be part of the simulated cohort.
+        :param plan: The course codes the student would pass.
+        :return: The names of the completed bundles, in curriculum order.
+        :raises KeyError: If the student is not part of the simulated cohort.
+        """
+        row = self.student_rows[str(student_code)]
+        plan_bits = self.compile_plans([plan])
+        scenario_bits = self.approved_bits[row] | plan_bits[0]
+        scenario_credits = np.where(self._unpack(scenario_bits), self.credits[row], 0.0)
+        percentages = self.matrices.get_completion_percentages(scenario_credits @ self.matrices.bundle_incidence)
+        return [name for name, percentage in zip(self.compiled.bundle_names, percentages.tolist()) if percentage >= 100.0]
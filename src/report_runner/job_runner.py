@@ -0,0 +1,462 @@
+import hashlib
+import json
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type
+import numpy as np
+from deserialization.complete_data import CompleteData
+from deserialization.compiled_curriculum import CompiledCurriculum
+from report_logic.complete_report_logic import CompleteReportLogic
+from output_printer.output_printer import create_report_writer, save_report
+from report_runner.shard_manifest import ShardManifest
+from utils.period import Period
+from utils.profiler import Profiler
+from utils.shard import Shard
+
+# The timeline and cohort engines, the worker pool and incremental runs read the pandas dataset of
+# CSVReader, so their modules are imported where they are used. Jobs run with the lite engine never
+# import pandas.
+if TYPE_CHECKING:
+    from student_registry_manager.student_registry_manager import StudentRegistryManager
+
+
+@dataclass
+class ReportJob:
+    """
+    Represents one (curriculum, student list, cutoff, report name) report job and its output options.
+    """
+    curriculum_structure_path: Path
+    student_codes_path: Path
+    report_until_date: str
+    report_name: str
+    output_path: Path
+    report_engine: str = 'student'
+    report_type: str = 'complete'
+    timeline_output: str = 'reports'
+    output_format: str = 'json'
+    output_shards: int = 1
+    compact_output: bool = False
+    incremental: bool = False
+    remaining_credits: bool = False
+    what_if_plans_path: Optional[Path] = None
+
+    @classmethod
+    def from_config(cls, job_config: Dict[str, Any], defaults: Dict[str, Any]) -> 'ReportJob':
+        """
+        Creates a ReportJob from a job entry of the configuration. Missing keys are taken from the
+        top-level configuration, so a configuration without jobs describes a single job.
+
+        :param job_config: The job entry of the configuration.
+        :param defaults: The top-level configuration.
+        :return: An instance of ReportJob.
+        """
+        settings = {**defaults, **job_config}
+        return cls(
+            curriculum_structure_path=Path(settings['curriculum_structure_path']),
+            student_codes_path=Path(settings['student_codes']),
+            report_until_date=str(settings['report_until_date']),
+            report_name=settings['report_name'],
+            output_path=Path(settings['output_path']),
+            report_engine=settings.get('report_engine', 'student'),
+            report_type=settings.get('report_type', 'complete'),
+            timeline_output=settings.get('timeline_output', 'reports'),
+            output_format=settings.get('output_format', 'json'),
+            output_shards=settings.get('output_shards', 1),
+            compact_output=settings.get('compact_output', False),
+            incremental=settings.get('incremental', False),
+            remaining_credits=settings.get('remaining_credits', False),
+            what_if_plans_path=Path(settings['what_if_plans']) if settings.get('what_if_plans') else None
+        )
+
+
+class JobRunner:
+    """
+    Runs a list of report jobs against the single dataset loaded by CSVReader.
+    Curricula and student lists are loaded once, and the per-student approval maps are shared by
+    every job with the same cutoff.
+
+    In a sharded run, every job only processes the students assigned to the shard and writes its
+    output and a ShardManifest to the directory of the shard under its output path.
+    """
+    def __init__(
+        self,
+        csv_path: Path,
+        cache_dir: Optional[Path] = None,
+        lean: bool = False,
+        workers: int = 1,
+        curriculum_cache_dir: Optional[Path] = None,
+        registry_manager_class: Optional[Type['StudentRegistryManager']] = None,
+        shard: Optional[Shard] = None,
+        source_path: Optional[Path] = None
+    ) -> None:
+        """
+        :param csv_path: Path to the CSV file loaded by CSVReader.
+        :param cache_dir: Columnar cache directory used by CSVReader, if any.
+        :param lean: Whether CSVReader uses the lean loading mode.
+        :param workers: Number of worker processes used by the student engine.
+        :param curriculum_cache_dir: Directory of compiled curricula, if any.
+        :param registry_manager_class: The registry manager built for each student by the student engine;
+                                       StudentRegistryManager by default.
+        :param shard: The shard of a sharded run, if any.
+        :param source_path: The data set the records come from, when csv_path is a store derived from it;
+                            csv_path by default.
+        """
+        if registry_manager_class is None:
+            from student_registry_manager.student_registry_manager import StudentRegistryManager
+            registry_manager_class = StudentRegistryManager
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self.lean = lean
+        self.workers = workers
+        self.curriculum_cache_dir = curriculum_cache_dir
+        self.registry_manager_class = registry_manager_class
+        self.shard = shard
+        self.source_path = source_path if source_path is not None else csv_path
+        self._source_hash: Optional[str] = None
+        self._complete_data_cache: Dict[Path, CompleteData] = {}
+        self._compiled_cache: Dict[Path, CompiledCurriculum] = {}
+        self._student_codes_cache: Dict[Path, List[Any]] = {}
+        self._course_credits_cache: Dict[Path, np.ndarray] = {}
+        # StudentRegistryManager instances of the cutoff currently being processed
+        self._registry_cache: Dict[str, 'StudentRegistryManager'] = {}
+        self._registry_cache_period: Optional[str] = None
+
+    def _get_complete_data(self, json_path: Path) -> CompleteData:
+        if json_path not in self._complete_data_cache:
+            with Profiler.stage('curriculum_load', curriculum=json_path.name):
+                self._complete_data_cache[json_path] = CompleteData.from_json_file(json_path)
+        return self._complete_data_cache[json_path]
+
+    def _get_compiled_curriculum(self, json_path: Path) -> CompiledCurriculum:
+        if json_path not in self._compiled_cache:
+            with Profiler.stage('curriculum_compile', curriculum=json_path.name):
+                self._compiled_cache[json_path] = CompiledCurriculum.from_json_file(json_path, self.curriculum_cache_dir)
+        return self._compiled_cache[json_path]
+
+    def _get_student_codes(self, student_codes_path: Path) -> List[Any]:
+        if student_codes_path not in self._student_codes_cache:
+            with student_codes_path.open('r', encoding='utf-8') as file:
+                self._student_codes_cache[student_codes_path] = json.load(file)
+        return self._student_codes_cache[student_codes_path]
+
+    def _get_assigned_student_codes(self, student_codes_path: Path) -> List[Any]:
+        """
+        :return: The entries of a student list assigned to the shard of the run; every entry when unsharded.
+        """
+        student_codes = self._get_student_codes(student_codes_path)
+        return self.shard.filter_student_codes(student_codes) if self.shard is not None else student_codes
+
+    def _get_course_credits(self, job: ReportJob, compiled: CompiledCurriculum) -> Optional[np.ndarray]:
+        """
+        Looks up the catalog credits of every course ID of the job's curriculum, or returns None when
+        the job does not report remaining credits.
+        """
+        if not job.remaining_credits:
+            return None
+        json_path = job.curriculum_structure_path
+        if json_path not in self._course_credits_cache:
+            from csv_reader.course_catalog import CourseCatalog
+            from csv_reader.csv_reader import CSVReader
+            catalog = CSVReader.get_course_catalog() or CourseCatalog({})
+            self._course_credits_cache[json_path] = catalog.get_course_credits(
+                compiled.course_codes, CourseCatalog.read_curriculum_credits(json_path)
+            )
+        return self._course_credits_cache[json_path]
+
+    def get_job_student_codes(self, job: ReportJob) -> List[str]:
+        """
+        :return: Every entry of the student list of a job, repetitions included; only those of the shard
+                 in a sharded run.
+        """
+        return [str(code) for code in self._get_assigned_student_codes(job.student_codes_path)]
+
+    def get_student_codes(self, jobs: List[ReportJob]) -> List[str]:
+        """
+        :return: The distinct student codes of every job, in job order; only those of the shard in a sharded run.
+        """
+        return list(dict.fromkeys(
+            str(code) for job in jobs for code in self._get_assigned_student_codes(job.student_codes_path)
+        ))
+
+    def _get_student_registry_manager(self, student_code: str, specified_period: str, shared: bool) -> 'StudentRegistryManager':
+        """
+        Returns the StudentRegistryManager of a student, reusing the one built by a previous job with
+        the same cutoff when the manager is shared.
+        """
+        if not shared:
+            return self.registry_manager_class(student_code, specified_period)
+
+        if self._registry_cache_period != specified_period:
+            self._registry_cache = {}
+            self._registry_cache_period = specified_period
+        if student_code not in self._registry_cache:
+            self._registry_cache[student_code] = self.registry_manager_class(student_code, specified_period)
+        return self._registry_cache[student_code]
+
+    def run(self, jobs: List[ReportJob]) -> None:
+        """
+        Runs every job. Jobs are grouped by cutoff so the shared approval maps of one cutoff can be
+        released before the next one is processed.
+
+        :param jobs: The report jobs to run.
+        """
+        # Validate every cutoff period before doing any work
+        for job in jobs:
+            Period.to_key(job.report_until_date)
+
+        ordered_jobs = sorted(jobs, key=lambda job: Period.to_key(job.report_until_date))
+        jobs_per_period: Dict[str, int] = {}
+        for job in ordered_jobs:
+            jobs_per_period[job.report_until_date] = jobs_per_period.get(job.report_until_date, 0) + 1
+
+        for job in ordered_jobs:
+            print(f"Running job '{job.report_name}' "
+                  f"({job.curriculum_structure_path.name}, cutoff {job.report_until_date})")
+            with Profiler.stage('job', job=job.report_name):
+                if self.shard is None:
+                    self.run_job(job, share_registries=jobs_per_period[job.report_until_date] > 1)
+                    continue
+                shard_job = replace(job, output_path=self.shard.get_output_dir(job.output_path))
+                failed_student_codes = self.run_job(
+                    shard_job, share_registries=jobs_per_period[job.report_until_date] > 1
+                )
+                ShardManifest.save(
+                    shard_job.output_path, job.report_name, self.shard, self.get_shard_settings(job),
+                    len(self._get_assigned_student_codes(job.student_codes_path)), failed_student_codes
+                )
+                print(f"Shard {self.shard} of job '{job.report_name}' written to {shard_job.output_path}")
+
+        self._registry_cache = {}
+        self._registry_cache_period = None
+
+    def _get_report_settings(self, job: ReportJob) -> List[str]:
+        """
+        :return: The curriculum hash, cutoff and report options of the job.
+        """
+        compiled = self._get_compiled_curriculum(job.curriculum_structure_path)
+        return [
+            compiled.source_hash, job.report_until_date, job.report_type, job.timeline_output, str(job.compact_output),
+            str(job.remaining_credits)
+        ]
+
+    def _get_fingerprint_settings(self, job: ReportJob) -> str:
+        """
+        :return: The curriculum hash, cutoff and report options that every fingerprint of the job covers and,
+                 with remaining credits, the catalog credits of the curriculum's courses.
+        """
+        settings = self._get_report_settings(job)
+        course_credits = self._get_course_credits(job, self._get_compiled_curriculum(job.curriculum_structure_path))
+        if course_credits is not None:
+            # The catalog is built from the records of every student, so a change in any of them can
+            # change the available credits of every report
+            settings.append(hashlib.sha256(course_credits.tobytes()).hexdigest())
+        return "|".join(settings)
+
+    def _get_source_hash(self) -> str:
+        if self._source_hash is None:
+            from csv_reader.period_store import PeriodStore
+            self._source_hash = PeriodStore.compute_source_hash(self.source_path)
+        return self._source_hash
+
+    def get_shard_settings(self, job: ReportJob) -> str:
+        """
+        :return: A hash of everything the shards of a job must agree on to be merged: the data source, the
+                 curriculum, cutoff and report options, the output options, the whole student list and the plans.
+        """
+        digest = hashlib.sha256("|".join(
+            [self._get_source_hash()] + self._get_report_settings(job) + [job.output_format, str(job.output_shards)]
+        ).encode('utf-8'))
+        student_codes = [str(code) for code in self._get_student_codes(job.student_codes_path)]
+        digest.update(json.dumps(student_codes).encode('utf-8'))
+        if job.report_type == 'what_if' and job.what_if_plans_path is not None:
+            digest.update(job.what_if_plans_path.read_bytes())
+        return digest.hexdigest()
+
+    def run_job(self, job: ReportJob, share_registries: bool = False) -> List[str]:
+        """
+        Generates and saves the reports of one job. Incremental jobs only regenerate the reports of the
+        students whose fingerprint changed since the previous run.
+
+        :param job: The report job to run.
+        :param share_registries: Whether to reuse the StudentRegistryManager instances across jobs with the same cutoff.
+        :return: The student codes whose report could not be generated.
+        """
+        student_codes = self.get_job_student_codes(job)
+        if job.report_type == 'statistics':
+            self._write_statistics(job, student_codes)
+            return []
+        if job.report_type == 'what_if':
+            self._write_what_if(job, student_codes)
+            return []
+
+        manifest = None
+        if job.incremental and job.output_format != 'json':
+            print(f"Incremental runs require the json output format; job '{job.report_name}' runs in full.")
+        elif job.incremental:
+            from report_runner.report_manifest import ReportManifest
+            with Profiler.stage('fingerprints'):
+                manifest = ReportManifest(job.output_path, job.report_name)
+                student_codes = manifest.get_pending_students(
+                    student_codes, job.report_until_date, self._get_fingerprint_settings(job)
+                )
+
+        with Profiler.stage('reports', students=len(student_codes)), create_report_writer(
+            job.output_format, job.output_path, job.report_name, job.output_shards, job.compact_output
+        ) as report_writer:
+            failed_student_codes = self._write_reports(job, student_codes, report_writer, share_registries)
+
+        if manifest is not None:
+            manifest.save(failed_student_codes)
+            manifest.print_summary()
+        return failed_student_codes
+
+    def _write_statistics(self, job: ReportJob, student_codes: List[str]) -> None:
+        """
+        Computes the statistics of the whole student list and saves them to a single file,
+        without generating the report of each student.
+        """
+        from report_logic.cohort_statistics_logic import CohortStatisticsLogic
+        if job.incremental or job.remaining_credits:
+            print(f"Statistics are always computed in full; job '{job.report_name}' ignores "
+                  f"incremental and remaining_credits.")
+        compiled = self._get_compiled_curriculum(job.curriculum_structure_path)
+        with Profiler.stage('reports', students=len(student_codes)):
+            if self.shard is None:
+                statistics = CohortStatisticsLogic.get_statistics(compiled, student_codes, job.report_until_date)
+            else:
+                # The merge recomputes the quantiles from the completion percentages of every shard
+                statistics, completion_percentages = CohortStatisticsLogic.get_shard_statistics(
+                    compiled, student_codes, job.report_until_date
+                )
+                job.output_path.mkdir(parents=True, exist_ok=True)
+                np.save(ShardManifest.get_completion_path(job.output_path, job.report_name), completion_percentages)
+            save_report(statistics, job.output_path, job.report_name, 'statistics', job.compact_output)
+
+    def _write_what_if(self, job: ReportJob, student_codes: List[str]) -> None:
+        """
+        Evaluates every plan of the job's plans file for the whole student list and saves, for each
+        plan and bundle, how many students would complete the bundle, to a single file.
+        """
+        from csv_reader.course_catalog import CourseCatalog
+        from csv_reader.csv_reader import CSVReader
+        from report_logic.what_if_logic import WhatIfSimulator
+        if job.what_if_plans_path is None:
+            raise ValueError(f"Job '{job.report_name}' has report_type what_if but no what_if_plans file.")
+        with job.what_if_plans_path.open('r', encoding='utf-8') as file:
+            plans: Dict[str, List[str]] = json.load(file)
+
+        compiled = self._get_compiled_curriculum(job.curriculum_structure_path)
+        # Planned courses the student never took count with their catalog credits
+        catalog = CSVReader.get_course_catalog() or CourseCatalog({})
+        course_credits = catalog.get_course_credits(
+            compiled.course_codes, CourseCatalog.read_curriculum_credits(job.curriculum_structure_path)
+        )
+        with Profiler.stage('reports', students=len(student_codes), plans=len(plans)):
+            simulator = WhatIfSimulator.from_cohort(compiled, student_codes, job.report_until_date, course_credits)
+            with Profiler.stage('what_if_simulation'):
+                completed, newly_completed = simulator.count_completions(simulator.compile_plans(list(plans.values())))
+            current = simulator.get_current_completed().sum(axis=0)
+            what_if = {
+                "report_until_date": job.report_until_date,
+                "students": len(simulator.matrices.student_codes),
+                "completed_students": dict(zip(compiled.bundle_names, current.tolist())),
+                "plans": {
+                    plan_name: {
+                        "courses": courses,
+                        "course_bundles": {
+                            bundle_name: {
+                                "completed_students": int(completed[plan_id, bundle_id]),
+                                "newly_completed_students": int(newly_completed[plan_id, bundle_id]),
+                            }
+                            for bundle_id, bundle_name in enumerate(compiled.bundle_names)
+                        },
+                    }
+                    for plan_id, (plan_name, courses) in enumerate(plans.items())
+                },
+            }
+            save_report(what_if, job.output_path, job.report_name, 'what_if', job.compact_output)
+
+    @staticmethod
+    def _write_report(report_writer: Any, student_code: str, report: Dict[str, Any], start: float) -> None:
+        """
+        Writes one report and records the time spent on the student since start.
+        """
+        with Profiler.timer('report_writing'):
+            report_writer.write(student_code, report)
+        Profiler.count('reports')
+        Profiler.record_student(student_code, start, time.perf_counter())
+
+    def _write_reports(
+        self,
+        job: ReportJob,
+        student_codes: List[str],
+        report_writer: Any,
+        share_registries: bool
+    ) -> List[str]:
+        """
+        Generates the reports of the given students with the engine of the job.
+
+        :return: The student codes whose report could not be generated.
+        """
+        specified_period = job.report_until_date
+        if job.report_type == 'timeline':
+            if job.remaining_credits:
+                print(f"Remaining credits are only added to complete reports; job '{job.report_name}' omits them.")
+            from report_logic.timeline_report_logic import TimelineReportLogic
+            complete_data = self._get_complete_data(job.curriculum_structure_path)
+            # Walk each student's records once and emit the progress at every period boundary
+            start = time.perf_counter()
+            for student_code, timeline in TimelineReportLogic.get_timelines(
+                complete_data, student_codes, specified_period, job.timeline_output == 'deltas'
+            ):
+                JobRunner._write_report(report_writer, student_code, timeline, start)
+                start = time.perf_counter()
+            return []
+
+        compiled = self._get_compiled_curriculum(job.curriculum_structure_path)
+        course_credits = self._get_course_credits(job, compiled)
+        if job.report_engine == 'cohort':
+            from report_logic.cohort_report_logic import CohortReportLogic
+            # Evaluate the whole student list at once with the cohort matrices
+            complete_reports = CohortReportLogic.get_complete_reports(
+                compiled, student_codes, specified_period, course_credits
+            )
+            for student_code in student_codes:
+                JobRunner._write_report(report_writer, student_code, complete_reports[student_code], time.perf_counter())
+            return []
+
+        if self.workers > 1:
+            from report_runner.parallel_report_runner import ParallelReportRunner
+            # Spread the students across a process pool and collect the failures instead of aborting
+            # Per-student times are measured where the reports are written, so they include the wait for the pool
+            failed_reports = []
+            start = time.perf_counter()
+            for student_code, complete_report, error, counts in ParallelReportRunner.generate_reports(
+                self.csv_path, compiled, student_codes, specified_period, self.workers, self.cache_dir, self.lean,
+                course_credits
+            ):
+                Profiler.merge_counts(counts)
+                if error is not None:
+                    failed_reports.append((student_code, error))
+                else:
+                    JobRunner._write_report(report_writer, student_code, complete_report, start)
+                start = time.perf_counter()
+            if failed_reports:
+                print(f"{len(failed_reports)} reports could not be generated:")
+                for student_code, error in failed_reports:
+                    print(f"  {student_code}: {error}")
+            return [student_code for student_code, _ in failed_reports]
+
+        # Generate and save a report for each student
+        for student_code in student_codes:
+            start = time.perf_counter()
+            with Profiler.timer('report_generation'):
+                student_registry_manager = self._get_student_registry_manager(
+                    student_code, specified_period, share_registries
+                )
+                complete_report = CompleteReportLogic.get_compiled_report(
+                    compiled, student_registry_manager, course_credits
+                )
+            JobRunner._write_report(report_writer, student_code, complete_report, start)
+        return []
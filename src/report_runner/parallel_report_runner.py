@@ -0,0 +1,111 @@
+import multiprocessing
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from csv_reader.csv_reader import CSVReader
+from deserialization.compiled_curriculum import CompiledCurriculum
+from report_logic.complete_report_logic import CompleteReportLogic
+from student_registry_manager.student_registry_manager import StudentRegistryManager
+from utils.profiler import Profiler
+
+# (student_code, report, error, counts) tuple returned for each student; counts holds the worker's
+# counters and diagnostics collected while generating the report
+ReportResult = Tuple[str, Optional[Dict[str, Any]], Optional[str], Dict[str, Any]]
+
+# Read-only state of each worker process, set once by the pool initializer
+_worker_compiled: Optional[CompiledCurriculum] = None
+_worker_specified_period: Optional[str] = None
+_worker_course_credits: Optional[np.ndarray] = None
+
+
+class ParallelReportRunner:
+    @staticmethod
+    def _get_context() -> multiprocessing.context.BaseContext:
+        """
+        Prefers the fork start method, so workers inherit the loaded dataset and the student index
+        from the parent process instead of receiving a pickled copy of the DataFrame.
+        """
+        if 'fork' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('fork')
+        return multiprocessing.get_context()
+
+    @staticmethod
+    def _initialize_worker(
+        csv_path: Path,
+        cache_dir: Optional[Path],
+        lean: bool,
+        compiled: CompiledCurriculum,
+        specified_period: str,
+        course_credits: Optional[np.ndarray]
+    ) -> None:
+        """
+        Prepares a worker process. Forked workers already hold the CSVReader singleton state of the
+        parent, so the CSVReader call is a no-op; spawned workers load the CSV once here.
+
+        :param csv_path: Path to the CSV file, used only when the dataset was not inherited.
+        :param cache_dir: Columnar cache directory used by CSVReader, if any.
+        :param lean: Whether CSVReader uses the lean loading mode.
+        :param compiled: The compiled curriculum to evaluate.
+        :param specified_period: The period up to which to filter records.
+        :param course_credits: Optional catalog credits of each course ID.
+        """
+        global _worker_compiled, _worker_specified_period, _worker_course_credits
+        CSVReader(csv_path, cache_dir, lean)
+        # Forked workers inherit the counters of the parent; start from zero so nothing is merged twice
+        Profiler.take_counts()
+        _worker_compiled = compiled
+        _worker_specified_period = specified_period
+        _worker_course_credits = course_credits
+
+    @staticmethod
+    def _generate_report(student_code: str) -> ReportResult:
+        """
+        Generates the complete report of one student inside a worker process.
+        Errors are returned instead of raised, so a failing student does not abort the run.
+
+        :param student_code: The student code to report.
+        :return: A (student_code, report, error, counts) tuple; either report or error is None.
+        """
+        try:
+            student_registry_manager = StudentRegistryManager(student_code, _worker_specified_period)
+            complete_report = CompleteReportLogic.get_compiled_report(
+                _worker_compiled, student_registry_manager, _worker_course_credits
+            )
+            return student_code, complete_report, None, Profiler.take_counts()
+        except Exception as e:
+            return student_code, None, f"{type(e).__name__}: {e}", Profiler.take_counts()
+
+    @staticmethod
+    def generate_reports(
+        csv_path: Path,
+        compiled: CompiledCurriculum,
+        student_codes: List[str],
+        specified_period: str,
+        workers: int,
+        cache_dir: Optional[Path] = None,
+        lean: bool = False,
+        course_credits: Optional[np.ndarray] = None
+    ) -> Iterator[ReportResult]:
+        """
+        Spreads the students across a process pool and yields their results in the order of
+        student_codes, so the output is deterministic regardless of the number of workers.
+        The dataset must already be loaded in the calling process through CSVReader.
+
+        :param csv_path: Path to the CSV file loaded by CSVReader.
+        :param compiled: The compiled curriculum to evaluate.
+        :param student_codes: The student codes to report.
+        :param specified_period: The period up to which to filter records.
+        :param workers: The number of worker processes.
+        :param cache_dir: Columnar cache directory used by CSVReader, if any.
+        :param lean: Whether CSVReader uses the lean loading mode.
+        :param course_credits: Optional catalog credits of each course ID, added to the bundles of every report.
+        :return: An iterator of (student_code, report, error, counts) tuples.
+        """
+        chunk_size = max(1, len(student_codes) // (workers * 8))
+        context = ParallelReportRunner._get_context()
+        with context.Pool(
+            processes=workers,
+            initializer=ParallelReportRunner._initialize_worker,
+            initargs=(csv_path, cache_dir, lean, compiled, specified_period, course_credits)
+        ) as pool:
+            yield from pool.imap(ParallelReportRunner._generate_report, student_codes, chunksize=chunk_size)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from csv_reader.csv_reader import CSVReader
+from queries.period_queries import PeriodQueries
+from output_printer.output_printer import get_report_path
+from utils.period import Period
+
+
+class ReportManifest:
+    """
+    Keeps a fingerprint per student of the inputs of its report, so a rerun only recomputes the
+    students whose records, curriculum or cutoff changed since the previous run.
+    The manifest is stored next to the reports as `{report_name}-manifest.json`.
+    """
+    # Bump when the fingerprint definition changes, so every student is recomputed once
+    FORMAT_VERSION = 1
+
+    # Columns that determine a report; CODIGO is implied by the student slice
+    FINGERPRINT_COLUMNS = [column for column in CSVReader.REQUIRED_COLUMNS if column != 'CODIGO']
+
+    def __init__(self, output_dir: Path, report_name: str) -> None:
+        """
+        :param output_dir: The directory of the reports.
+        :param report_name: The prefix of the report files.
+        """
+        self.output_dir = output_dir
+        self.report_name = report_name
+        self.path = output_dir / f"{report_name}-manifest.json"
+        self.previous_fingerprints = self._load()
+        self.fingerprints: Dict[str, str] = {}
+        self.recomputed: List[str] = []
+        self.skipped: List[str] = []
+        self.added: List[str] = []
+        self.removed: List[str] = []
+
+    def _load(self) -> Dict[str, str]:
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open('r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest {self.path}: {e}")
+            return {}
+        if manifest.get('format_version') != ReportManifest.FORMAT_VERSION:
+            return {}
+        return manifest.get('students', {})
+
+    @staticmethod
+    def _get_row_hashes() -> Optional[np.ndarray]:
+        """
+        Hashes every record of the loaded dataset once, over the columns that determine a report.
+        """
+        data = CSVReader.get_data()
+        if data is None:
+            return None
+        columns = [column for column in ReportManifest.FINGERPRINT_COLUMNS if column in data.columns]
+        records = data[columns]
+        # Credits are widened so the full and lean loading modes produce the same fingerprints
+        if 'NUMERO_CREDITOS' in records.columns:
+            records = records.astype({'NUMERO_CREDITOS': np.float64})
+        return pd.util.hash_pandas_object(records, index=False).to_numpy()
+
+    @staticmethod
+    def compute_fingerprints(student_codes: Iterable[str], specified_period: str, settings: str) -> Dict[str, str]:
+        """
+        Computes the fingerprint of each student from its records before the specified period.
+        Records after the cutoff never change a report: an approved course always has a record before the
+        cutoff, and its first record (which provides the credits) is therefore before the cutoff too.
+
+        :param student_codes: The student codes to fingerprint.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :param settings: The curriculum hash, cutoff and report options shared by every student.
+        :return: A dictionary mapping each student code to its fingerprint.
+        """
+        limit_key = Period.to_key(specified_period)
+        data = CSVReader.get_data()
+        student_index = CSVReader.get_student_index()
+        row_hashes = ReportManifest._get_row_hashes()
+        period_keys = data[PeriodQueries.PERIOD_KEY_COLUMN].to_numpy() if data is not None else None
+
+        fingerprints: Dict[str, str] = {}
+        for student_code in student_codes:
+            digest = hashlib.sha256(settings.encode('utf-8'))
+            bounds = student_index.get_bounds(student_code) if student_index is not None else None
+            if bounds is not None and row_hashes is not None:
+                start, stop = bounds
+                # Each student's block is sorted by period key, so the cutoff is a binary search away
+                stop = start + int(np.searchsorted(period_keys[start:stop], limit_key, side='left'))
+                digest.update(row_hashes[start:stop].tobytes())
+            fingerprints[student_code] = digest.hexdigest()
+        return fingerprints
+
+    def get_pending_students(self, student_codes: List[str], specified_period: str, settings: str) -> List[str]:
+        """
+        Fingerprints the students and returns the ones whose report must be generated: new students,
+        students whose fingerprint changed and students whose report file is missing. Reports of students
+        that are no longer in the list are deleted.
+
+        :param student_codes: The student codes of the job.
+        :param specified_period: The exclusive upper limit period in YYYYXZ format.
+        :param settings: The curriculum hash, cutoff and report options shared by every student.
+        :return: The student codes to recompute, in the order of student_codes.
+        """
+        unique_student_codes = list(dict.fromkeys(student_codes))
+        self.fingerprints = ReportManifest.compute_fingerprints(unique_student_codes, specified_period, settings)
+
+        pending: List[str] = []
+        for student_code in unique_student_codes:
+            previous_fingerprint = self.previous_fingerprints.get(student_code)
+            if previous_fingerprint is None:
+                self.added.append(student_code)
+                pending.append(student_code)
+            elif (
+                previous_fingerprint != self.fingerprints[student_code]
+                or not get_report_path(self.output_dir, self.report_name, student_code).exists()
+            ):
+                self.recomputed.append(student_code)
+                pending.append(student_code)
+            else:
+                self.skipped.append(student_code)
+
+        for student_code in self.previous_fingerprints:
+            if student_code not in self.fingerprints:
+                self.removed.append(student_code)
+                report_path = get_report_path(self.output_dir, self.report_name, student_code)
+                if report_path.exists():
+                    report_path.unlink()
+        return pending
+
+    def save(self, failed_student_codes: Iterable[str] = ()) -> None:
+        """
+        Saves the fingerprints of the current run. Students whose report failed are left out, so
+        they are recomputed by the next run.
+
+        :param failed_student_codes: The student codes whose report could not be generated.
+        """
+        failed = set(failed_student_codes)
+        manifest = {
+            'format_version': ReportManifest.FORMAT_VERSION,
+            'students': {code: fingerprint for code, fingerprint in self.fingerprints.items() if code not in failed}
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.path.with_name(self.path.name + '.tmp')
+        with temporary_path.open('w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+        temporary_path.replace(self.path)
+
+    def print_summary(self) -> None:
+        print(f"Incremental run: {len(self.recomputed)} recomputed, {len(self.skipped)} skipped, "
+              f"{len(self.added)} added, {len(self.removed)} removed.")
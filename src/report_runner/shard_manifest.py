@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from utils.shard import Shard
+
+
+class ShardManifest:
+    """
+    Records that a shard finished a job. The manifest is written to the output directory of the shard
+    as `{report_name}-shard.json` once every output file of the job is written, so its presence means
+    the shard completed the job. It holds:
+    - shard / shards: The index of the shard and the number of shards of the run.
+    - settings: A hash of the data source, curriculum, cutoff, student list and output options of the job, so the
+      merge can tell that every shard ran the same job.
+    - students: The number of entries of the student list assigned to the shard.
+    - failed_student_codes: The students whose report could not be generated.
+    """
+    # Bump when the content of the manifest changes
+    FORMAT_VERSION = 1
+
+    @staticmethod
+    def get_path(shard_dir: Path, report_name: str) -> Path:
+        return shard_dir / f"{report_name}-shard.json"
+
+    @staticmethod
+    def get_completion_path(shard_dir: Path, report_name: str) -> Path:
+        """
+        :return: The path of the completion percentages saved by a shard of a statistics job.
+        """
+        return shard_dir / f"{report_name}-completion.npy"
+
+    @staticmethod
+    def save(
+        shard_dir: Path,
+        report_name: str,
+        shard: Shard,
+        settings: str,
+        students: int,
+        failed_student_codes: Iterable[str] = ()
+    ) -> None:
+        """
+        Writes the manifest of a completed job.
+
+        :param shard_dir: The output directory of the shard.
+        :param report_name: The report name of the job.
+        :param shard: The shard of the run.
+        :param settings: The settings hash of the job.
+        :param students: The number of entries of the student list assigned to the shard.
+        :param failed_student_codes: The students whose report could not be generated.
+        """
+        manifest = {
+            'format_version': ShardManifest.FORMAT_VERSION,
+            'report_name': report_name,
+            'shard': shard.index,
+            'shards': shard.count,
+            'settings': settings,
+            'students': students,
+            'failed_student_codes': list(failed_student_codes),
+            'completed_at': datetime.now(timezone.utc).isoformat(),
+        }
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        path = ShardManifest.get_path(shard_dir, report_name)
+        temporary_path = path.with_name(path.name + '.tmp')
+        with temporary_path.open('w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=4)
+        temporary_path.replace(path)
+
+    @staticmethod
+    def load(shard_dir: Path, report_name: str) -> Optional[Dict[str, Any]]:
+        """
+        :return: The manifest of a job in the output directory of a shard, or None if the shard did not
+                 complete the job.
+        """
+        path = ShardManifest.get_path(shard_dir, report_name)
+        if not path.exists():
+            return None
+        try:
+            with path.open('r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable shard manifest {path}: {e}")
+            return None
+        if manifest.get('format_version') != ShardManifest.FORMAT_VERSION:
+            return None
+        return manifest
@@ -0,0 +1,239 @@
+import heapq
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+from deserialization.compiled_curriculum import CompiledCurriculum
+from output_printer.output_printer import NDJSONReportWriter, get_report_path, save_report
+from report_runner.job_runner import JobRunner, ReportJob
+from report_runner.shard_manifest import ShardManifest
+from utils.shard import Shard
+
+
+class ShardMerger:
+    """
+    Combines the output of the shards of a sharded run into the output an unsharded run would write.
+    A job is only merged when every shard completed it with the same settings; per-student reports are
+    copied or interleaved back into the order of the student list, and statistics are recomputed
+    from the data of every shard.
+    """
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, runner: JobRunner, shards: int) -> None:
+        """
+        :param runner: An unsharded JobRunner, used to read the curricula and student lists of the jobs.
+        :param shards: The number of shards of the run.
+        """
+        if shards < 1:
+            raise ValueError(f"Invalid number of shards {shards}: it must be at least 1.")
+        self.runner = runner
+        self.shards = [Shard(index, shards) for index in range(shards)]
+
+    def _load_manifests(self, job: ReportJob) -> List[Dict[str, Any]]:
+        """
+        Checks that every shard completed the job with the settings of the configuration.
+
+        :return: The manifest of each shard.
+        :raises ValueError: If a shard did not complete the job or ran it with other settings.
+        """
+        settings = self.runner.get_shard_settings(job)
+        manifests: List[Dict[str, Any]] = []
+        problems: List[str] = []
+        for shard in self.shards:
+            shard_dir = shard.get_output_dir(job.output_path)
+            manifest = ShardManifest.load(shard_dir, job.report_name)
+            if manifest is None:
+                problems.append(f"shard {shard} has not completed it (no manifest in {shard_dir})")
+            elif manifest['shard'] != shard.index or manifest['shards'] != shard.count:
+                problems.append(f"{shard_dir} holds shard {manifest['shard']}/{manifest['shards']}")
+            elif manifest['settings'] != settings:
+                problems.append(f"shard {shard} ran with a different data source, curriculum, cutoff, student list "
+                                f"or output options")
+            else:
+                manifests.append(manifest)
+        if problems:
+            raise ValueError(f"Cannot merge job '{job.report_name}': " + "; ".join(problems) + ".")
+        return manifests
+
+    def merge(self, job: ReportJob) -> None:
+        """
+        Validates the shards of a job and writes the merged output to the output path of the job.
+
+        :param job: The report job to merge.
+        :raises ValueError: If a shard did not complete the job, ran it with other settings or lost a report.
+        """
+        manifests = self._load_manifests(job)
+        if job.report_type == 'statistics':
+            self._merge_statistics(job)
+        elif job.report_type == 'what_if':
+            self._merge_what_if(job)
+        elif job.output_format == 'ndjson':
+            self._merge_ndjson(job, manifests)
+        else:
+            self._merge_json(job, manifests)
+
+        failed_student_codes = [code for manifest in manifests for code in manifest['failed_student_codes']]
+        if failed_student_codes:
+            print(f"{len(failed_student_codes)} reports could not be generated by the shards:")
+            for student_code in failed_student_codes:
+                print(f"  {student_code}")
+
+    def _merge_json(self, job: ReportJob, manifests: List[Dict[str, Any]]) -> None:
+        """
+        Copies the report file of every student from the directory of its shard.
+        """
+        failed = {code for manifest in manifests for code in manifest['failed_student_codes']}
+        copies = []
+        missing: List[str] = []
+        for student_code in self.runner.get_student_codes([job]):
+            shard = self.shards[Shard.get_shard_index(student_code, len(self.shards))]
+            source = get_report_path(shard.get_output_dir(job.output_path), job.report_name, student_code)
+            if source.exists():
+                copies.append((source, get_report_path(job.output_path, job.report_name, student_code)))
+            elif student_code not in failed:
+                missing.append(student_code)
+        if missing:
+            raise ValueError(f"Cannot merge job '{job.report_name}': the reports of {len(missing)} students are "
+                             f"missing from their shard ({', '.join(missing[:5])}).")
+
+        job.output_path.mkdir(parents=True, exist_ok=True)
+        for source, destination in copies:
+            shutil.copyfile(source, destination)
+        print(f"{len(copies)} reports of job '{job.report_name}' merged into {job.output_path}")
+
+    @staticmethod
+    def _read_student_code(line: str) -> str:
+        """
+        Decodes the student code of an NDJSON line, which is always its first key, without decoding the report.
+        """
+        start = line.index(':') + 1
+        while line[start] == ' ':
+            start += 1
+        student_code, _ = ShardMerger._decoder.raw_decode(line, start)
+        return student_code
+
+    @staticmethod
+    def _read_lines(file_path: Path) -> Iterator[str]:
+        with file_path.open('r', encoding='utf-8') as file:
+            yield from file
+
+    @staticmethod
+    def _read_positioned_lines(file_path: Path, positions: Dict[str, List[int]]) -> Iterator[Tuple[int, str]]:
+        """
+        Pairs each line of an NDJSON file with the position of its entry in the student list. A student
+        listed several times has one line per entry, written in list order, so its n-th line takes the
+        position of its n-th entry.
+
+        :raises ValueError: If a line belongs to a student without a remaining entry in the list.
+        """
+        occurrences: Dict[str, int] = {}
+        for line in ShardMerger._read_lines(file_path):
+            student_code = ShardMerger._read_student_code(line)
+            occurrence = occurrences.get(student_code, 0)
+            student_positions = positions.get(student_code, [])
+            if occurrence >= len(student_positions):
+                raise ValueError(f"{file_path} holds more reports of student {student_code} than the student list.")
+            occurrences[student_code] = occurrence + 1
+            yield student_positions[occurrence], line
+
+    def _check_ndjson_files(self, job: ReportJob, manifests: List[Dict[str, Any]]) -> None:
+        """
+        Checks that every shard wrote all of its NDJSON files with one report per assigned student,
+        except for the students whose report failed.
+
+        :raises ValueError: If a file is missing or a shard holds another number of reports.
+        """
+        problems: List[str] = []
+        for shard, manifest in zip(self.shards, manifests):
+            shard_files = NDJSONReportWriter.get_output_files(
+                shard.get_output_dir(job.output_path), job.report_name, job.output_shards
+            )
+            missing_files = [str(shard_file) for shard_file in shard_files if not shard_file.exists()]
+            if missing_files:
+                problems.append(f"shard {shard} is missing {', '.join(missing_files)}")
+                continue
+            reports = sum(sum(1 for _ in ShardMerger._read_lines(shard_file)) for shard_file in shard_files)
+            expected = manifest['students'] - len(manifest['failed_student_codes'])
+            if reports != expected:
+                problems.append(f"shard {shard} holds {reports} reports instead of {expected}")
+        if problems:
+            raise ValueError(f"Cannot merge job '{job.report_name}': " + "; ".join(problems) + ".")
+
+    def _merge_ndjson(self, job: ReportJob, manifests: List[Dict[str, Any]]) -> None:
+        """
+        Interleaves the NDJSON files of the shards. Each shard wrote its reports in the order of the
+        student list, so a streaming merge on the position of each entry restores that order.
+        """
+        self._check_ndjson_files(job, manifests)
+        positions: Dict[str, List[int]] = {}
+        for position, student_code in enumerate(self.runner.get_job_student_codes(job)):
+            positions.setdefault(student_code, []).append(position)
+        output_files = NDJSONReportWriter.get_output_files(job.output_path, job.report_name, job.output_shards)
+        reports = 0
+        for file_position, output_file in enumerate(output_files):
+            shard_files = [
+                NDJSONReportWriter.get_output_files(
+                    shard.get_output_dir(job.output_path), job.report_name, job.output_shards
+                )[file_position]
+                for shard in self.shards
+            ]
+            lines = heapq.merge(
+                *(ShardMerger._read_positioned_lines(shard_file, positions) for shard_file in shard_files)
+            )
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            with output_file.open('w', encoding='utf-8') as file:
+                for _, line in lines:
+                    file.write(line)
+                    reports += 1
+        print(f"{reports} reports of job '{job.report_name}' merged into {job.output_path}")
+
+    def _load_shard_report(self, job: ReportJob, shard: Shard, name: str) -> Dict[str, Any]:
+        with get_report_path(shard.get_output_dir(job.output_path), job.report_name, name).open('r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _merge_statistics(self, job: ReportJob) -> None:
+        """
+        Recomputes the statistics of the whole cohort from the completion percentages of every shard,
+        placed back in the order of the student list.
+        """
+        from report_logic.cohort_statistics_logic import CohortStatisticsLogic
+        compiled = CompiledCurriculum.from_json_file(job.curriculum_structure_path, self.runner.curriculum_cache_dir)
+        student_codes = self.runner.get_student_codes([job])
+        positions = {code: position for position, code in enumerate(student_codes)}
+
+        completion_percentages = np.zeros((len(student_codes), len(compiled.bundle_names)), dtype=np.float64)
+        shard_statistics: List[Dict[str, Any]] = []
+        for shard in self.shards:
+            shard_completion = np.load(
+                ShardManifest.get_completion_path(shard.get_output_dir(job.output_path), job.report_name)
+            )
+            rows = [positions[code] for code in shard.filter_student_codes(student_codes)]
+            if shard_completion.shape != (len(rows), len(compiled.bundle_names)):
+                raise ValueError(f"Cannot merge job '{job.report_name}': the completion percentages of shard "
+                                 f"{shard} do not match its students.")
+            completion_percentages[rows] = shard_completion
+            shard_statistics.append(self._load_shard_report(job, shard, 'statistics'))
+
+        statistics = CohortStatisticsLogic.merge_statistics(compiled, shard_statistics, completion_percentages)
+        save_report(statistics, job.output_path, job.report_name, 'statistics', job.compact_output)
+
+    @staticmethod
+    def _add_counts(total: Dict[str, Any], counts: Dict[str, Any]) -> None:
+        """
+        Adds every integer count of a nested dictionary to the same key of total.
+        """
+        for key, value in counts.items():
+            if isinstance(value, dict):
+                ShardMerger._add_counts(total[key], value)
+            elif isinstance(value, int) and not isinstance(value, bool):
+                total[key] += value
+
+    def _merge_what_if(self, job: ReportJob) -> None:
+        """
+        Adds up the student counts of every shard; each student belongs to exactly one shard.
+        """
+        what_if = self._load_shard_report(job, self.shards[0], 'what_if')
+        for shard in self.shards[1:]:
+            ShardMerger._add_counts(what_if, self._load_shard_report(job, shard, 'what_if'))
+        save_report(what_if, job.output_path, job.report_name, 'what_if', job.compact_output)
@@ -0,0 +1,90 @@
+import json
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+from report_server.report_service import ReportService
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers the requests of the report server:
+    - GET /report?student_code=...&curriculum=...&cutoff=...: The complete report of a student.
+    - GET /stats: The request, reload and report cache counters.
+    - DELETE /cache: Empties the report cache, so cold requests can be measured again.
+    """
+    # Keep-alive connections, so a client does not pay a new connection for every report
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are written separately; without TCP_NODELAY the body waits for a delayed ACK
+    disable_nagle_algorithm = True
+    server: 'ReportServer'
+
+    def _send(self, status: HTTPStatus, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: HTTPStatus, content: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(content, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        parameters = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+        if url.path == '/stats':
+            self._send_json(HTTPStatus.OK, self.server.service.get_stats())
+            return
+        if url.path != '/report':
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown path: {url.path}"})
+            return
+
+        missing = [name for name in ('student_code', 'curriculum') if not parameters.get(name)]
+        if missing:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': f"Missing parameters: {', '.join(missing)}"})
+            return
+
+        try:
+            report = self.server.service.get_report(
+                parameters['student_code'], parameters['curriculum'], parameters.get('cutoff')
+            )
+        except LookupError as e:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': str(e)})
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+        else:
+            self._send(HTTPStatus.OK, report)
+
+    def do_DELETE(self) -> None:
+        if urlsplit(self.path).path != '/cache':
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown path: {self.path}"})
+            return
+        self.server.service.report_cache.clear()
+        self._send_json(HTTPStatus.OK, self.server.service.get_stats())
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # One line per request would dominate the cost of a cached report
+        pass
+
+
+class ReportServer(ThreadingHTTPServer):
+    """
+    Local HTTP server that answers report requests from a ReportService, one thread per connection.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ReportService) -> None:
+        """
+        :param address: The (host, port) to listen on; port 0 picks a free port.
+        :param service: The loaded ReportService.
+        """
+        super().__init__(address, ReportRequestHandler)
+        self.service = service
+
+    def get_url(self) -> str:
+        """
+        :return: The base URL the server listens on.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
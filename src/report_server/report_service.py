@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from csv_reader.csv_reader import CSVReader
+from csv_reader.period_store import PeriodStore
+from deserialization.compiled_curriculum import CompiledCurriculum
+from student_registry_manager.student_registry_manager import StudentRegistryManager
+from report_logic.complete_report_logic import CompleteReportLogic
+from report_logic.related_course_bundles_logic import RelatedCourseBundlesLogic
+from output_printer.output_printer import SetEncoder
+from utils.lru_cache import LRUCache
+from utils.period import Period
+
+# (mtime in nanoseconds, size) of a source file, used to notice that it changed
+FileSignature = Tuple[int, int]
+
+
+class ReportService:
+    """
+    Keeps the dataset and the compiled curricula in memory and answers (student, curriculum, cutoff)
+    report requests. Finished reports are kept serialized in a bounded LRU cache.
+
+    The data source and the curriculum files are checked for changes at most once per check interval.
+    A changed dataset is reloaded and empties the whole cache; a changed curriculum is recompiled and
+    only drops the reports of that curriculum.
+
+    Reports are generated one at a time: the queries are CPU bound and hold the GIL anyway, and the
+    single data lock keeps a reload from swapping the dataset while a report is being built. Cache
+    hits do not take the data lock.
+    """
+    def __init__(
+        self,
+        data_set_path: Path,
+        curricula: Dict[str, Path],
+        default_cutoff: str,
+        cache_dir: Optional[Path] = None,
+        lean: bool = False,
+        curriculum_cache_dir: Optional[Path] = None,
+        report_cache_size: int = 1024,
+        check_interval: float = 1.0
+    ) -> None:
+        """
+        :param data_set_path: Path to the CSV file or period store with the academic records.
+        :param curricula: The curriculum JSON file of each curriculum name accepted by the requests.
+        :param default_cutoff: The cutoff period used when a request does not give one.
+        :param cache_dir: Columnar cache directory used by CSVReader, if any.
+        :param lean: Whether CSVReader uses the lean loading mode.
+        :param curriculum_cache_dir: Directory of compiled curricula, if any.
+        :param report_cache_size: The maximum number of finished reports kept in memory.
+        :param check_interval: Minimum number of seconds between two checks of the source files.
+        """
+        self.data_set_path = data_set_path
+        self.curricula = curricula
+        self.default_cutoff = default_cutoff
+        self.cache_dir = cache_dir
+        self.lean = lean
+        self.curriculum_cache_dir = curriculum_cache_dir
+        self.check_interval = check_interval
+        self.report_cache: LRUCache[bytes] = LRUCache(report_cache_size)
+        self.reloads = 0
+        self.requests = 0
+        self._compiled: Dict[str, CompiledCurriculum] = {}
+        self._curriculum_signatures: Dict[str, Optional[FileSignature]] = {}
+        self._data_signature: Optional[FileSignature] = None
+        self._last_check = 0.0
+        self._data_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ReportService':
+        """
+        Creates a ReportService from the main configuration. The curricula are listed in the optional
+        `server_curricula` mapping; by default every JSON file next to `curriculum_structure_path` is
+        served under its file name without extension.
+
+        :param config: The configuration loaded from config.yml.
+        :return: An instance of ReportService.
+        """
+        if config.get('server_curricula'):
+            curricula = {str(name): Path(path) for name, path in config['server_curricula'].items()}
+        else:
+            curriculum_dir = Path(config['curriculum_structure_path']).parent
+            curricula = {path.stem: path for path in sorted(curriculum_dir.glob('*.json'))}
+
+        return cls(
+            data_set_path=Path(config['data_set_path']),
+            curricula=curricula,
+            default_cutoff=str(config['report_until_date']),
+            cache_dir=Path(config['data_cache_path']) if config.get('data_cache_path') else None,
+            lean=config.get('data_loading_mode', 'full') == 'lean',
+            curriculum_cache_dir=Path(config['curriculum_cache_path']) if config.get('curriculum_cache_path') else None,
+            report_cache_size=config.get('report_cache_size', 1024),
+            check_interval=config.get('reload_check_interval', 1.0)
+        )
+
+    @staticmethod
+    def _get_file_signature(path: Path) -> Optional[FileSignature]:
+        # A period store changes whenever its manifest is rewritten
+        if PeriodStore.is_store(path):
+            path = path / PeriodStore.MANIFEST_FILE
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_data(self) -> None:
+        CSVReader.reset()
+        CSVReader(self.data_set_path, self.cache_dir, self.lean)
+        self._data_signature = ReportService._get_file_signature(self.data_set_path)
+
+    def _load_curriculum(self, name: str) -> None:
+        path = self.curricula[name]
+        self._curriculum_signatures[name] = ReportService._get_file_signature(path)
+        previous = self._compiled.get(name)
+        compiled = CompiledCurriculum.from_json_file(path, self.curriculum_cache_dir)
+        self._compiled[name] = compiled
+        if previous is not None and previous.source_hash != compiled.source_hash:
+            removed = self.report_cache.remove_if(lambda key: key[0] == name)
+            print(f"Curriculum '{name}' changed; {removed} cached reports discarded.")
+
+    def load(self) -> None:
+        """
+        Loads the dataset and compiles every curriculum.
+        """
+        with self._data_lock:
+            self._load_data()
+            for name in self.curricula:
+                self._load_curriculum(name)
+            self._last_check = time.monotonic()
+
+    def check_sources(self, force: bool = False) -> None:
+        """
+        Reloads the dataset or the curricula whose files changed since they were loaded.
+
+        :param force: Whether to check even if the check interval has not elapsed.
+        """
+        if not force and time.monotonic() - self._last_check < self.check_interval:
+            return
+
+        with self._data_lock:
+            self._last_check = time.monotonic()
+            if ReportService._get_file_signature(self.data_set_path) != self._data_signature:
+                print(f"Data source {self.data_set_path} changed; reloading.")
+                self._load_data()
+                self.report_cache.clear()
+                self.reloads += 1
+            for name, path in self.curricula.items():
+                if ReportService._get_file_signature(path) != self._curriculum_signatures.get(name):
+                    self._load_curriculum(name)
+                    self.reloads += 1
+
+    def get_report(self, student_code: str, curriculum: str, cutoff: Optional[str] = None) -> bytes:
+        """
+        Returns the complete report of a student as UTF-8 encoded JSON.
+
+        :param student_code: The student code.
+        :param curriculum: The name of the curriculum.
+        :param cutoff: The cutoff period in YYYYXZ format; the default cutoff when omitted.
+        :return: The serialized report.
+        :raises LookupError: If the curriculum is not served.
+        :raises ValueError: If the cutoff is not a valid period.
+        """
+        if curriculum not in self.curricula:
+            raise LookupError(f"Unknown curriculum: {curriculum}")
+        cutoff = cutoff or self.default_cutoff
+        Period.to_key(cutoff)
+        student_code = str(student_code).strip()
+        self.requests += 1
+
+        self.check_sources()
+        key = (curriculum, student_code, cutoff)
+        report = self.report_cache.get(key)
+        if report is not None:
+            return report
+
+        with self._data_lock:
+            student_registry_manager = StudentRegistryManager(student_code, cutoff)
+            complete_report = CompleteReportLogic.get_compiled_report(self._compiled[curriculum], student_registry_manager)
+            report = json.dumps(complete_report, ensure_ascii=False, cls=SetEncoder).encode('utf-8')
+            self.report_cache.put(key, report)
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        :return: The number of requests and reloads, the loaded data and the report cache counters.
+        """
+        data = CSVReader.get_data()
+        return {
+            'requests': self.requests,
+            'reloads': self.reloads,
+            'records': 0 if data is None else len(data),
+            'curricula': sorted(self.curricula),
+            'default_cutoff': self.default_cutoff,
+            'report_cache': self.report_cache.get_stats(),
+            'group_summary_cache': RelatedCourseBundlesLogic.summary_cache.get_stats(),
+        }
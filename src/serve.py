@@ -0,0 +1,36 @@
+import argparse
+import yaml
+from pathlib import Path
+from report_server.report_service import ReportService
+from report_server.report_server import ReportServer
+
+def serve(config_path: Path, host: str, port: int) -> None:
+    """
+    Loads the dataset and the curricula once and answers report requests until interrupted.
+
+    :param config_path: Path to the YAML configuration file.
+    :param host: The address to listen on.
+    :param port: The port to listen on.
+    """
+    with config_path.open('r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+
+    service = ReportService.from_config(config)
+    service.load()
+
+    with ReportServer((host, port), service) as server:
+        print(f"Serving {', '.join(sorted(service.curricula))} reports on {server.get_url()}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Server stopped.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve academic progress reports over HTTP.")
+    parser.add_argument("--config", type=Path, default=Path("src/config.yml"), help="Path to the configuration file.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    args = parser.parse_args()
+
+    # Run the server
+    serve(args.config, args.host, args.port)
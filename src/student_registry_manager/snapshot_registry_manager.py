@@ -0,0 +1,66 @@
+from typing import Dict, Optional, Tuple
+from csv_reader.approval_snapshot_store import ApprovalSnapshotStore
+from utils.profiler import Profiler
+
+
+class SnapshotStudentRegistryManager:
+    """
+    StudentRegistryManager read from an ApprovalSnapshotStore: the subject map of a student at a cutoff
+    comes from the latest snapshot before it, without loading or filtering any DataFrame.
+    It exposes the same interface, so the report logic produces identical reports.
+    """
+    store: Optional[ApprovalSnapshotStore] = None
+
+    def __init__(self, student_code: str, specified_period: str) -> None:
+        """
+        Initializes the registry manager with the snapshot of a student before a specified period.
+
+        :param student_code: The student code to retrieve records.
+        :param specified_period: The period up to which to filter records.
+        """
+        self.student_code: str = student_code
+        self.specified_period: str = specified_period
+        self.subject_map: Dict[str, Tuple[bool, float]] = {}
+
+        store = SnapshotStudentRegistryManager.store
+        if store is None:
+            print("No approval snapshot store opened.")
+            return
+
+        student_row = store.get_student_row(student_code)
+        if student_row is None:
+            Profiler.report_diagnostic("No records found for student code", student_code)
+            Profiler.report_diagnostic(f"No records found before period {specified_period}", None)
+            return
+        snapshot = store.get_snapshot(student_row, specified_period)
+        if snapshot is None:
+            Profiler.report_diagnostic(f"No records found before period {specified_period}", student_code)
+        self.subject_map = store.get_subject_map(student_row, snapshot)
+
+    def approve_subject_until_specified_period(self, subject_code: str) -> bool:
+        """
+        Checks if the student has passed or homologated a specific subject before the specified period.
+
+        :param subject_code: The subject code to check for approval.
+        :return: True if the student has passed or homologated the subject before the specified period, False otherwise.
+        """
+        Profiler.count('approval_checks')
+        approved, _ = self.subject_map.get(str(subject_code), (False, 0.0))
+        return approved
+
+    def get_subject_credits(self, subject_code: str) -> float:
+        """
+        Retrieves the number of credits for a specific subject for this student.
+
+        :param subject_code: The code of the subject to retrieve credits for.
+        :return: The number of credits for the specified subject as a float. Returns 0.0 if not found.
+        """
+        subject_entry = self.subject_map.get(str(subject_code))
+        if subject_entry is None:
+            Profiler.report_diagnostic("No credit information found for subject code", subject_code)
+            return 0.0
+        return subject_entry[1]
+
+    def __repr__(self) -> str:
+        return (f"SnapshotStudentRegistryManager(student_code={self.student_code}, "
+                f"specified_period={self.specified_period}, subjects={len(self.subject_map)})")
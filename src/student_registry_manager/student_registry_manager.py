@@ -1,8 +1,9 @@
+from typing import Dict, Tuple
 import pandas as pd
-from queries.student_queries import StudentQueries  
-from queries.period_queries import PeriodQueries  
-from queries.subject_queries import SubjectQueries  
-from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic  
+from queries.student_queries import StudentQueries
+from queries.period_queries import PeriodQueries
+from approve_subject_logic.approve_subject_logic import ApproveSubjectLogic
+from utils.profiler import Profiler
 
 class StudentRegistryManager:
     def __init__(self, student_code: str, specified_period: str) -> None:
@@ -16,15 +17,44 @@ class StudentRegistryManager:
         # Initialize attributes
         self.student_code: str = student_code
         self.specified_period: str = specified_period
-        
+
         # Use StudentQueries to get the complete student records
         self.full_student_dataframe: pd.DataFrame = StudentQueries.get_student_records(student_code)
-        
+
         # Use PeriodQueries to filter records up to the specified period
         self.student_dataframe_until_specified_period: pd.DataFrame = (
             PeriodQueries.filter_records_before_period(self.full_student_dataframe, specified_period)
         )
 
+        # Map every subject the student took to its (approved, credits) pair for O(1) lookups
+        self.subject_map: Dict[str, Tuple[bool, float]] = self._build_subject_map()
+
+    def _build_subject_map(self) -> Dict[str, Tuple[bool, float]]:
+        """
+        Builds the subject code -> (approved, credits) map of the student.
+        A subject is approved if any of its attempts before the specified period was approved.
+        Its credits are taken from the first record of the subject in the full student records.
+
+        :return: A dictionary keyed by subject code.
+        """
+        if self.full_student_dataframe.empty:
+            return {}
+
+        first_records = self.full_student_dataframe.drop_duplicates('MATERIA', keep='first')
+        subject_credits = zip(first_records['MATERIA'].tolist(), first_records['NUMERO_CREDITOS'].tolist())
+
+        approved_by_subject = (
+            self.student_dataframe_until_specified_period
+            .groupby('MATERIA', sort=False, observed=True)[ApproveSubjectLogic.APPROVED_COLUMN]
+            .any()
+        )
+        approved_subjects = dict(zip(approved_by_subject.index.tolist(), approved_by_subject.tolist()))
+
+        return {
+            str(subject): (bool(approved_subjects.get(subject, False)), float(credits))
+            for subject, credits in subject_credits
+        }
+
     def approve_subject_until_specified_period(self, subject_code: str) -> bool:
         """
         Checks if the student has passed or homologated a specific subject before the specified period.
@@ -32,11 +62,9 @@ class StudentRegistryManager:
         :param subject_code: The subject code to check for approval.
         :return: True if the student has passed or homologated the subject before the specified period, False otherwise.
         """
-        # Filter the subject records until the specified period
-        subject_records = SubjectQueries.get_subject(self.student_dataframe_until_specified_period, subject_code)
-        
-        # Use ApproveSubjectLogic to determine if the student passed the subject
-        return ApproveSubjectLogic.has_passed_subject(subject_records)
+        Profiler.count('approval_checks')
+        approved, _ = self.subject_map.get(str(subject_code), (False, 0.0))
+        return approved
 
     def get_subject_credits(self, subject_code: str) -> float:
         """
@@ -45,7 +73,11 @@ class StudentRegistryManager:
         :param subject_code: The code of the subject to retrieve credits for.
         :return: The number of credits for the specified subject as a float. Returns 0.0 if not found.
         """
-        return SubjectQueries.get_subject_credits(self.full_student_dataframe, subject_code)
+        subject_entry = self.subject_map.get(str(subject_code))
+        if subject_entry is None:
+            Profiler.report_diagnostic("No credit information found for subject code", subject_code)
+            return 0.0
+        return subject_entry[1]
 
     def __repr__(self) -> str:
         return (f"StudentRegistryManager(student_code={self.student_code}, "
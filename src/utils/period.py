@@ -1,4 +1,12 @@
+import re
+
+
 class Period:
+    # Periods are "YYYYSM": a four digit year, the semester digit and a trailing digit
+    PERIOD_PATTERN = re.compile(r'^(\d{4})(\d)\d$')
+    # Key assigned to invalid periods so they are never before any limit period
+    INVALID_KEY = 2**31 - 1
+
     @staticmethod
     def get_year(period: str) -> int:
         """
@@ -34,3 +42,18 @@ class Period:
         limit_semester = Period.get_semester(limit_period)
         
         return record_year < limit_year or (record_year == limit_year and record_semester < limit_semester)
+
+    @staticmethod
+    def to_key(period: str) -> int:
+        """
+        Converts a period string in YYYYXZ format into a compact integer key (year * 10 + semester).
+        Keys preserve the ordering used by is_before_period.
+
+        :param period: A string representing the period (e.g., "202120").
+        :return: An integer key (e.g., 20212).
+        :raises ValueError: If the period does not follow the YYYYXZ format.
+        """
+        match = Period.PERIOD_PATTERN.match(str(period).strip())
+        if match is None:
+            raise ValueError(f"Invalid period '{period}': the format must be 'YYYYSM' (e.g., '202420').")
+        return int(match.group(1)) * 10 + int(match.group(2))
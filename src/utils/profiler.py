@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+import numpy as np
+
+
+class Profiler:
+    """
+    Process-wide collector of pipeline telemetry.
+
+    Counters and diagnostics are always collected, since they only cost a dictionary update. Stage timings,
+    peak memory and per-student durations are only recorded after enable() is called (the `--profile` option),
+    because tracing memory allocations slows the pipeline down.
+    """
+    enabled: bool = False
+    counters: Dict[str, int] = {}
+    # Diagnostic message -> [occurrences, first examples]
+    diagnostics: Dict[str, List[Any]] = {}
+    stages: List[Dict[str, Any]] = []
+    timers: Dict[str, float] = {}
+    student_durations: List[float] = []
+    trace_events: List[Dict[str, Any]] = []
+    _stage_stack: List[Dict[str, Any]] = []
+    _origin: float = 0.0
+
+    # Number of examples kept for each diagnostic message
+    DIAGNOSTIC_EXAMPLES = 5
+
+    @staticmethod
+    def enable() -> None:
+        """
+        Starts recording stage timings, peak memory and per-student durations.
+        """
+        Profiler.reset()
+        Profiler.enabled = True
+        Profiler._origin = time.perf_counter()
+        tracemalloc.start()
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Discards everything collected so far and stops recording.
+        """
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        Profiler.enabled = False
+        Profiler.counters = {}
+        Profiler.diagnostics = {}
+        Profiler.stages = []
+        Profiler.timers = {}
+        Profiler.student_durations = []
+        Profiler.trace_events = []
+        Profiler._stage_stack = []
+
+    @staticmethod
+    def count(name: str, amount: int = 1) -> None:
+        """
+        Increments a counter, such as the number of DataFrame filters or approval checks.
+        """
+        Profiler.counters[name] = Profiler.counters.get(name, 0) + amount
+
+    @staticmethod
+    def report_diagnostic(message: str, detail: Any) -> None:
+        """
+        Aggregates a repeated diagnostic instead of printing it every time.
+
+        :param message: The diagnostic message, without the varying detail.
+        :param detail: The value the diagnostic refers to, such as a subject or student code.
+        """
+        entry = Profiler.diagnostics.setdefault(message, [0, []])
+        entry[0] += 1
+        if len(entry[1]) < Profiler.DIAGNOSTIC_EXAMPLES:
+            entry[1].append(str(detail))
+
+    @staticmethod
+    def _get_timestamp() -> float:
+        return (time.perf_counter() - Profiler._origin) * 1e6
+
+    @staticmethod
+    @contextmanager
+    def stage(name: str, **details: Any) -> Iterator[None]:
+        """
+        Records the wall time and the peak traced memory of a pipeline stage. Stages can be nested;
+        the peak of a stage includes the peaks of its nested stages.
+
+        :param name: The name of the stage.
+        :param details: Extra values stored with the stage, such as a job name.
+        """
+        if not Profiler.enabled:
+            yield
+            return
+
+        if Profiler._stage_stack:
+            parent = Profiler._stage_stack[-1]
+            parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        current = {'peak': 0, 'start_memory': tracemalloc.get_traced_memory()[0]}
+        Profiler._stage_stack.append(current)
+        start = Profiler._get_timestamp()
+        try:
+            yield
+        finally:
+            duration = Profiler._get_timestamp() - start
+            peak = max(current['peak'], tracemalloc.get_traced_memory()[1])
+            Profiler._stage_stack.pop()
+            if Profiler._stage_stack:
+                parent = Profiler._stage_stack[-1]
+                parent['peak'] = max(parent['peak'], peak)
+
+            Profiler.stages.append({
+                'name': name,
+                'depth': len(Profiler._stage_stack),
+                'seconds': duration / 1e6,
+                'peak_memory_bytes': peak,
+                'memory_growth_bytes': peak - current['start_memory'],
+                **details,
+            })
+            Profiler.trace_events.append({
+                'name': name, 'cat': 'stage', 'ph': 'X', 'ts': start, 'dur': duration,
+                'pid': os.getpid(), 'tid': threading.get_ident(), 'args': {'peak_memory_bytes': peak, **details},
+            })
+
+    @staticmethod
+    @contextmanager
+    def timer(name: str) -> Iterator[None]:
+        """
+        Accumulates the wall time of a frequent operation, such as writing a report, without a trace event.
+        """
+        if not Profiler.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Profiler.timers[name] = Profiler.timers.get(name, 0.0) + time.perf_counter() - start
+
+    @staticmethod
+    def record_student(student_code: str, start: float, end: float) -> None:
+        """
+        Records the time spent on one student.
+
+        :param student_code: The student code.
+        :param start: The time.perf_counter() value when the student started.
+        :param end: The time.perf_counter() value when the student finished.
+        """
+        if not Profiler.enabled:
+            return
+        Profiler.student_durations.append(end - start)
+        Profiler.trace_events.append({
+            'name': student_code, 'cat': 'student', 'ph': 'X',
+            'ts': (start - Profiler._origin) * 1e6, 'dur': (end - start) * 1e6,
+            'pid': os.getpid(), 'tid': threading.get_ident(),
+        })
+
+    @staticmethod
+    def get_summary() -> Dict[str, Any]:
+        """
+        :return: The collected stages, timers, counters, diagnostics and per-student percentiles.
+        """
+        durations = np.array(Profiler.student_durations, dtype=np.float64)
+        students: Dict[str, Any] = {'count': len(durations)}
+        if len(durations):
+            percentiles = np.percentile(durations, [50, 90, 95, 99])
+            students.update({
+                'total_seconds': float(durations.sum()),
+                'mean_ms': float(durations.mean() * 1000),
+                'p50_ms': float(percentiles[0] * 1000),
+                'p90_ms': float(percentiles[1] * 1000),
+                'p95_ms': float(percentiles[2] * 1000),
+                'p99_ms': float(percentiles[3] * 1000),
+                'max_ms': float(durations.max() * 1000),
+            })
+
+        return {
+            'stages': Profiler.stages,
+            'timers_seconds': Profiler.timers,
+            'students': students,
+            'counters': Profiler.counters,
+            'diagnostics': {
+                message: {'count': count, 'examples': examples}
+                for message, (count, examples) in Profiler.diagnostics.items()
+            },
+        }
+
+    @staticmethod
+    def save(output_dir: Path) -> None:
+        """
+        Writes profile-summary.json and a profile-trace.json file in the Chrome trace event format,
+        which can be opened in chrome://tracing or Perfetto.
+
+        :param output_dir: The directory where the files are written.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with (output_dir / 'profile-summary.json').open('w', encoding='utf-8') as file:
+            json.dump(Profiler.get_summary(), file, ensure_ascii=False, indent=4)
+        with (output_dir / 'profile-trace.json').open('w', encoding='utf-8') as file:
+            json.dump({'traceEvents': Profiler.trace_events, 'displayTimeUnit': 'ms'}, file)
+        print(f"Profile saved to {output_dir}")
+
+    @staticmethod
+    def take_counts() -> Dict[str, Any]:
+        """
+        Returns and clears the counters and diagnostics collected so far, so a worker process can send
+        them to the parent process.
+        """
+        counts = {'counters': Profiler.counters, 'diagnostics': Profiler.diagnostics}
+        Profiler.counters = {}
+        Profiler.diagnostics = {}
+        return counts
+
+    @staticmethod
+    def merge_counts(counts: Dict[str, Any]) -> None:
+        """
+        Adds the counters and diagnostics returned by take_counts in another process.
+        """
+        for name, amount in counts['counters'].items():
+            Profiler.count(name, amount)
+        for message, (count, examples) in counts['diagnostics'].items():
+            entry = Profiler.diagnostics.setdefault(message, [0, []])
+            entry[0] += count
+            entry[1].extend(examples[:Profiler.DIAGNOSTIC_EXAMPLES - len(entry[1])])
+
+    @staticmethod
+    def print_diagnostics() -> None:
+        """
+        Prints each aggregated diagnostic once, with its number of occurrences and a few examples.
+        """
+        for message, (count, examples) in Profiler.diagnostics.items():
+            suffix = ", ..." if count > len(examples) else ""
+            print(f"{message}: {count} occurrences ({', '.join(examples)}{suffix})")
@@ -0,0 +1,66 @@
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, List
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    One of the `count` partitions of the students of a sharded run, written `index/count` with a
+    0-based index. Each student is assigned to a shard by a stable hash of its code, so every machine
+    computes the same partition without coordination.
+    """
+    index: int
+    count: int
+
+    SHARD_PATTERN = re.compile(r'^(\d+)/(\d+)$')
+    # Directory under the output path of a job that holds the output of each shard
+    OUTPUT_DIRECTORY = 'shards'
+
+    @classmethod
+    def parse(cls, value: str) -> 'Shard':
+        """
+        Parses a shard given as `i/N`.
+
+        :param value: The shard, e.g. "0/4" for the first of four shards.
+        :return: An instance of Shard.
+        :raises ValueError: If the value does not follow the `i/N` format with 0 <= i < N.
+        """
+        match = Shard.SHARD_PATTERN.match(str(value).strip())
+        if match is None or not 0 <= int(match.group(1)) < int(match.group(2)):
+            raise ValueError(f"Invalid shard '{value}': the format must be 'i/N' with 0 <= i < N (e.g., '0/4').")
+        return cls(int(match.group(1)), int(match.group(2)))
+
+    @staticmethod
+    def get_shard_index(student_code: str, count: int) -> int:
+        """
+        :return: The shard, out of `count`, a student code is assigned to.
+        """
+        return zlib.crc32(str(student_code).encode('utf-8')) % count if count > 1 else 0
+
+    def contains(self, student_code: Any) -> bool:
+        """
+        :return: True if the student is assigned to this shard.
+        """
+        return Shard.get_shard_index(str(student_code), self.count) == self.index
+
+    def filter_student_codes(self, student_codes: Iterable[Any]) -> List[Any]:
+        """
+        :return: The student codes assigned to this shard, in their original order.
+        """
+        return [code for code in student_codes if self.contains(code)]
+
+    @property
+    def name(self) -> str:
+        return f"{self.index:03d}-of-{self.count:03d}"
+
+    def get_output_dir(self, output_dir: Path) -> Path:
+        """
+        :return: The directory where this shard writes the output of a job whose output path is output_dir.
+        """
+        return output_dir / Shard.OUTPUT_DIRECTORY / self.name
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
@@ -0,0 +1,40 @@
+from typing import List
+
+
+class UnionFind:
+    """
+    Disjoint-set forest over the integers 0..size-1, with union by size and path halving.
+    Every operation is iterative, so arbitrarily long chains never hit the recursion limit.
+    """
+    def __init__(self, size: int) -> None:
+        self.parents: List[int] = list(range(size))
+        self.sizes: List[int] = [1] * size
+
+    def find(self, element: int) -> int:
+        """
+        Returns the representative of the set that contains the element.
+
+        :param element: The element to look up.
+        :return: The representative element of its set.
+        """
+        parents = self.parents
+        while parents[element] != element:
+            parents[element] = parents[parents[element]]
+            element = parents[element]
+        return element
+
+    def union(self, first: int, second: int) -> None:
+        """
+        Merges the sets that contain both elements.
+
+        :param first: An element of the first set.
+        :param second: An element of the second set.
+        """
+        first_root = self.find(first)
+        second_root = self.find(second)
+        if first_root == second_root:
+            return
+        if self.sizes[first_root] < self.sizes[second_root]:
+            first_root, second_root = second_root, first_root
+        self.parents[second_root] = first_root
+        self.sizes[first_root] += self.sizes[second_root]